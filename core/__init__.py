@@ -10,6 +10,8 @@ Attribute               = attributes.Attribute
 from . import events
 # events
 EventHandler            = events.EventHandler
+EventBatch              = events.EventBatch
+EventScope              = events.EventScope
 
 
 from . import metadata
@@ -22,6 +24,11 @@ from . import plugins
 PluginManager           = plugins.PluginManager
 
 
+from . import layout
+# layout
+LayeredLayout           = layout.LayeredLayout
+
+
 from . import graph
 # graph class
 Graph                   = graph.Graph
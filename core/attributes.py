@@ -1,8 +1,21 @@
 #!/usr/bin/env python
+import array
+import numbers
 import simplejson as json
 import weakref
 from collections import OrderedDict as dict
 from SceneGraph import util
+from SceneGraph.core import log
+
+
+# typed vector attributes {attr_type: (array typecode, size)}
+VECTOR_TYPES = dict(
+    float2      = ('d', 2),
+    float3      = ('d', 3),
+    int2        = ('l', 2),
+    int3        = ('l', 3),
+    color       = ('l', 4),
+    )
 
 
 class Attribute(object):
@@ -10,7 +23,7 @@ class Attribute(object):
     Generic Attribute class.
     """
     attribute_type = 'generic'
-    REQUIRED       = ['name', 'attr_type', 'value', '_edges']
+    REQUIRED       = ['name', 'attr_type', 'value']
 
     def __init__(self, name, value, dagnode=None, user=True, **kwargs):
 
@@ -20,12 +33,16 @@ class Attribute(object):
         # stash argument passed to 'type' - overrides 
         # auto-type mechanism. * this will become data_type
         self._type             = kwargs.get('attr_type', None)
-        self._edges            = []
+        self._value            = None
+        self._array            = None
 
         self.name              = name
         self.label             = kwargs.get('label', "") 
         self.default_value     = kwargs.get('default_value', "")
-        self.value             = value
+        try:
+            self.value         = value
+        except ValueError as err:
+            self._reset_vector(err)
         
         self.doctstring        = kwargs.get('doctstring', '')
         self.desc              = kwargs.get('desc', '')
@@ -34,12 +51,12 @@ class Attribute(object):
         self.user              = user
         self.private           = kwargs.get('private', False)  # hidden
         self.hidden            = kwargs.get('hidden', False) 
-        self.connectable       = kwargs.get('connectable', False)
+        self._connectable      = kwargs.get('connectable', False)
         self.locked            = kwargs.get('locked', False)
         self.required          = kwargs.get('required', False)
 
         # connection
-        self.connection_type   = kwargs.get('connection_type', 'input')
+        self._connection_type  = kwargs.get('connection_type', 'input')
         self.data_type         = kwargs.get('data_type', None) 
         self.max_connections   = kwargs.get('max_connections', 1)  # 0 = infinite
 
@@ -68,7 +85,10 @@ class Attribute(object):
                     #print '# adding attribute: "%s"' % name
                     if hasattr(self, name) and value != getattr(self, name):
                         print '# DEBUG: Attribute "%s" updating value: "%s": "%s" - "%s"' % (self.name, name, value, getattr(self, name))
-                    setattr(self, name, value)
+                    try:
+                        setattr(self, name, value)
+                    except ValueError as err:
+                        self._reset_vector(err)
 
     @property
     def data(self):
@@ -80,7 +100,7 @@ class Attribute(object):
         """
         data = dict()
         #for attr in self.REQUIRED:
-        for attr in ['label', 'value', 'desc', '_edges', 'attr_type', 'private', 
+        for attr in ['label', 'value', 'desc', 'attr_type', 'private', 
                      'hidden', 'connectable', 'connection_type', 'locked', 'required', 'user']:
                 if hasattr(self, attr):
                     value = getattr(self, attr)
@@ -97,6 +117,67 @@ class Attribute(object):
         """
         return self._dag()
 
+    @property
+    def edge_registry(self):
+        """
+        :returns: edge registry of the parent graph.
+        :rtype: EdgeRegistry
+        """
+        dagnode = self.dagnode if self._dag is not None else None
+        if dagnode is None or dagnode.graph is None:
+            return
+        return dagnode.graph.edge_registry
+
+    @property
+    def edges(self):
+        """
+        Returns the edges connected to this attribute.
+
+        :returns: list of edge ids (src id, dest id).
+        :rtype: list
+        """
+        registry = self.edge_registry
+        if registry is None:
+            return []
+        return registry.port_edges(self.dagnode.id, self.name)
+
+    @property
+    def connection_count(self):
+        """
+        :returns: number of edges connected to this attribute.
+        :rtype: int
+        """
+        registry = self.edge_registry
+        if registry is None:
+            return 0
+        return registry.count(self.dagnode.id, self.name)
+
+    @property
+    def is_connected(self):
+        """
+        :returns: attribute has connected edges.
+        :rtype: bool
+        """
+        registry = self.edge_registry
+        if registry is None:
+            return False
+        return registry.is_connected(self.dagnode.id, self.name)
+
+    @property
+    def is_connectable(self):
+        """
+        Returns true if the attribute can accept another connection.
+         0 - unlimited connections
+
+        :returns: attribute can accept a connection.
+        :rtype: bool
+        """
+        if not self.connectable:
+            return False
+        if not self.max_connections:
+            return True
+        return self.connection_count < self.max_connections
+
     @property
     def attr_type(self):
         if self._type is not None:
@@ -105,7 +186,129 @@ class Attribute(object):
 
     @attr_type.setter
     def attr_type(self, val):
+        value = self.value
         self._type = val
+        self._array = None
+        self.value = value
+
+    #- Values ----
+    @property
+    def value(self):
+        if self._array is not None:
+            return self._array.tolist()
+        return self._value
+
+    @value.setter
+    def value(self, val):
+        vtype = self.vector_type
+        if vtype is None:
+            self._value = val
+            return
+        self._set_vector(val, *VECTOR_TYPES.get(vtype))
+
+    @property
+    def vector_type(self):
+        """
+        Returns the vector type of the attribute (ie 'float3'), if the 
+        attribute was created with one.
+
+        :returns: vector attribute type.
+        :rtype: str
+        """
+        if self._type is None:
+            return
+        vtype = str(self._type).lower()
+        if vtype in VECTOR_TYPES:
+            return vtype
+        return
+
+    @property
+    def array(self):
+        """
+        Returns the typed storage of a vector attribute.
+
+        :returns: vector values.
+        :rtype: array.array
+        """
+        return self._array
+
+    def _reset_vector(self, err):
+        """
+        Fall back to the default vector when an invalid value is read 
+        (ie: from a legacy scene file).
+
+        :param ValueError err: validation error.
+        """
+        log.warning('%s, using the default value.' % err)
+        try:
+            self.value = self.default_value
+        except ValueError:
+            self.value = None
+
+    def _set_vector(self, val, typecode, size):
+        """
+        Validate and store a vector value.
+
+        :param list val: vector value.
+        :param str typecode: array typecode.
+        :param int size: number of components.
+        """
+        if val in [None, '', 'null']:
+            val = [0] * size
+
+        if not util.is_list(val):
+            raise ValueError('attribute "%s" expects a %s value, got: %s' % (self.name, self.vector_type, val))
+
+        val = list(val)
+        # colors can be passed without an alpha value
+        if self.vector_type == 'color' and len(val) == size - 1:
+            val.append(255)
+
+        if len(val) != size or False in [is_number(x) for x in val]:
+            raise ValueError('attribute "%s" expects a %s value, got: %s' % (self.name, self.vector_type, val))
+
+        cast = float if typecode == 'd' else int
+        try:
+            values = array.array(typecode, [cast(x) for x in val])
+        except (TypeError, OverflowError):
+            raise ValueError('attribute "%s" expects a %s value, got: %s' % (self.name, self.vector_type, val))
+
+        # update in place to keep the storage stable
+        if self._array is not None and self._array.typecode == typecode and len(self._array) == size:
+            self._array[:] = values
+        else:
+            self._array = values
+
+    #- Connections ----
+    @property
+    def connectable(self):
+        return self._connectable
+
+    @connectable.setter
+    def connectable(self, val):
+        if val != self._connectable:
+            self._connectable = val
+            self._connection_changed()
+
+    @property
+    def connection_type(self):
+        return self._connection_type
+
+    @connection_type.setter
+    def connection_type(self, val):
+        if val != self._connection_type:
+            self._connection_type = val
+            self._connection_changed()
+
+    def _connection_changed(self):
+        """
+        Rebuild the parent dag node's connection caches when the
+        connection properties of a registered attribute change.
+        """
+        dagnode = self.dagnode if self._dag is not None else None
+        if dagnode is None or dagnode._attributes.get(self.name) is not self:
+            return
+        dagnode._rebuild_connection_cache()
 
     @property
     def is_input(self):
@@ -136,3 +339,11 @@ class Attribute(object):
         old_name = self.name
         self.name = name
 
+
+def is_number(value):
+    """
+    Returns true if the value is a number (including py2 longs), but not a boolean.
+
+    :rtype: bool
+    """
+    return isinstance(value, numbers.Number) and not isinstance(value, bool)
@@ -1,22 +1,220 @@
 #!/usr/bin/env python
+import os
+import time
+import weakref
+import threading
+from collections import Mapping
+from collections import OrderedDict as dict
+
+
+# global callback profiling (see set_profiling)
+PROFILE         = os.getenv('SCENEGRAPH_PROFILE_EVENTS', '0') in ['true', '1']
+PROFILE_DATA    = dict()
+
+
+def set_profiling(enabled):
+    """
+    Toggle global callback profiling. When enabled, every EventHandler
+    records call counts & wall time per callback.
+
+    :param bool enabled: enable profiling.
+    """
+    global PROFILE
+    PROFILE = bool(enabled)
+
+
+def reset_profiling():
+    """
+    Clear recorded callback profiling data.
+    """
+    PROFILE_DATA.clear()
+
+
+def profiling_data():
+    """
+    Returns recorded callback profiling data, sorted by total time.
+
+    :returns: list of (callback name, call count, total time, average time).
+    :rtype: list
+    """
+    result = []
+    for name, (count, total) in PROFILE_DATA.iteritems():
+        result.append((name, count, total, total/count if count else 0.0))
+    return sorted(result, key=lambda x: x[2], reverse=True)
+
+
+def export_profiling(filename):
+    """
+    Write recorded callback profiling data to a csv file.
+
+    :param str filename: output file.
+
+    :returns: number of callbacks written.
+    :rtype: int
+    """
+    data = profiling_data()
+    fn = open(filename, 'w')
+    fn.write('callback,calls,total_time,average_time\n')
+    for name, count, total, average in data:
+        fn.write('%s,%d,%f,%f\n' % (name, count, total, average))
+    fn.close()
+    return len(data)
+
+
+def callback_name(callback):
+    """
+    Returns a readable name for a callback.
+
+    :param callable callback: callback function or method.
+
+    :rtype: str
+    """
+    if isinstance(callback, WeakCallback):
+        return callback.name
+
+    func = getattr(callback, 'func', callback)
+    obj = getattr(func, 'im_self', None)
+    name = getattr(func, '__name__', repr(func))
+    if obj is not None:
+        return '%s.%s' % (obj.__class__.__name__, name)
+    return name
+
+
+def list_item_key(item):
+    """
+    Returns a hashable key used to coalesce items of queued list 
+    emissions (ie: node ids, or edge dictionaries).
+
+    :param item: list item.
+
+    :returns: the item, (src id, dest id) for edge dictionaries or the item's id.
+    """
+    if isinstance(item, Mapping) and 'src_id' in item and 'dest_id' in item:
+        return (item.get('src_id'), item.get('dest_id'))
+    try:
+        hash(item)
+    except TypeError:
+        return id(item)
+    return item
+
+
+class WeakCallback(object):
+    """
+    Weakly referenced bound method. The callback is dead once
+    the method's instance is garbage collected.
+
+    :param instancemethod callback: bound method.
+    :param callable on_delete: function called with this object when the instance dies.
+    """
+    def __init__(self, callback, on_delete=None):
+
+        self._func      = callback.im_func
+        self.name       = callback_name(callback)
+
+        if on_delete is not None:
+            self._obj   = weakref.ref(callback.im_self, lambda ref, cb=weakref.ref(self): on_delete(cb()))
+        else:
+            self._obj   = weakref.ref(callback.im_self)
+
+    def __call__(self, *args, **kwargs):
+        obj = self._obj()
+        if obj is None:
+            return
+        return self._func(obj, *args, **kwargs)
+
+    def __eq__(self, other):
+        if isinstance(other, WeakCallback):
+            return self._func is other._func and self._obj() is other._obj()
+        return self._func is getattr(other, 'im_func', None) and self._obj() is getattr(other, 'im_self', None)
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __repr__(self):
+        return '<WeakCallback %s%s>' % (self.name, '' if self.alive else ' (dead)')
+
+    @property
+    def alive(self):
+        """
+        :returns: the callback instance is still alive.
+        :rtype: bool
+        """
+        return self._obj() is not None
+
+
+class EventScope(object):
+    """
+    Stack of active batches (see EventBatch) shared by a group of
+    handlers, ie: a graph and its nodes. Handlers find their scope 
+    through the sender's `event_scope` attribute, falling back to 
+    the module scope.
+
+    The stack is per-thread, so a batch opened on one thread does 
+    not defer emissions sent from another.
+    """
+    def __init__(self):
+
+        self._local     = threading.local()
+
+    @property
+    def batches(self):
+        """
+        :returns: active batches of the current thread.
+        :rtype: list
+        """
+        batches = getattr(self._local, 'batches', None)
+        if batches is None:
+            batches = self._local.batches = []
+        return batches
+
+
+# scope of handlers whose sender has no event scope
+DEFAULT_SCOPE   = EventScope()
 
 
 class EventHandler(object):
 
-    def __init__(self, sender):
+    def __init__(self, sender, batched=True):
 
         self.callbacks = []
         self.sender = sender
         self.blocked = False
 
+        # handlers whose return values are used by the sender
+        # (ie: name validation) should not be batched.
+        self.batched = batched
+        self._pending = dict()
+        self._pending_items = set()     # keys of queued list items (see list_item_key)
+
+        # profiling
+        self.emissions = 0
+        self.callback_count = 0
+        self.callback_time = 0.0
+
     def __call__(self, *args, **kwargs):
         """
-        Runs all callbacks.
+        Runs all callbacks. If a batch is active, the emission
+        is queued until the batch exits.
         """
         if not self.blocked:
-            return [callback(self.sender, *args, **kwargs) for callback in self.callbacks]
+            self.emissions += 1
+            if self.batched:
+                batches = self.scope.batches
+                if batches:
+                    self._queue(batches[-1], args, kwargs)
+                    return []
+            return self._emit(*args, **kwargs)
         return []
 
+    @property
+    def scope(self):
+        """
+        Returns the batch scope of the sender.
+
+        :rtype: EventScope
+        """
+        return getattr(self.sender, 'event_scope', None) or DEFAULT_SCOPE
+
     def __iadd__(self, callback):
         """
         Add a callback to the stack.
@@ -53,17 +251,33 @@ class EventHandler(object):
         """
         self.blocked = block
 
-    def add(self, callback):
+    def add(self, callback, weak=True):
         """
         Add a callback. Raises error if callback is not
-        callable.
+        callable. Bound methods are weakly referenced by default,
+        and are removed when their instance is deleted.
 
         :param callable callback: callback function or method.
+        :param bool weak: weakly reference bound methods.
         """
         if not callable(callback):
             raise TypeError("callback must be callable")
+
+        if weak and getattr(callback, 'im_self', None) is not None:
+            callback = WeakCallback(callback, on_delete=self._callbackDeleted)
         self.callbacks.append(callback)
 
+    def _callbackDeleted(self, callback):
+        """
+        Remove a dead weak callback.
+
+        :param WeakCallback callback: dead callback.
+        """
+        for index, cb in enumerate(self.callbacks):
+            if cb is callback:
+                del self.callbacks[index]
+                return
+
     def remove(self, callback):
         """
         Remove a callback.
@@ -72,3 +286,157 @@ class EventHandler(object):
         """
         self.callbacks.remove(callback)
 
+    #- Batching ----
+    def _emit(self, *args, **kwargs):
+        """
+        Run all callbacks, updating the handler counters.
+
+        :returns: list of callback results.
+        :rtype: list
+        """
+        result = []
+        for callback in list(self.callbacks):
+            if isinstance(callback, WeakCallback) and not callback.alive:
+                self._callbackDeleted(callback)
+                continue
+
+            start = time.time()
+            result.append(callback(self.sender, *args, **kwargs))
+            elapsed = time.time() - start
+            self.callback_time += elapsed
+            self.callback_count += 1
+
+            if PROFILE:
+                name = callback_name(callback)
+                count, total = PROFILE_DATA.get(name, (0, 0.0))
+                PROFILE_DATA[name] = (count + 1, total + elapsed)
+        return result
+
+    def _queue(self, batch, args, kwargs):
+        """
+        Queue an emission with the active batch, coalescing it with 
+        pending emissions:
+
+            - keyword-only emissions are merged (last value wins).
+            - emissions with a single list argument are merged into one list.
+            - identical emissions are only sent once.
+        """
+        if not self._pending:
+            batch.register(self)
+
+        if not args:
+            key = '__kwargs__'
+            pending = self._pending.get(key)
+            if pending is None:
+                self._pending[key] = [(), dict(kwargs)]
+            else:
+                pending[1].update(kwargs)
+            return
+
+        if len(args) == 1 and type(args[0]) is list and not kwargs:
+            key = '__list__'
+            pending = self._pending.get(key)
+            if pending is None:
+                pending = self._pending[key] = [([],), {}]
+                self._pending_items = set()
+
+            items = pending[0][0]
+            for item in args[0]:
+                item_key = list_item_key(item)
+                if item_key not in self._pending_items:
+                    self._pending_items.add(item_key)
+                    items.append(item)
+            return
+
+        try:
+            key = (args, tuple(sorted(kwargs.items())))
+            hash(key)
+        except TypeError:
+            key = len(self._pending)
+        self._pending[key] = [args, kwargs]
+
+    def flush(self):
+        """
+        Send all pending emissions.
+        """
+        pending = self._pending
+        self._pending = dict()
+        self._pending_items = set()
+        if self.blocked:
+            return
+
+        for args, kwargs in pending.values():
+            self._emit(*args, **kwargs)
+
+    @property
+    def stats(self):
+        """
+        Returns the handler profiling counters.
+
+        :returns: dictionary of emissions, callbacks & cumulative callback time (seconds).
+        :rtype: dict
+        """
+        return dict([('emissions', self.emissions), ('callbacks', self.callback_count), ('callback_time', self.callback_time)])
+
+    def resetStats(self):
+        """
+        Reset the handler profiling counters.
+        """
+        self.emissions = 0
+        self.callback_count = 0
+        self.callback_time = 0.0
+
+
+class EventBatch(object):
+    """
+    Context manager that queues & coalesces EventHandler emissions
+    until it exits. Only handlers in the batch scope (on the current 
+    thread) are deferred. Batches can be nested, pending emissions are 
+    sent when the outermost batch exits:
+
+        with graph.batch():
+            for node in nodes:
+                node.pos = (0.0, 0.0)
+
+    :param EventScope scope: batch scope (defaults to the module scope).
+    """
+    def __init__(self, scope=None):
+
+        self.handlers = []
+        self.scope    = scope or DEFAULT_SCOPE
+
+    def __enter__(self):
+        batches = self.scope.batches
+        if batches:
+            # nested batches share the outermost queue.
+            batches.append(batches[-1])
+        else:
+            batches.append(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        batches = self.scope.batches
+        batch = batches.pop()
+        if not batches:
+            batch.flush()
+        return False
+
+    def register(self, handler):
+        """
+        Register a handler with pending emissions.
+
+        :param EventHandler handler: event handler.
+        """
+        if handler not in self.handlers:
+            self.handlers.append(handler)
+
+    def flush(self):
+        """
+        Send all pending emissions, in the order the handlers were first queued.
+        """
+        # callbacks may emit more events while flushing
+        while self.handlers:
+            handlers = self.handlers
+            self.handlers = []
+            for handler in handlers:
+                handler.flush()
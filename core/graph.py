@@ -1,6 +1,8 @@
 #!/usr/bin/env python
 import os
 import re
+import math
+import array
 import weakref
 import simplejson as json
 import networkx as nx
@@ -9,10 +11,15 @@ from functools import partial
 import inspect
 from collections import OrderedDict as dict
 from SceneGraph import options
-from SceneGraph.core import log, PluginManager, Attribute, EventHandler
+from SceneGraph.core import log, PluginManager, Attribute, EventHandler, EventBatch, EventScope, LayeredLayout
 from SceneGraph.core import nodes
 from SceneGraph import util
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 
 class Graph(object):
     """
@@ -24,7 +31,8 @@ class Graph(object):
         default_width                      = kwargs.pop('width', 150.0)
         default_height                     = kwargs.pop('height', 150.0)
 
-        # events
+        # events (batches only defer this graph's events, see batch)
+        self.event_scope                   = EventScope()
         self.nodesAdded                    = EventHandler(self)
         self.edgesAdded                    = EventHandler(self)
         self.graphUpdated                  = EventHandler(self)
@@ -36,10 +44,15 @@ class Graph(object):
         self.graphRead                     = EventHandler(self)
 
         self.graphRefreshed                = EventHandler(self)
+        self.nodesMoved                    = EventHandler(self)
+        self.nodesReloaded                 = EventHandler(self)
 
 
         #self.network                      = nx.DiGraph()
         self.network                       = nx.MultiDiGraph() # mutliple edges between nodes
+        self.edge_registry                 = EdgeRegistry()
+        self.positions                     = PositionStore()
+        self.reachability                  = ReachabilityIndex()
         
         self.mode                          = 'standalone'
         self.grid                          = Grid(5, 5, width=default_width, height=default_height)
@@ -47,6 +60,9 @@ class Graph(object):
         self.plug_mgr                      = PluginManager()
         self._initialized                  = 0
 
+        # rebind nodes when their plugins are reloaded
+        self.plug_mgr.registry.pluginsReloaded += self.pluginsReloadedEvent
+
         # attributes for current nodes/dynamically loaded nodes
         self._node_types                   = dict() 
         self.dagnodes                      = dict()
@@ -168,17 +184,12 @@ class Graph(object):
 
     def nodePositionChangedEvent(self, node, *args, **kwargs):
         """
-        Callback method.
+        Callback method. The position store is updated by the dag node
+        (see set_position), the NetworkX data is synced from the store.
 
         :param DagNode node:
         """
-        nid = node.id
-        pos = kwargs.get('pos', [])
-        if pos:
-            if nid in self.network.nodes():
-                nx_data = self.network.node[nid]
-                nx_data['pos']=pos
-                #print '# DEBUG: position: ', pos
+        self.sync_positions([node.id])
 
     def nodeAttributeUpdatedEvent(self, node, *args, **kwargs):
         """
@@ -187,13 +198,27 @@ class Graph(object):
         :param DagNode node:
         """
         nid = node.id
-        if nid in self.network.nodes():
+        if nid in self.network:
             nx_data = self.network.node[nid]
             
             for k, v in kwargs.iteritems():
                 nx_data.update({k:v})
                 #print '# DEBUG: updating: "%s" :' % k, v
 
+    def batch(self):
+        """
+        Returns a context manager that queues & coalesces the events of
+        this graph & its nodes until it exits:
+
+            with graph.batch():
+                for node in graph.nodes():
+                    node.color = [255, 0, 0, 255]
+
+        :returns: event batch.
+        :rtype: EventBatch
+        """
+        return EventBatch(self.event_scope)
+
     def updateDagNodes(self, dagnodes, debug=False):
         """
         Update the networkx nodes and links attributes from scene values.
@@ -357,6 +382,52 @@ class Graph(object):
         """
         return self.network.edges(data=True)
 
+    def attribute_array(self, name, *args):
+        """
+        Returns a vector attribute (ie 'pos', 'color') of many nodes as a single 
+        contiguous array for bulk processing. Nodes without the attribute are skipped.
+
+        :param str name: attribute name.
+        :param str args: node names or ids to query (defaults to all nodes).
+
+        :returns: tuple of (node ids, array, number of components per node).
+        :rtype: tuple
+        """
+        dagnodes = self.get_node(*args) if args else self.dagnodes.values()
+
+        node_ids = []
+        values = []
+        typecode = None
+        size = None
+
+        for dagnode in dagnodes:
+            attr = dagnode._attributes.get(name) if hasattr(dagnode, '_attributes') else None
+            if attr is not None:
+                value = attr.value
+                if attr.array is not None:
+                    typecode = typecode or attr.array.typecode
+            elif hasattr(dagnode, name):
+                value = getattr(dagnode, name)
+            else:
+                continue
+
+            if not util.is_list(value):
+                continue
+
+            if size is None:
+                size = len(value)
+
+            if len(value) != size:
+                raise ValueError('attribute "%s.%s" has %d components, expected %d.' % (dagnode.name, name, len(value), size))
+
+            node_ids.append(dagnode.id)
+            values.extend(value)
+
+        # untyped values are promoted to floats
+        if typecode is None or False in [isinstance(x, (int, long)) for x in values]:
+            typecode = 'd'
+        return (node_ids, array.array(typecode, values), size or 0)
+
     def get_node(self, *args):
         """
         Return a dag node by name.
@@ -426,17 +497,18 @@ class Graph(object):
         :rtype: NodeWidget
         """
         # check to see if node type is valid
-        if node_type not in self.node_types():
+        node = self.plug_mgr.resolve(node_type)
+        if node is None:
             log.error('invalid node type: "%s"' % node_type)
             return
 
         pos  = kwargs.pop('pos', self.grid.coords)
 
         # get the default name for the node type and validate it
-        name = self.get_valid_name(self.plug_mgr.default_name(node_type))
-
         if 'name' in kwargs:
             name = kwargs.pop('name')
+        else:
+            name = self.get_valid_name(node.default_name)
 
         # parse attributes
         attributes = dict()
@@ -444,8 +516,8 @@ class Graph(object):
             if util.is_dict(val):
                 attributes[attr]=val
                 
-        # get the dag node from the PluginManager
-        dag = self.plug_mgr.get_dagnode(node_type=node_type, name=name, pos=pos, _graph=self, attributes=attributes, **kwargs)
+        # create the dag node from the resolved plugin type
+        dag = node.create(name=name, pos=pos, _graph=self, attributes=attributes, **kwargs)
 
         # connect signals
         dag.nodeNameChanged += self.nodeNameChangedEvent
@@ -455,6 +527,8 @@ class Graph(object):
         # advance the grid to the next value.
         self.grid.next()
         self.dagnodes[dag.id] = dag
+        self.positions.add(dag.id, dag.pos)
+        self.reachability.add_node(dag.id)
         
         # todo: figure out why I have to load this (need JSONEncoder)
         node_data = json.loads(str(dag), object_pairs_hook=dict)
@@ -495,6 +569,9 @@ class Graph(object):
             # remove from networkx
             if dag_id in self.network.nodes():
                 self.network.remove_node(dag_id)
+            self.edge_registry.remove_node(dag_id)
+            self.positions.remove(dag_id)
+            self.reachability.remove_node(dag_id)
 
             # remove from dagnodes
             if dag_id in self.dagnodes:
@@ -550,9 +627,16 @@ class Graph(object):
 
         src_conn = src.get_connection(src_attr)
         dest_conn = dest.get_connection(dest_attr)
-        edge_id_str = '(%s,%s)' % (src.id, dest.id)
 
-        #if edge_id_str not in src_conn._edges and edge_id_str not in dest_conn._edges:            
+        if src_conn is None or dest_conn is None:
+            log.warning('invalid connection: "%s"' % conn_str)
+            return
+
+        # enforce the destination connection limit (0 = infinite)
+        if dest_conn.max_connections and self.edge_registry.count(dest.id, dest_attr) >= dest_conn.max_connections:
+            log.warning('connection "%s.%s" cannot accept more connections.' % (dest.name, dest_attr))
+            return
+
         # add the nx edge - weight should go here        
         self.network.add_edge(src.id, dest.id, key='attributes', weight=weight, attr_dict=edge_attrs)
         log.info('adding edge: "%s"' % self.edge_nice_name(src.id, dest.id))
@@ -560,8 +644,8 @@ class Graph(object):
         # new edge = {'attributes': {'dest_attr': 'input', 'src_attr': 'output', 'weight': 1}}
         new_edge = self.network.edge[src.id][dest.id]
         #print 'new edge: ', new_edge
-        src_conn._edges.append(edge_id_str)
-        dest_conn._edges.append(edge_id_str)
+        self.edge_registry.add(src.id, src_attr, dest.id, dest_attr)
+        self.reachability.add_edge(src.id, dest.id)
 
         # update the scene
         self.edgesAdded([new_edge.get('attributes')])
@@ -710,6 +794,7 @@ class Graph(object):
                 log.debug('Removing edge: "%s"' % self.edge_nice_name(*edge_id))
                 self.network.remove_edge(*edge_id)                
                 self.remove_node_edge(*edge_id)        
+                self.reachability.remove_edge(*edge_id)
 
                 # update the scene
                 self.graphUpdated(edge_id)
@@ -719,13 +804,11 @@ class Graph(object):
     def remove_node_edge(self, src_id, dest_id):
         """
         Remove deleted edges from current dagnodes.
+
+        :returns: source & destination ports of the removed edge.
+        :rtype: tuple
         """
-        edge_id_str = '(%s,%s)' % (src_id, dest_id)
-        for id, dag in self.dagnodes.items():
-            for conn_name in dag.connections:
-                dagcon = dag.get_connection(conn_name)
-                if edge_id_str in dagcon._edges:
-                    dagcon._edges.remove(edge_id_str)
+        return self.edge_registry.remove(src_id, dest_id)
 
     def getNodeID(self, name):
         """
@@ -894,6 +977,7 @@ class Graph(object):
         if old in nn:
             val = nn.pop(old)
             nn[new] = val
+            self.edge_registry.rename_port(id, old, new)
 
             # update any connections
             if self.network.edges():
@@ -923,16 +1007,17 @@ class Graph(object):
         """
         import copy
         result = []
-        for node in nodes:
-            new_name = self.get_valid_name(node.name)
-            data = copy.deepcopy(node.data)
-            data.update(pos=[node.pos[0]+offset[0], node.pos[1]+offset[1]])
-            data.update(name=new_name)
-            data.pop('node_type')
-            data.pop('id')
-            new_node = self.add_node(node.node_type, **data)
-            print '# adding node: "%s"' % new_node.name
-            result.append(new_node)
+        with self.batch():
+            for node in nodes:
+                new_name = self.get_valid_name(node.name)
+                data = copy.deepcopy(node.data)
+                data.update(pos=[node.pos[0]+offset[0], node.pos[1]+offset[1]])
+                data.update(name=new_name)
+                data.pop('node_type')
+                data.pop('id')
+                new_node = self.add_node(node.node_type, **data)
+                print '# adding node: "%s"' % new_node.name
+                result.append(new_node)
         return result
 
     def connect(self, source, dest):
@@ -980,43 +1065,177 @@ class Graph(object):
         """
         # clear the Graph
         self.network.clear()
+        self.edge_registry.clear()
+        self.positions.clear()
+        self.reachability.clear()
         self.dagnodes = dict()
         self._initialized = 0
         if self.handler is not None:
             self.handler.resetScene()
 
+    def _reachability_id(self, node):
+        """
+        Returns the node id from a node id, dag node or name.
+        """
+        if node in self.reachability:
+            return node
+        if hasattr(node, 'id'):
+            return node.id
+        return self.getNodeID(node)
+
     def downstream(self, node):
         """
         Return downstream nodes from the given node.
-        """
-        nid = None
-        if node not in self.network.nodes():
-            if self.getNodeID(node):
-                nid = self.getNodeID(node)
-        else:
-            nid = node
 
+        :param str node: node id, name or dag node.
+
+        :returns: downstream node ids.
+        :rtype: set
+        """
+        nid = self._reachability_id(node)
         if nid is not None:
-            #return self.network.successors(nid)
-            return nx.descendants(self.network, nid)            
+            return self.reachability.descendants(nid)
         return []
 
     def upstream(self, node):
         """
         Return upstream nodes from the given node.
-        """
-        nid = None
-        if node not in self.network.nodes():
-            if self.getNodeID(node):
-                nid = self.getNodeID(node)
-        else:
-            nid = node
 
+        :param str node: node id, name or dag node.
+
+        :returns: upstream node ids.
+        :rtype: set
+        """
+        nid = self._reachability_id(node)
         if nid is not None:
-            #return self.network.predecessors(nid)
-            return nx.ancestors(self.network, nid)  
+            return self.reachability.ancestors(nid)
         return []
 
+    #- Positions ----
+    def set_position(self, node_id, pos):
+        """
+        Set the position of a node.
+
+        :param str node_id: node id.
+        :param tuple pos: x, y position.
+        """
+        if node_id not in self.positions:
+            return
+        self.positions.set(node_id, pos)
+        self.sync_positions([node_id])
+
+    def sync_positions(self, node_ids):
+        """
+        Copy positions from the position store to the dag nodes & 
+        NetworkX data.
+
+        :param list node_ids: node ids.
+        """
+        for nid in node_ids:
+            pos = self.positions.get(nid)
+            if pos is None:
+                continue
+            dag = self.dagnodes.get(nid)
+            if dag is not None:
+                dag._pos = pos
+            if nid in self.network:
+                self.network.node[nid]['pos'] = pos
+
+    def _node_ids(self, *args):
+        """
+        Returns node ids from names, ids or dag nodes (defaults to all nodes).
+        """
+        if not args:
+            return None
+        node_ids = []
+        for arg in args:
+            if arg in self.dagnodes:
+                node_ids.append(arg)
+            elif hasattr(arg, 'id'):
+                node_ids.append(arg.id)
+            else:
+                node_ids.extend([n.id for n in self.get_node(arg)])
+        return node_ids
+
+    def offset_nodes(self, offset, *args):
+        """
+        Offset the positions of many nodes at once.
+
+        :param tuple offset: x, y offset.
+        :param args: node names, ids or dag nodes.
+
+        :returns: list of moved node ids.
+        :rtype: list
+        """
+        node_ids = self.positions.offset(self._node_ids(*args), offset)
+        if node_ids:
+            self.sync_positions(node_ids)
+            self.nodesMoved(node_ids)
+        return node_ids
+
+    def snap_nodes(self, *args, **kwargs):
+        """
+        Snap node positions to a grid (defaults to all nodes).
+
+        :param args: node names, ids or dag nodes.
+        :param tuple size: grid cell width & height.
+
+        :returns: list of moved node ids.
+        :rtype: list
+        """
+        size = kwargs.get('size', (10.0, 10.0))
+        node_ids = self.positions.snap(self._node_ids(*args), size=size)
+        if node_ids:
+            self.sync_positions(node_ids)
+            self.nodesMoved(node_ids)
+        return node_ids
+
+    def layout_nodes(self, *args, **kwargs):
+        """
+        Arrange nodes in layers, following their connections 
+        (defaults to all nodes). Positions are updated in bulk.
+
+        :param args: node names, ids or dag nodes.
+        :param kwargs: LayeredLayout options (layer_spacing, node_spacing, orientation...).
+
+        :returns: list of moved node ids.
+        :rtype: list
+        """
+        node_ids = self._node_ids(*args)
+        if node_ids is None:
+            node_ids = self.dagnodes.keys()
+
+        node_ids = [nid for nid in node_ids if nid in self.network and nid in self.positions]
+        if not node_ids:
+            return []
+
+        subset = set(node_ids)
+        edges = [(src, dest) for src, dest in self.network.edges_iter(node_ids) if dest in subset]
+        sizes = dict()
+        for nid in node_ids:
+            dag = self.dagnodes.get(nid)
+            sizes[nid] = (getattr(dag, 'width', 150.0), getattr(dag, 'height', 150.0))
+
+        # keep the laid out nodes where they are
+        bounds = self.positions.bounds(node_ids)
+        layout = LayeredLayout(**kwargs)
+        node_ids, pos = layout.run(node_ids, edges, sizes=sizes, origin=bounds[:2])
+        self.positions.set_many(node_ids, pos)
+        self.sync_positions(node_ids)
+        self.nodesMoved(node_ids)
+        return node_ids
+
+    def bounds(self, *args):
+        """
+        Returns the bounding box of node positions (defaults to all nodes).
+
+        :param args: node names, ids or dag nodes.
+
+        :returns: (xmin, ymin, xmax, ymax), or None if there are no nodes.
+        :rtype: tuple
+        """
+        return self.positions.bounds(self._node_ids(*args))
+
     def is_valid_name(self, name):
         """
         Returns true if name not already assigned to a node.
@@ -1254,42 +1473,43 @@ class Graph(object):
                     if len(gdata) > 1:
                         self.network.graph[gdata[0]]=gdata[1]
 
-        # build nodes from data
-        if nodes:
-            for node_attrs in node_data:
-                # get the node type
-                node_type = node_attrs.pop('node_type', 'default')
+        # build nodes from data (events are sent once all nodes & edges are built)
+        with self.batch():
+            if nodes:
+                for node_attrs in node_data:
+                    # get the node type
+                    node_type = node_attrs.pop('node_type', 'default')
 
-                # add the dag node/widget
-                dag_node = self.add_node(node_type, **node_attrs)
-                log.debug('building node "%s"' % node_attrs.get('name'))
+                    # add the dag node/widget
+                    dag_node = self.add_node(node_type, **node_attrs)
+                    log.debug('building node "%s"' % node_attrs.get('name'))
 
-            # edge : ['src_attr', 'target', 'weight', 'dest_id', 'source', 'dest_attr', 'key', 'src_id']
-            for edge in edge_data:
+                # edge : ['src_attr', 'target', 'weight', 'dest_id', 'source', 'dest_attr', 'key', 'src_id']
+                for edge in edge_data:
 
-                src_id = edge.get('src_id')
-                dest_id = edge.get('dest_id')
+                    src_id = edge.get('src_id')
+                    dest_id = edge.get('dest_id')
 
-                src_attr = edge.get('src_attr')
-                dest_attr = edge.get('dest_attr')
+                    src_attr = edge.get('src_attr')
+                    dest_attr = edge.get('dest_attr')
 
-                weight = edge.get('weight', 1.0)
+                    weight = edge.get('weight', 1.0)
 
-                src_dag_nodes = self.get_node(src_id)
-                dest_dag_nodes = self.get_node(dest_id)
+                    src_dag_nodes = self.get_node(src_id)
+                    dest_dag_nodes = self.get_node(dest_id)
 
-                if not src_dag_nodes or not dest_dag_nodes:
-                    log.warning('cannot parse nodes.')
-                    return
+                    if not src_dag_nodes or not dest_dag_nodes:
+                        log.warning('cannot parse nodes.')
+                        return
 
-                src_dag_node = src_dag_nodes[0]
-                dest_dag_node = dest_dag_nodes[0]
-                src_string = '%s.%s' % (src_dag_node.name, src_attr)
-                dest_string = '%s.%s' % (dest_dag_node.name, dest_attr)
+                    src_dag_node = src_dag_nodes[0]
+                    dest_dag_node = dest_dag_nodes[0]
+                    src_string = '%s.%s' % (src_dag_node.name, src_attr)
+                    dest_string = '%s.%s' % (dest_dag_node.name, dest_attr)
 
-                # TODO: need to get connection node here
-                log.info('connecting nodes: "%s" "%s"' % (src_string, dest_string))            
-                dag_edge = self.add_edge(src_dag_node, dest_dag_node, src_attr=src_attr, dest_attr=dest_attr, weight=weight)
+                    # TODO: need to get connection node here
+                    log.info('connecting nodes: "%s" "%s"' % (src_string, dest_string))            
+                    dag_edge = self.add_edge(src_dag_node, dest_dag_node, src_attr=src_attr, dest_attr=dest_attr, weight=weight)
 
         #self.handler.scene.clear()
         scene_pos = self.network.graph.get('view_center', (0,0))
@@ -1376,15 +1596,7 @@ class Graph(object):
         :returns: nodes are connected.
         :rtype: bool 
         """
-        dag_names = [node1.name, node2.name]
-        for edge in self.network.edges(data=True):
-            src_id, dest_id, attrs = edge
-            dagnode1 = self.get_node(src_id)
-            dagnode2 = self.get_node(dest_id)
-
-            if dagnode1.name in dag_names and dagnode2.name in dag_names:
-                return True
-        return False
+        return self.reachability.is_adjacent(node1.id, node2.id)
 
     def outputs(self, node):
         """
@@ -1399,6 +1611,38 @@ class Graph(object):
         return []
 
     #- Plugins ----
+    def pluginsReloadedEvent(self, registry, node_types):
+        """
+        Callback method. Rebind dag nodes of reloaded plugin types to 
+        their new classes & metadata.
+
+        :param PluginRegistry registry: plugin registry.
+        :param list node_types: reloaded node types.
+        """
+        import copy
+        ids = []
+        for dag in self.dagnodes.values():
+            if dag.node_type not in node_types:
+                continue
+
+            node = self.plug_mgr.resolve(dag.node_type, disabled=True)
+            if node is None:
+                log.warning('plugin "%s" is no longer available.' % dag.node_type)
+                continue
+
+            if dag.__class__ is not node.dagnode:
+                dag.__class__ = node.dagnode
+
+            dag._metadata.clear()
+            dag._metadata.update(copy.deepcopy(node.metadata))
+            if hasattr(dag, 'buildConnections'):
+                dag.buildConnections()
+            ids.append(dag.id)
+
+        if ids:
+            log.info('rebinding %d nodes.' % len(ids))
+            self.nodesReloaded(ids)
+
     @property 
     def plugins(self):
         """
@@ -1414,10 +1658,14 @@ class Graph(object):
 
             if widget is not None:
                 widget = widget.__name__
+            else:
+                widget = data.get('widget_class', None)
             dagnode = data.get('dagnode', None)
 
             if dagnode is not None:
                 dagnode = dagnode.__name__
+            else:
+                dagnode = data.get('dagnode_class', None)
             if not row:
                 print '%s\nPlugin: %s\n%s' % ('-' *35, node_type, '-' * 35)
             else:
@@ -1635,3 +1883,655 @@ class Grid(object):
 
     def set(self, row, column, item):
         self._data[row][column] = item
+
+
+class EdgeRegistry(object):
+    """
+    Index of graph edges and the node ports they connect. Edges
+    are keyed by (src id, dest id), ports by (node id, attribute name).
+
+    Maps each edge to its source & destination ports, each port to its 
+    edges and each node to its edges, so cleanup scales with node degree.
+    """
+    def __init__(self):
+
+        self._edges     = dict()    # {(src id, dest id): ((src id, src attr), (dest id, dest attr))}
+        self._ports     = dict()    # {(node id, attr): [edge ids]}
+        self._nodes     = dict()    # {node id: [edge ids]}
+
+    def __len__(self):
+        return len(self._edges)
+
+    def __contains__(self, edge_id):
+        return edge_id in self._edges
+
+    def clear(self):
+        """
+        Remove all edges.
+        """
+        self._edges = dict()
+        self._ports = dict()
+        self._nodes = dict()
+
+    def add(self, src_id, src_attr, dest_id, dest_attr):
+        """
+        Register an edge.
+
+        :param str src_id: source node id.
+        :param str src_attr: source attribute name.
+        :param str dest_id: destination node id.
+        :param str dest_attr: destination attribute name.
+
+        :returns: edge id.
+        :rtype: tuple
+        """
+        edge_id = (src_id, dest_id)
+        if edge_id in self._edges:
+            self.remove(*edge_id)
+
+        src_port = (src_id, src_attr)
+        dest_port = (dest_id, dest_attr)
+        self._edges[edge_id] = (src_port, dest_port)
+
+        for port in [src_port, dest_port]:
+            self._ports.setdefault(port, []).append(edge_id)
+
+        for node_id in [src_id, dest_id]:
+            self._nodes.setdefault(node_id, []).append(edge_id)
+        return edge_id
+
+    def remove(self, src_id, dest_id):
+        """
+        Unregister an edge.
+
+        :param str src_id: source node id.
+        :param str dest_id: destination node id.
+
+        :returns: source & destination ports of the removed edge.
+        :rtype: tuple
+        """
+        edge_id = (src_id, dest_id)
+        if edge_id not in self._edges:
+            return ()
+
+        ports = self._edges.pop(edge_id)
+        for port in ports:
+            self._discard(self._ports, port, edge_id)
+
+        for node_id in [src_id, dest_id]:
+            self._discard(self._nodes, node_id, edge_id)
+        return ports
+
+    def remove_node(self, node_id):
+        """
+        Unregister all edges connected to a node.
+
+        :param str node_id: node id.
+
+        :returns: list of removed edge ids.
+        :rtype: list
+        """
+        edge_ids = list(self._nodes.get(node_id, []))
+        for edge_id in edge_ids:
+            self.remove(*edge_id)
+        self._nodes.pop(node_id, None)
+        return edge_ids
+
+    def rename_port(self, node_id, old, new):
+        """
+        Update edges when a node attribute is renamed.
+
+        :param str node_id: node id.
+        :param str old: old attribute name.
+        :param str new: new attribute name.
+        """
+        old_port = (node_id, old)
+        new_port = (node_id, new)
+        if old_port not in self._ports:
+            return
+
+        edge_ids = self._ports.pop(old_port)
+        self._ports[new_port] = edge_ids
+        for edge_id in edge_ids:
+            src_port, dest_port = self._edges.get(edge_id)
+            if src_port == old_port:
+                src_port = new_port
+            if dest_port == old_port:
+                dest_port = new_port
+            self._edges[edge_id] = (src_port, dest_port)
+
+    def ports(self, src_id, dest_id):
+        """
+        Returns the ports connected by an edge.
+
+        :returns: ((src id, src attr), (dest id, dest attr))
+        :rtype: tuple
+        """
+        return self._edges.get((src_id, dest_id), ())
+
+    def port_edges(self, node_id, attr):
+        """
+        Returns the edges connected to a port.
+
+        :param str node_id: node id.
+        :param str attr: attribute name.
+
+        :returns: list of edge ids.
+        :rtype: list
+        """
+        return list(self._ports.get((node_id, attr), []))
+
+    def node_edges(self, node_id):
+        """
+        Returns the edges connected to a node.
+
+        :param str node_id: node id.
+
+        :returns: list of edge ids.
+        :rtype: list
+        """
+        return list(self._nodes.get(node_id, []))
+
+    def count(self, node_id, attr):
+        """
+        Returns the number of edges connected to a port.
+
+        :param str node_id: node id.
+        :param str attr: attribute name.
+
+        :returns: number of connections.
+        :rtype: int
+        """
+        return len(self._ports.get((node_id, attr), []))
+
+    def is_connected(self, node_id, attr):
+        """
+        Returns true if the port has any connections.
+
+        :param str node_id: node id.
+        :param str attr: attribute name.
+
+        :rtype: bool
+        """
+        return (node_id, attr) in self._ports
+
+    def _discard(self, index, key, edge_id):
+        """
+        Remove an edge id from an index, dropping empty entries.
+        """
+        edge_ids = index.get(key)
+        if edge_ids is None:
+            return
+
+        if edge_id in edge_ids:
+            edge_ids.remove(edge_id)
+
+        if not edge_ids:
+            index.pop(key)
+
+
+class ReachabilityIndex(object):
+    """
+    Transitive closure of the graph, for downstream/upstream queries.
+    Each node has a bit slot; the descendants & ancestors of a node are 
+    stored as integer bitmasks, so closure updates are whole-set ORs.
+
+    Edge additions update the closure incrementally. Removals only 
+    recompute the closure of the nodes that could reach the removed edge.
+    """
+    def __init__(self):
+
+        self._slots     = dict()    # {node id: bit slot}
+        self._ids       = []        # [node id] by slot
+        self._free      = []        # reusable slots
+        self._succ      = dict()    # {node id: set(node id)}
+        self._pred      = dict()    # {node id: set(node id)}
+        self._desc      = dict()    # {node id: descendants bitmask}
+        self._anc       = dict()    # {node id: ancestors bitmask}
+
+    def __len__(self):
+        return len(self._slots)
+
+    def __contains__(self, node_id):
+        try:
+            return node_id in self._slots
+        except TypeError:
+            return False
+
+    def clear(self):
+        """
+        Remove all nodes.
+        """
+        self._slots = dict()
+        self._ids = []
+        self._free = []
+        self._succ = dict()
+        self._pred = dict()
+        self._desc = dict()
+        self._anc = dict()
+
+    def add_node(self, node_id):
+        """
+        Add a node.
+
+        :param str node_id: node id.
+        """
+        if node_id in self._slots:
+            return
+
+        if self._free:
+            slot = self._free.pop()
+            self._ids[slot] = node_id
+        else:
+            slot = len(self._ids)
+            self._ids.append(node_id)
+
+        self._slots[node_id] = slot
+        self._succ[node_id] = set()
+        self._pred[node_id] = set()
+        self._desc[node_id] = 0
+        self._anc[node_id] = 0
+
+    def remove_node(self, node_id):
+        """
+        Remove a node and its edges.
+
+        :param str node_id: node id.
+        """
+        slot = self._slots.get(node_id)
+        if slot is None:
+            return
+
+        # nodes whose closure included this node
+        upstream = self._ids_from_mask(self._anc.get(node_id))
+        downstream = self._ids_from_mask(self._desc.get(node_id))
+
+        for nid in self._succ.pop(node_id):
+            self._pred[nid].discard(node_id)
+        for nid in self._pred.pop(node_id):
+            self._succ[nid].discard(node_id)
+
+        self._slots.pop(node_id)
+        self._desc.pop(node_id)
+        self._anc.pop(node_id)
+        self._ids[slot] = None
+        self._free.append(slot)
+
+        self._recompute(upstream, downstream)
+
+    def add_edge(self, src_id, dest_id):
+        """
+        Add an edge, updating the closure of every node upstream of 
+        the source & downstream of the destination.
+
+        :param str src_id: source node id.
+        :param str dest_id: destination node id.
+        """
+        for node_id in [src_id, dest_id]:
+            self.add_node(node_id)
+
+        self._succ[src_id].add(dest_id)
+        self._pred[dest_id].add(src_id)
+
+        dest_bit = 1 << self._slots[dest_id]
+        if self._desc[src_id] & dest_bit:
+            return
+
+        upstream = self._anc[src_id] | (1 << self._slots[src_id])
+        downstream = self._desc[dest_id] | dest_bit
+
+        for nid in self._ids_from_mask(upstream):
+            self._desc[nid] |= downstream
+        for nid in self._ids_from_mask(downstream):
+            self._anc[nid] |= upstream
+
+    def remove_edge(self, src_id, dest_id):
+        """
+        Remove an edge.
+
+        :param str src_id: source node id.
+        :param str dest_id: destination node id.
+        """
+        if dest_id not in self._succ.get(src_id, ()):
+            return
+
+        self._succ[src_id].discard(dest_id)
+        self._pred[dest_id].discard(src_id)
+
+        upstream = self._ids_from_mask(self._anc[src_id] | (1 << self._slots[src_id]))
+        downstream = self._ids_from_mask(self._desc[dest_id] | (1 << self._slots[dest_id]))
+        self._recompute(upstream, downstream)
+
+    def descendants(self, node_id):
+        """
+        Returns the nodes reachable from the given node.
+
+        :param str node_id: node id.
+
+        :rtype: set
+        """
+        # nodes in a cycle reach themselves
+        result = set(self._ids_from_mask(self._desc.get(node_id)))
+        result.discard(node_id)
+        return result
+
+    def ancestors(self, node_id):
+        """
+        Returns the nodes that can reach the given node.
+
+        :param str node_id: node id.
+
+        :rtype: set
+        """
+        # nodes in a cycle reach themselves
+        result = set(self._ids_from_mask(self._anc.get(node_id)))
+        result.discard(node_id)
+        return result
+
+    def has_path(self, src_id, dest_id):
+        """
+        Returns true if the destination node is downstream of the source.
+
+        :param str src_id: source node id.
+        :param str dest_id: destination node id.
+
+        :rtype: bool
+        """
+        if src_id not in self._slots or dest_id not in self._slots:
+            return False
+        return bool(self._desc[src_id] & (1 << self._slots[dest_id]))
+
+    def is_adjacent(self, node1, node2):
+        """
+        Returns true if an edge connects two nodes (in either direction).
+
+        :param str node1: node id.
+        :param str node2: node id.
+
+        :rtype: bool
+        """
+        return node2 in self._succ.get(node1, ()) or node1 in self._succ.get(node2, ())
+
+    def _ids_from_mask(self, mask):
+        """
+        Returns the node ids of the set bits in a mask.
+        """
+        result = []
+        while mask:
+            low = mask & -mask
+            result.append(self._ids[low.bit_length() - 1])
+            mask ^= low
+        return result
+
+    def _recompute(self, upstream, downstream):
+        """
+        Rebuild the descendants of the upstream nodes and the 
+        ancestors of the downstream nodes by walking the graph.
+
+        :param list upstream: node ids.
+        :param list downstream: node ids.
+        """
+        for nid in upstream:
+            if nid in self._slots:
+                self._desc[nid] = self._walk(nid, self._succ)
+        for nid in downstream:
+            if nid in self._slots:
+                self._anc[nid] = self._walk(nid, self._pred)
+
+    def _walk(self, node_id, adjacency):
+        """
+        Returns the bitmask of nodes reachable from a node.
+        """
+        mask = 0
+        stack = list(adjacency[node_id])
+        while stack:
+            nid = stack.pop()
+            bit = 1 << self._slots[nid]
+            if mask & bit:
+                continue
+            mask |= bit
+            stack.extend(adjacency[nid])
+        return mask
+
+
+class PositionStore(object):
+    """
+    Graph-wide node position storage. Positions are kept in a single 
+    (n, 2) array indexed by a dense node slot, so bulk operations
+    (offsets, snapping, bounds) can be vectorised.
+
+    Uses NumPy if available, falling back to a flat array.array.
+
+    :param int capacity: initial number of slots.
+    """
+    def __init__(self, capacity=64):
+
+        self._slots     = dict()    # {node id: slot}
+        self._ids       = []        # slot -> node id (None for free slots)
+        self._free      = []        # free slots
+        self._capacity  = capacity
+        self._data      = self._allocate(capacity)
+
+    def __len__(self):
+        return len(self._slots)
+
+    def __contains__(self, node_id):
+        return node_id in self._slots
+
+    def _allocate(self, capacity):
+        """
+        Returns new zero-filled storage for the given number of slots.
+        """
+        if np is not None:
+            return np.zeros((capacity, 2), dtype=np.float64)
+        return array.array('d', [0.0] * (capacity * 2))
+
+    def _grow(self):
+        """
+        Double the storage capacity.
+        """
+        capacity = self._capacity * 2
+        data = self._allocate(capacity)
+        if np is not None:
+            data[:self._capacity] = self._data
+        else:
+            data[:self._capacity * 2] = self._data
+        self._data = data
+        self._capacity = capacity
+
+    def clear(self):
+        """
+        Remove all positions.
+        """
+        self._slots = dict()
+        self._ids = []
+        self._free = []
+        self._data = self._allocate(self._capacity)
+
+    def add(self, node_id, pos=(0.0, 0.0)):
+        """
+        Add a node to the store.
+
+        :param str node_id: node id.
+        :param tuple pos: x, y position.
+
+        :returns: node slot.
+        :rtype: int
+        """
+        if node_id in self._slots:
+            self.set(node_id, pos)
+            return self._slots.get(node_id)
+
+        if self._free:
+            slot = self._free.pop()
+            self._ids[slot] = node_id
+        else:
+            slot = len(self._ids)
+            if slot >= self._capacity:
+                self._grow()
+            self._ids.append(node_id)
+
+        self._slots[node_id] = slot
+        self.set(node_id, pos)
+        return slot
+
+    def remove(self, node_id):
+        """
+        Remove a node from the store. Its slot is reused.
+
+        :param str node_id: node id.
+        """
+        slot = self._slots.pop(node_id, None)
+        if slot is None:
+            return
+        self._ids[slot] = None
+        self._free.append(slot)
+
+    def slot(self, node_id):
+        """
+        Returns the slot for the given node id.
+
+        :param str node_id: node id.
+
+        :rtype: int
+        """
+        return self._slots.get(node_id)
+
+    def get(self, node_id):
+        """
+        Returns the position of a node.
+
+        :param str node_id: node id.
+
+        :returns: x, y position.
+        :rtype: tuple
+        """
+        slot = self._slots.get(node_id)
+        if slot is None:
+            return
+        if np is not None:
+            return (float(self._data[slot, 0]), float(self._data[slot, 1]))
+        return (self._data[slot * 2], self._data[slot * 2 + 1])
+
+    def set(self, node_id, pos):
+        """
+        Set the position of a node.
+
+        :param str node_id: node id.
+        :param tuple pos: x, y position.
+        """
+        slot = self._slots.get(node_id)
+        if slot is None:
+            return
+        if np is not None:
+            self._data[slot] = pos[:2]
+        else:
+            self._data[slot * 2] = float(pos[0])
+            self._data[slot * 2 + 1] = float(pos[1])
+
+    def set_many(self, node_ids, positions):
+        """
+        Set the positions of many nodes at once.
+
+        :param list node_ids: node ids.
+        :param positions: x, y positions, as an (n, 2) array or a list of tuples.
+        """
+        indices = [(i, self._slots.get(nid)) for i, nid in enumerate(node_ids) if nid in self._slots]
+        rows = [i for i, slot in indices]
+        slots = [slot for i, slot in indices]
+        if np is not None:
+            self._data[slots] = np.asarray(positions, dtype=np.float64)[rows, :2]
+        else:
+            for i, s in indices:
+                self._data[s * 2] = float(positions[i][0])
+                self._data[s * 2 + 1] = float(positions[i][1])
+
+    def _indices(self, node_ids=None):
+        """
+        Returns a list of (node id, slot) for the given node ids 
+        (defaults to all nodes).
+        """
+        if node_ids is None:
+            return self._slots.items()
+        return [(nid, self._slots.get(nid)) for nid in node_ids if nid in self._slots]
+
+    def positions(self, node_ids=None):
+        """
+        Returns the positions of many nodes.
+
+        :param list node_ids: node ids to query (defaults to all nodes).
+
+        :returns: tuple of (node ids, (n, 2) positions).
+        :rtype: tuple
+        """
+        indices = self._indices(node_ids)
+        ids = [nid for nid, slot in indices]
+        slots = [slot for nid, slot in indices]
+        if np is not None:
+            return (ids, self._data[slots].copy())
+        return (ids, [(self._data[s * 2], self._data[s * 2 + 1]) for s in slots])
+
+    def offset(self, node_ids, offset):
+        """
+        Offset the positions of many nodes.
+
+        :param list node_ids: node ids to offset.
+        :param tuple offset: x, y offset.
+
+        :returns: list of updated node ids.
+        :rtype: list
+        """
+        indices = self._indices(node_ids)
+        slots = [slot for nid, slot in indices]
+        if np is not None:
+            self._data[slots] += offset[:2]
+        else:
+            for s in slots:
+                self._data[s * 2] += offset[0]
+                self._data[s * 2 + 1] += offset[1]
+        return [nid for nid, slot in indices]
+
+    def snap(self, node_ids=None, size=(10.0, 10.0)):
+        """
+        Snap node positions to a grid.
+
+        :param list node_ids: node ids to snap (defaults to all nodes).
+        :param tuple size: grid cell width & height.
+
+        :returns: list of updated node ids.
+        :rtype: list
+        """
+        indices = self._indices(node_ids)
+        slots = [slot for nid, slot in indices]
+
+        # halves are always rounded up, so both paths agree (np.round rounds half to even)
+        if np is not None:
+            cell = np.asarray(size[:2], dtype=np.float64)
+            self._data[slots] = np.floor(self._data[slots] / cell + 0.5) * cell
+        else:
+            for s in slots:
+                self._data[s * 2] = math.floor(self._data[s * 2] / size[0] + 0.5) * size[0]
+                self._data[s * 2 + 1] = math.floor(self._data[s * 2 + 1] / size[1] + 0.5) * size[1]
+        return [nid for nid, slot in indices]
+
+    def bounds(self, node_ids=None):
+        """
+        Returns the bounding box of node positions.
+
+        :param list node_ids: node ids to query (defaults to all nodes).
+
+        :returns: (xmin, ymin, xmax, ymax), or None if there are no nodes.
+        :rtype: tuple
+        """
+        indices = self._indices(node_ids)
+        if not indices:
+            return
+        slots = [slot for nid, slot in indices]
+        if np is not None:
+            data = self._data[slots]
+            xmin, ymin = data.min(axis=0)
+            xmax, ymax = data.max(axis=0)
+            return (float(xmin), float(ymin), float(xmax), float(ymax))
+        xs = [self._data[s * 2] for s in slots]
+        ys = [self._data[s * 2 + 1] for s in slots]
+        return (min(xs), min(ys), max(xs), max(ys))
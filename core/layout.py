@@ -0,0 +1,480 @@
+#!/usr/bin/env python
+from collections import OrderedDict as dict
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class LayeredLayout(object):
+    """
+    Layered (Sugiyama-style) graph layout. Nodes are arranged in layers
+    so that edges flow in one direction:
+
+        1. cycle breaking: back edges are reversed.
+        2. layer assignment: longest path layering.
+        3. crossing reduction: barycenter sweeps (long edges are split with dummy nodes).
+        4. coordinate assignment: nodes are aligned with their neighbours & compacted.
+
+    The sweeps and coordinate passes are vectorised per layer when NumPy
+    is available, falling back to plain lists.
+
+    :param float layer_spacing: space between layers.
+    :param float node_spacing: space between nodes in a layer.
+    :param float edge_spacing: space reserved for edges passing through a layer.
+    :param int iterations: number of crossing reduction sweeps.
+    :param str orientation: 'horizontal' (layers run left to right) or 'vertical' (top to bottom).
+    """
+    def __init__(self, layer_spacing=100.0, node_spacing=50.0, edge_spacing=10.0, iterations=4, orientation='horizontal'):
+
+        self.layer_spacing  = layer_spacing
+        self.node_spacing   = node_spacing
+        self.edge_spacing   = edge_spacing
+        self.iterations     = iterations
+        self.orientation    = orientation
+
+    def run(self, node_ids, edges, sizes=None, origin=(0.0, 0.0)):
+        """
+        Compute node positions. Positions are node centers.
+
+        :param list node_ids: node ids.
+        :param list edges: (src id, dest id) tuples.
+        :param dict sizes: {node id: (width, height)}.
+        :param tuple origin: minimum x & y node position.
+
+        :returns: tuple of (node ids, (n, 2) positions).
+        :rtype: tuple
+        """
+        node_ids = list(node_ids)
+        count = len(node_ids)
+        if not count:
+            return ([], [])
+
+        sizes = sizes or dict()
+        index = dict([(nid, i) for i, nid in enumerate(node_ids)])
+
+        # unique edges between the given nodes, without self loops
+        links = []
+        seen = set()
+        for src, dest in edges:
+            u = index.get(src)
+            v = index.get(dest)
+            if u is None or v is None or u == v or (u, v) in seen:
+                continue
+            seen.add((u, v))
+            links.append((u, v))
+
+        links = self._break_cycles(count, links)
+        layers = self._assign_layers(count, links)
+        layers, src, dest = self._split_long_edges(layers, links)
+
+        # extents along the layer axis & within a layer
+        horizontal = self.orientation != 'vertical'
+        along = [0.0] * count
+        across = [0.0] * count
+        for i, nid in enumerate(node_ids):
+            w, h = sizes.get(nid, (150.0, 150.0))
+            along[i], across[i] = (w, h) if horizontal else (h, w)
+
+        graph = _LayerGraph(layers, src, dest)
+        graph.order(self.iterations)
+        x, y = graph.coordinates(along, across, count, self.layer_spacing, self.node_spacing, self.edge_spacing, self.iterations)
+
+        if not horizontal:
+            x, y = y, x
+
+        if np is not None:
+            pos = np.column_stack((x[:count], y[:count]))
+            pos -= pos.min(axis=0) - np.asarray(origin[:2], dtype=np.float64)
+            return (node_ids, pos)
+
+        xmin = min(x[:count])
+        ymin = min(y[:count])
+        pos = [(x[i] - xmin + origin[0], y[i] - ymin + origin[1]) for i in range(count)]
+        return (node_ids, pos)
+
+    def _break_cycles(self, count, links):
+        """
+        Reverse the back edges found by a depth-first search,
+        starting from the source nodes.
+
+        :param int count: number of nodes.
+        :param list links: (src, dest) index tuples.
+
+        :returns: acyclic (src, dest) index tuples.
+        :rtype: list
+        """
+        succ = [[] for i in range(count)]
+        indegree = [0] * count
+        for u, v in links:
+            succ[u].append(v)
+            indegree[v] += 1
+
+        roots = [i for i in range(count) if not indegree[i]]
+        roots.extend([i for i in range(count) if indegree[i]])
+
+        # 0 - unvisited, 1 - on the stack, 2 - done
+        state = [0] * count
+        back = set()
+        for root in roots:
+            if state[root]:
+                continue
+
+            state[root] = 1
+            stack = [(root, iter(succ[root]))]
+            while stack:
+                u, children = stack[-1]
+                for v in children:
+                    if not state[v]:
+                        state[v] = 1
+                        stack.append((v, iter(succ[v])))
+                        break
+                    if state[v] == 1:
+                        back.add((u, v))
+                else:
+                    state[u] = 2
+                    stack.pop()
+
+        if not back:
+            return links
+
+        result = []
+        seen = set()
+        for u, v in links:
+            if (u, v) in back:
+                u, v = v, u
+            if (u, v) not in seen:
+                seen.add((u, v))
+                result.append((u, v))
+        return result
+
+    def _assign_layers(self, count, links):
+        """
+        Longest path layering of an acyclic graph. Source nodes are
+        then pulled towards their successors to shorten edges.
+
+        :param int count: number of nodes.
+        :param list links: acyclic (src, dest) index tuples.
+
+        :returns: layer of each node.
+        :rtype: list
+        """
+        succ = [[] for i in range(count)]
+        indegree = [0] * count
+        for u, v in links:
+            succ[u].append(v)
+            indegree[v] += 1
+
+        layers = [0] * count
+        queue = [i for i in range(count) if not indegree[i]]
+        sources = list(queue)
+        for u in queue:
+            for v in succ[u]:
+                if layers[u] + 1 > layers[v]:
+                    layers[v] = layers[u] + 1
+                indegree[v] -= 1
+                if not indegree[v]:
+                    queue.append(v)
+
+        for u in sources:
+            if succ[u]:
+                layers[u] = min([layers[v] for v in succ[u]]) - 1
+        return layers
+
+    def _split_long_edges(self, layers, links):
+        """
+        Split edges spanning more than one layer with dummy nodes,
+        so every edge connects adjacent layers.
+
+        :param list layers: layer of each node.
+        :param list links: (src, dest) index tuples.
+
+        :returns: tuple of (layers, edge sources, edge destinations) including dummy nodes.
+        :rtype: tuple
+        """
+        if np is not None:
+            layers = np.asarray(layers, dtype=np.int64)
+            src = np.asarray([u for u, v in links], dtype=np.int64)
+            dest = np.asarray([v for u, v in links], dtype=np.int64)
+
+            # each edge becomes a chain of (span + 1) links through (span) dummy nodes
+            spans = layers[dest] - layers[src] - 1
+            dummies = np.cumsum(spans) - spans
+            steps = np.repeat(np.arange(len(src)), spans + 1)
+            chain = np.arange(len(steps)) - np.repeat(np.cumsum(spans + 1) - (spans + 1), spans + 1)
+            base = len(layers) + dummies[steps]
+
+            link_src = np.where(chain == 0, src[steps], base + chain - 1)
+            link_dest = np.where(chain == spans[steps], dest[steps], base + chain)
+            dummy_layers = np.repeat(layers[src] + 1, spans) + np.arange(spans.sum()) - np.repeat(dummies, spans)
+            return (np.concatenate((layers, dummy_layers)), link_src, link_dest)
+
+        layers = list(layers)
+        src = []
+        dest = []
+        for u, v in links:
+            prev = u
+            for layer in range(layers[u] + 1, layers[v]):
+                dummy = len(layers)
+                layers.append(layer)
+                src.append(prev)
+                dest.append(dummy)
+                prev = dummy
+            src.append(prev)
+            dest.append(v)
+        return (layers, src, dest)
+
+
+class _LayerGraph(object):
+    """
+    Proper layered graph used by LayeredLayout. Vertices are
+    renumbered so each layer is a contiguous block.
+
+    :param list layers: layer of each vertex.
+    :param list src: edge source vertices.
+    :param list dest: edge destination vertices (in the next layer).
+    """
+    def __init__(self, layers, src, dest):
+
+        count = len(layers)
+        self.layer_count = int(max(layers)) + 1
+
+        if np is not None:
+            self.vertices   = np.argsort(layers, kind='mergesort')             # block index -> vertex
+            blocks          = np.empty(count, dtype=np.int64)                   # vertex -> block index
+            blocks[self.vertices] = np.arange(count)
+
+            starts          = np.zeros(self.layer_count + 1, dtype=np.int64)
+            starts[1:]      = np.cumsum(np.bincount(layers, minlength=self.layer_count))
+            self.starts     = starts.tolist()
+
+            self.layers     = layers[self.vertices]
+            self.src        = blocks[src]
+            self.dest       = blocks[dest]
+
+            # position of each vertex in its layer
+            self.pos        = (np.arange(count) - starts[self.layers]).astype(np.float64)
+        else:
+            self.vertices   = sorted(range(count), key=layers.__getitem__)
+            blocks          = [0] * count
+            for i, vertex in enumerate(self.vertices):
+                blocks[vertex] = i
+
+            self.starts     = [0] * (self.layer_count + 1)
+            for layer in layers:
+                self.starts[layer + 1] += 1
+            for layer in range(self.layer_count):
+                self.starts[layer + 1] += self.starts[layer]
+
+            self.layers     = [layers[v] for v in self.vertices]
+            self.src        = [blocks[u] for u in src]
+            self.dest       = [blocks[v] for v in dest]
+            self.pos        = [i - self.starts[self.layers[i]] for i in range(count)]
+
+        # edges grouped by destination & source layer
+        self.down           = self._group(self.dest)
+        self.up             = self._group(self.src)
+
+    def _group(self, ends):
+        """
+        Returns edge indices grouped by the layer of the given edge ends.
+        """
+        if np is not None:
+            keys = self.layers[ends]
+            edges = np.argsort(keys, kind='mergesort')
+            bounds = np.zeros(self.layer_count + 1, dtype=np.int64)
+            bounds[1:] = np.cumsum(np.bincount(keys, minlength=self.layer_count))
+            return [edges[bounds[i]:bounds[i + 1]] for i in range(self.layer_count)]
+
+        groups = [[] for i in range(self.layer_count)]
+        for i, vertex in enumerate(ends):
+            groups[self.layers[vertex]].append(i)
+        return groups
+
+    def _neighbours(self, layer, downward):
+        """
+        Returns (vertices in the layer, their neighbours in the previous
+        layer of the sweep) for each edge.
+        """
+        if downward:
+            edges = self.down[layer]
+            if np is not None:
+                return (self.dest[edges], self.src[edges])
+            return ([self.dest[i] for i in edges], [self.src[i] for i in edges])
+
+        edges = self.up[layer]
+        if np is not None:
+            return (self.src[edges], self.dest[edges])
+        return ([self.src[i] for i in edges], [self.dest[i] for i in edges])
+
+    def _barycenters(self, layer, values, downward):
+        """
+        Returns the mean neighbour value of each vertex in a layer,
+        or the vertex's own value if it has no neighbours.
+
+        :param int layer: layer index.
+        :param values: value of each vertex.
+        :param bool downward: use the neighbours in the previous layer.
+        """
+        start = self.starts[layer]
+        size = self.starts[layer + 1] - start
+        vertices, neighbours = self._neighbours(layer, downward)
+
+        if np is not None:
+            current = values[start:start + size]
+            if not len(vertices):
+                return current.copy()
+            local = vertices - start
+            sums = np.bincount(local, weights=values[neighbours], minlength=size)
+            counts = np.bincount(local, minlength=size)
+            return np.where(counts > 0, sums / np.maximum(counts, 1), current)
+
+        sums = [0.0] * size
+        counts = [0] * size
+        for vertex, neighbour in zip(vertices, neighbours):
+            sums[vertex - start] += values[neighbour]
+            counts[vertex - start] += 1
+        return [sums[i] / counts[i] if counts[i] else values[start + i] for i in range(size)]
+
+    def _sorted(self, layer):
+        """
+        Returns the vertices of a layer, in layer order.
+        """
+        start = self.starts[layer]
+        end = self.starts[layer + 1]
+        if np is not None:
+            return start + np.argsort(self.pos[start:end], kind='mergesort')
+        return sorted(range(start, end), key=self.pos.__getitem__)
+
+    def order(self, iterations):
+        """
+        Reduce edge crossings with alternating barycenter sweeps.
+
+        :param int iterations: number of sweeps.
+        """
+        for i in range(iterations):
+            downward = not i % 2
+            layers = range(1, self.layer_count) if downward else range(self.layer_count - 2, -1, -1)
+            for layer in layers:
+                start = self.starts[layer]
+                end = self.starts[layer + 1]
+                keys = self._barycenters(layer, self.pos, downward)
+                if np is not None:
+                    ranks = np.empty(end - start, dtype=np.float64)
+                    ranks[np.argsort(keys, kind='mergesort')] = np.arange(end - start)
+                    self.pos[start:end] = ranks
+                else:
+                    for rank, index in enumerate(sorted(range(end - start), key=keys.__getitem__)):
+                        self.pos[start + index] = rank
+
+    def coordinates(self, along, across, count, layer_spacing, node_spacing, edge_spacing, iterations):
+        """
+        Assign vertex center coordinates. Layers are placed along the x axis,
+        vertices are aligned with their neighbours and compacted along y.
+
+        :param list along: real vertex extents along the layer axis.
+        :param list across: real vertex extents within a layer.
+        :param int count: number of real (non-dummy) vertices.
+
+        :returns: x & y center coordinates, indexed by original vertex.
+        :rtype: tuple
+        """
+        size = len(self.vertices)
+
+        if np is not None:
+            # dummy vertices have no extent
+            real = self.vertices < count
+            extents = np.zeros((size, 2), dtype=np.float64)
+            extents[real] = np.column_stack((along, across))[self.vertices[real]]
+            along = extents[:, 0]
+            half = extents[:, 1] / 2.0
+            gaps = np.where(real, node_spacing, edge_spacing)
+
+            widths = np.zeros(self.layer_count, dtype=np.float64)
+            np.maximum.at(widths, self.layers, along)
+            offsets = np.cumsum(widths + layer_spacing) - (widths + layer_spacing)
+            x = (offsets + widths / 2.0)[self.layers]
+
+            y = np.zeros(size, dtype=np.float64)
+            order = [self._sorted(layer) for layer in range(self.layer_count)]
+            for layer in range(self.layer_count):
+                vertices = order[layer]
+                steps = half[vertices] * 2 + gaps[vertices]
+                y[vertices] = np.cumsum(steps) - steps + half[vertices]
+
+            for i in range(iterations):
+                downward = not i % 2
+                layers = range(1, self.layer_count) if downward else range(self.layer_count - 2, -1, -1)
+                for layer in layers:
+                    start = self.starts[layer]
+                    vertices = order[layer]
+                    if not len(vertices):
+                        continue
+                    desired = self._barycenters(layer, y, downward)[vertices - start]
+
+                    # keep the layer order: each vertex starts below the previous one
+                    steps = half[vertices] * 2 + gaps[vertices]
+                    minimum = np.cumsum(steps) - steps + half[vertices]
+                    compact = np.maximum.accumulate(desired - minimum) + minimum
+                    y[vertices] = compact + (desired - compact).mean()
+
+            result_x = np.empty(size, dtype=np.float64)
+            result_y = np.empty(size, dtype=np.float64)
+            result_x[self.vertices] = x
+            result_y[self.vertices] = y
+            return (result_x, result_y)
+
+        along = [along[v] if v < count else 0.0 for v in self.vertices]
+        across = [across[v] if v < count else 0.0 for v in self.vertices]
+        gaps = [node_spacing if v < count else edge_spacing for v in self.vertices]
+
+        widths = [0.0] * self.layer_count
+        for i in range(size):
+            widths[self.layers[i]] = max(widths[self.layers[i]], along[i])
+
+        offsets = []
+        offset = 0.0
+        for width in widths:
+            offsets.append(offset + width / 2.0)
+            offset += width + layer_spacing
+        x = [offsets[self.layers[i]] for i in range(size)]
+
+        y = [0.0] * size
+        order = [self._sorted(layer) for layer in range(self.layer_count)]
+        for vertices in order:
+            top = 0.0
+            for v in vertices:
+                y[v] = top + across[v] / 2.0
+                top += across[v] + gaps[v]
+
+        for i in range(iterations):
+            downward = not i % 2
+            layers = range(1, self.layer_count) if downward else range(self.layer_count - 2, -1, -1)
+            for layer in layers:
+                start = self.starts[layer]
+                vertices = order[layer]
+                if not vertices:
+                    continue
+                barycenters = self._barycenters(layer, y, downward)
+                desired = [barycenters[v - start] for v in vertices]
+
+                compact = []
+                top = 0.0
+                floor = None
+                for v, d in zip(vertices, desired):
+                    minimum = top + across[v] / 2.0
+                    floor = d - minimum if floor is None else max(floor, d - minimum)
+                    compact.append(floor + minimum)
+                    top += across[v] + gaps[v]
+
+                shift = sum([d - c for d, c in zip(desired, compact)]) / len(compact)
+                for v, c in zip(vertices, compact):
+                    y[v] = c + shift
+
+        result_x = [0.0] * size
+        result_y = [0.0] * size
+        for i, v in enumerate(self.vertices):
+            result_x[v] = x[i]
+            result_y[v] = y[i]
+        return (result_x, result_y)
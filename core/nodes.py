@@ -28,10 +28,16 @@ class Node(object):
         self._attributes            = dict()
         self._metadata              = Metadata(self)
 
+        # connection name caches (kept in sync with _attributes)
+        self._inputs                = []
+        self._outputs               = []
+        self._connections           = []
+
         # event handlers
-        self.nodeNameChanged        = EventHandler(self)
+        self.nodeNameChanged        = EventHandler(self, batched=False)
         self.nodePositionChanged    = EventHandler(self)
         self.nodeAttributeUpdated   = EventHandler(self)
+        self.nodeConnectionsChanged = EventHandler(self)
 
         # basic node attributes        
         self.name                   = name if name else self.default_name
@@ -71,6 +77,7 @@ class Node(object):
                     self._attributes.get(attr_name).update(**properties)
                 else:
                     self.add_attr(attr_name, **properties)
+            self._rebuild_connection_cache()
 
     def __str__(self):
         return json.dumps(self.data, default=lambda obj: obj.data, indent=4)
@@ -90,7 +97,8 @@ class Node(object):
 
     def __setattr__(self, name, value):
         if name in ['_attributes', '_changed', '_widget', '_metadata', 'nodeNameChanged', 
-                    'nodePositionChanged', 'nodeAttributeUpdated']:
+                    'nodePositionChanged', 'nodeAttributeUpdated', 'nodeConnectionsChanged', 
+                    '_inputs', '_outputs', '_connections', '_pos']:
             super(Node, self).__setattr__(name, value)
 
         elif name in self._attributes:            
@@ -106,13 +114,13 @@ class Node(object):
                 if valid_names:
                     value = valid_names[0]
 
-            elif name == 'pos':
-                self.nodePositionChanged(pos=value)
+            super(Node, self).__setattr__(name, value)
 
+            # observers read the new value from the node
+            if name == 'pos':
+                self.nodePositionChanged(pos=value)
             else:
                 self.nodeAttributeUpdated(**{name:value})
-            
-            super(Node, self).__setattr__(name, value)
 
     @property
     def data(self):
@@ -155,6 +163,42 @@ class Node(object):
     def graph(self):
         return self._graph
 
+    @property
+    def event_scope(self):
+        """
+        Returns the batch scope of the node events (see Graph.batch).
+
+        :rtype: EventScope
+        """
+        graph = self.__dict__.get('_graph', None)
+        return getattr(graph, 'event_scope', None)
+
+    @property
+    def pos(self):
+        """
+        Returns the node position. Once the node is added to a graph
+        the position is read from the graph position store.
+
+        :returns: x, y position.
+        :rtype: tuple
+        """
+        graph = self.__dict__.get('_graph', None)
+        if graph is not None and hasattr(graph, 'positions'):
+            pos = graph.positions.get(self.__dict__.get('id', None))
+            if pos is not None:
+                return pos
+        return self._pos
+
+    @pos.setter
+    def pos(self, value):
+        self._pos = tuple(value)
+
+        # write the graph position store directly, so the new position 
+        # can be read back while position events are batched.
+        graph = self.__dict__.get('_graph', None)
+        if graph is not None and hasattr(graph, 'set_position'):
+            graph.set_position(self.__dict__.get('id', None), self._pos)
+
     @graph.setter
     def graph(self, value):
         self._graph = value
@@ -225,7 +269,15 @@ class Node(object):
         attr_type = kwargs.get('attr_type', None)
         #print '\t"%s.%s" type: %s' %(self.name, name, attr_type)
         attr = Attribute(name, value, dagnode=self, **kwargs)
+        exists = attr.name in self._attributes
         self._attributes.update({attr.name:attr})
+
+        # replacing an attribute may change its connection type,
+        # so rebuild to preserve ordering. New attributes are appended.
+        if exists:
+            self._rebuild_connection_cache()
+        elif self._cache_connection(attr):
+            self.nodeConnectionsChanged()
         return attr
 
     def get_attr(self, name):
@@ -257,6 +309,40 @@ class Node(object):
         attr = self._attributes.pop(name)
         attr.name = new_name
         self._attributes.update({attr.name:attr})
+        self._rebuild_connection_cache()
+
+    def _cache_connection(self, attr):
+        """
+        Add a connectable attribute to the connection caches.
+
+        :param Attribute attr: attribute to cache.
+
+        :returns: attribute was cached.
+        :rtype: bool
+        """
+        if not attr.connectable:
+            return False
+
+        self._connections.append(attr.name)
+        if attr.connection_type == 'input':
+            self._inputs.append(attr.name)
+
+        elif attr.connection_type == 'output':
+            self._outputs.append(attr.name)
+        return True
+
+    def _rebuild_connection_cache(self):
+        """
+        Rebuild the connection caches from the current attributes. 
+        Only needs to run when attributes are renamed, removed or
+        have their connection properties changed.
+        """
+        self._inputs = []
+        self._outputs = []
+        self._connections = []
+        for attr in self._attributes.values():
+            self._cache_connection(attr)
+        self.nodeConnectionsChanged()
 
     #- Plugins/Metadata ----
     @property
@@ -285,34 +371,33 @@ class Node(object):
         """
         return SCENEGRAPH_PLUGIN_PATH in self.plugin_file
 
-    def read_metadata(self, verbose=False):
+    @classmethod
+    def metadata_files(cls, verbose=False):
         """
-        Initialize node metadata from metadata files on disk.
-        Metadata is parsed by looking at the __bases__ of each node
-        class (ie: all DagNode subclasses will inherit all of the default
-        DagNode attributes).
+        Returns the metadata files for this node class and its base
+        classes, in the order they are parsed. Files may not exist.
+
+        :returns: list of (class name, metadata file).
+        :rtype: list
         """
         import inspect
-        parser = MetadataParser()
 
-        node_metadata = dict()
-        if verbose:
-            print '\n# DEBUG: building metadata for: "%s" ' % self.Class()
         # query the base classes
-        result = [self.__class__,]
-        for pc in self.ParentClasses():
+        result = [cls,]
+        for pc in cls.ParentClasses():
             if pc.__name__ != 'Node':
                 result.append(pc)
         
         sg_core_path = os.path.join(SCENEGRAPH_CORE, 'nodes.py')
 
-        for cls in reversed(result):
-            cname = cls.__name__
-            src_file = inspect.getfile(cls)
+        metadata_files = []
+        for base in reversed(result):
+            cname = base.__name__
+            src_file = inspect.getfile(base)
 
             node_type = None
-            if hasattr(cls, 'node_type'):
-                node_type = cls.node_type
+            if hasattr(base, 'node_type'):
+                node_type = base.node_type
 
             py_src = src_file.rstrip('c')
             if verbose:
@@ -334,6 +419,24 @@ class Node(object):
                     if verbose:
                         print '     - metadata file for "%s": "%s"' % (cname, metadata_filename)
 
+            metadata_files.append((cname, metadata_filename))
+        return metadata_files
+
+    @classmethod
+    def read_metadata(cls, verbose=False):
+        """
+        Initialize node metadata from metadata files on disk.
+        Metadata is parsed by looking at the __bases__ of each node
+        class (ie: all DagNode subclasses will inherit all of the default
+        DagNode attributes).
+        """
+        parser = MetadataParser()
+
+        node_metadata = dict()
+        if verbose:
+            print '\n# DEBUG: building metadata for: "%s" ' % cls.__name__
+
+        for cname, metadata_filename in cls.metadata_files(verbose=verbose):
             if not os.path.exists(metadata_filename):
                 if not verbose:
                     log.warning('plugin description file "%s" does not exist.' % metadata_filename)
@@ -368,7 +471,8 @@ class Node(object):
     def dag_types(self):
         return [c.__name__ for c in Node.__subclasses__()]
 
-    def ParentClasses(self, p=None):
+    @classmethod
+    def ParentClasses(cls, p=None):
         """
         Returns all of this objects' parent classes.
 
@@ -378,11 +482,11 @@ class Node(object):
         :rtype: list
         """
         base_classes = []
-        cl = p if p is not None else self.__class__
+        cl = p if p is not None else cls
         for b in cl.__bases__:
             if b.__name__ not in ["object"]:
                 base_classes.append(b)
-                base_classes.extend(self.ParentClasses(b))
+                base_classes.extend(cls.ParentClasses(b))
         return base_classes
 
 
@@ -408,13 +512,14 @@ class DagNode(Node):
                     self._attributes.get(attr_name).update(**properties)
                 else:
                     self.add_attr(attr_name, **properties)
+            self._rebuild_connection_cache()
 
     #- Transform ----
     @property
     def expanded(self):
         if self.force_expand:
             return True
-        height = max(len(self.inputs), len(self.outputs))
+        height = max(len(self._inputs), len(self._outputs))
         return height > 1
 
     def evaluate(self):
@@ -433,7 +538,7 @@ class DagNode(Node):
         :rtype: float
         """
         btm_buffer = 0
-        max_conn = max(len(self.inputs), len(self.outputs))
+        max_conn = max(len(self._inputs), len(self._outputs))
         height = max_conn if max_conn else 1
         if height > 1 or self.force_expand:
             height+=1
@@ -575,11 +680,7 @@ class DagNode(Node):
         returns:
             (list) - list of connection names.
         """
-        conn_names = []
-        for name in self._attributes:
-            if self._attributes.get(name).connectable:
-                conn_names.append(name)
-        return conn_names
+        return list(self._connections)
 
     @property
     def inputs(self):
@@ -589,13 +690,7 @@ class DagNode(Node):
         :returns: list of input connection names.
         :rtype: list
         """
-        connections = []
-        for name in self._attributes:
-            data = self._attributes.get(name)
-            #if data.get('connectable') and data.get('connection_type') == 'output':
-            if data.connectable and data.connection_type == 'input':
-                connections.append(name)
-        return connections
+        return list(self._inputs)
 
     @property
     def outputs(self):
@@ -605,13 +700,7 @@ class DagNode(Node):
         :returns: list of output connection names.
         :rtype: list
         """
-        connections = []
-        for name in self._attributes:
-            data = self._attributes.get(name)
-            #if data.get('connectable') and data.get('connection_type') == 'output':
-            if data.connectable and data.connection_type == 'output':
-                connections.append(name)
-        return connections
+        return list(self._outputs)
 
     def get_input(self, name='input'):
         """
@@ -660,7 +749,7 @@ class DagNode(Node):
         conn = self.get_connection(name)
         if not conn:
             return False
-        return not conn.connectable
+        return conn.is_connected
 
     def input_connections(self):
         """
@@ -670,12 +759,13 @@ class DagNode(Node):
         :rtype: list
         """
         connected_nodes = []
-        for edge in self.graph.network.edges(data=True):
-            # edge = (id, id, {atttributes})
-            srcid, destid, attrs = edge
-            if destid == self.id:
-                if srcid in self.graph.dagnodes:
-                    connected_nodes.append(self.graph.dagnodes.get(srcid))
+        if self.graph is None or self.id not in self.graph.network:
+            return connected_nodes
+
+        # predecessor adjacency: cost scales with node degree
+        for srcid in self.graph.network.pred[self.id]:
+            if srcid in self.graph.dagnodes:
+                connected_nodes.append(self.graph.dagnodes.get(srcid))
         return connected_nodes
 
     def output_connections(self):
@@ -686,14 +776,45 @@ class DagNode(Node):
         :rtype: list
         """
         connected_nodes = []
-        for edge in self.graph.network.edges(data=True):
-            # edge = (id, id, {atttributes})
-            srcid, destid, attrs = edge
-            if srcid == self.id:
-                if destid in self.graph.dagnodes:
-                    connected_nodes.append(self.graph.dagnodes.get(destid))
+        if self.graph is None or self.id not in self.graph.network:
+            return connected_nodes
+
+        # successor adjacency: cost scales with node degree
+        for destid in self.graph.network.succ[self.id]:
+            if destid in self.graph.dagnodes:
+                connected_nodes.append(self.graph.dagnodes.get(destid))
         return connected_nodes
 
+    def input_sources(self, name=None):
+        """
+        Returns the upstream nodes & attributes feeding each 
+        named input.
+
+        :param str name: query a single input.
+
+        :returns: dictionary of {input name: [(DagNode, attribute name),]}
+        :rtype: dict
+        """
+        sources = dict()
+        inputs = self._inputs if name is None else [name]
+        for input_name in inputs:
+            sources[input_name] = []
+
+        if self.graph is None or self.id not in self.graph.network:
+            return sources
+
+        # pred = {src id: {edge key: {edge attributes}}}
+        for srcid, edges in self.graph.network.pred[self.id].iteritems():
+            if srcid not in self.graph.dagnodes:
+                continue
+
+            src_dag = self.graph.dagnodes.get(srcid)
+            for key, attrs in edges.iteritems():
+                dest_attr = attrs.get('dest_attr')
+                if dest_attr in sources:
+                    sources.get(dest_attr).append((src_dag, attrs.get('src_attr')))
+        return sources
+
     @property
     def is_input_connection(self):
         """
@@ -745,7 +866,14 @@ class DagNode(Node):
         """
         conn = self.get_connection(old)
         if conn:
+            if new in self._attributes:
+                log.warning('attribute "%s" already exists.' % new)
+                return False
+
+            # re-key the attribute so lookups by the new name work.
+            self._attributes = dict((new if k == old else k, v) for k, v in self._attributes.iteritems())
             conn.name = new
+            self._rebuild_connection_cache()
             return True
         return False
 
@@ -761,7 +889,11 @@ class DagNode(Node):
         conn = self.get_connection(name)
         if conn:
             self._attributes.pop(name)
+            for cache in [self._inputs, self._outputs, self._connections]:
+                if name in cache:
+                    cache.remove(name)
             del conn 
+            self.nodeConnectionsChanged()
             return True 
         return False
 
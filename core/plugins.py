@@ -2,13 +2,18 @@
 import os
 import re
 import sys
+import ast
+import imp
 import pkgutil
 import inspect
+import copy
 import time
+import hashlib
+import threading
 import simplejson as json
 
-from SceneGraph.core import log
-from SceneGraph.options import SCENEGRAPH_PATH, SCENEGRAPH_CORE, SCENEGRAPH_PLUGIN_PATH, SCENEGRAPH_ICON_PATH, SCENEGRAPH_METADATA_PATH
+from SceneGraph.core import log, EventHandler
+from SceneGraph.options import PACKAGE, SCENEGRAPH_PATH, SCENEGRAPH_CORE, SCENEGRAPH_PLUGIN_PATH, SCENEGRAPH_ICON_PATH, SCENEGRAPH_METADATA_PATH, SCENEGRAPH_PLUGIN_MANIFEST
 
 
 
@@ -21,29 +26,27 @@ class PluginManager(object):
     PluginManager will scan for directories on the PYTHONPATH.
 
     run with PluginManager.load_plugins()
+
+    Plugin classes are discovered by reading the plugin source files (see 
+    PluginManifest), modules are only imported when a node type is first 
+    requested. Plugin data is shared by all managers in a process (see 
+    PluginRegistry), enabling or disabling a plugin only affects this manager.
     """
     def __init__(self, paths=[], **kwargs):
 
-        # storage for plugin data
-        self._node_data              = dict()    
+        # plugin data is shared by all managers, enabled 
+        # states are stored per-manager.
+        self._registry               = kwargs.get('registry', None) or PluginRegistry.instance()
+        self._enabled                = dict()
 
-        # plugin paths & module data
-        self._core_plugin_path       = SCENEGRAPH_CORE
-        self._builtin_plugin_path    = SCENEGRAPH_PLUGIN_PATH
-        self._default_plugin_path    = SCENEGRAPH_PLUGIN_PATH
-        self._default_modules        = get_modules(self._default_plugin_path)
+        # resolved node types (see PluginManager.resolve)
+        self._node_types             = dict()
+        self._node_types_revision    = None
 
         # external paths & module
         self._external_plugin_paths  = paths
         self._external_modules       = []
 
-        # load core nodes
-        self.load_core()
-
-        # auto-load default plugins
-        self.load_plugins(self._default_plugin_path)
-        self.load_widgets(self._default_plugin_path)
-
         # setup external paths
         if not self._external_plugin_paths:
             self._external_plugin_paths = self.initializeExternalPaths()
@@ -69,7 +72,7 @@ class PluginManager(object):
         :returns: plugin scan paths.
         :rtype: tuple 
         """
-        result = (self._default_plugin_path,)
+        result = (self.default_plugin_path,)
         if self._external_plugin_paths:
             for path in self._external_plugin_paths:
                 result = result + (path,)
@@ -175,7 +178,7 @@ class PluginManager(object):
         :returns: current default plugin path.
         :rtype: str
         """
-        return self._default_plugin_path
+        return self._registry.default_plugin_path
 
     @default_plugin_path.setter
     def default_plugin_path(self, path):
@@ -187,9 +190,7 @@ class PluginManager(object):
         :returns: current default plugin path.
         :rtype: str
         """
-        if path != self._default_plugin_path:
-            self.flush()
-            self._default_plugin_path = path
+        self._registry.default_plugin_path = path
         return self.default_plugin_path
 
     @property
@@ -200,7 +201,24 @@ class PluginManager(object):
         :returns: list of default plugin module names.
         :rtype: list
         """
-        return self._default_modules
+        return self._registry.default_modules
+
+    @property
+    def _node_data(self):
+        """
+        Returns plugin data from the shared registry, with this 
+        manager's enabled states applied.
+
+        :returns: dictionary of node type, plugin data.
+        :rtype: dict
+        """
+        result = dict()
+        for node_type, plugin_attrs in self._registry.node_data().iteritems():
+            plugin_attrs = dict(plugin_attrs)
+            if node_type in self._enabled:
+                plugin_attrs.update(enabled=self._enabled.get(node_type))
+            result[node_type] = plugin_attrs
+        return result
 
     @property
     def external_plugin_paths(self):
@@ -223,232 +241,136 @@ class PluginManager(object):
         return self._external_modules  
 
     #- Loading ----
-
     def load_core(self, plugins=[]):
         """
-        Load core node types.
+        Load core node types into the shared plugin registry.
 
         :param list plugins: plugin names to filter.
         """
-        log.info('loading plugins...')
-
-        core_path = SCENEGRAPH_CORE
-        widget_path = os.path.join(SCENEGRAPH_PATH, 'ui')
-
-        builtins = self._load_core(core_path, plugins=plugins)
-        #print '# DEBUG: core nodes loaded: ', builtins
-        self.load_widgets(widget_path, plugins=builtins)
+        self._registry.load_core(plugins=plugins)
 
-    def _load_core(self, path, plugins=[]):
+    def load_plugins(self, path=None, plugins=[]):
         """
-        Dynamically load all submodules/asset classes
-        in this package.
+        Load built-in and external asset types into the shared plugin registry.
 
         :param str path: path to scan.
         :param list plugins: plugin names to filter.
-
-        :returns: list of loaded plugin names.
-        :rtype: list
         """
-        imported = []
-        fexpr = re.compile(r"(?P<basename>.+?)(?P<fext>\.[^.]*$|$)")
-
-        for loader, mod_name, is_pkg in pkgutil.walk_packages([path]):
-            module = loader.find_module(mod_name).load_module(mod_name)
-
-            modfn = module.__file__
-            src_file = None
-            md_file  = None
-            fnmatch = re.search(fexpr, modfn)
-
-            if fnmatch:
-                bn = fnmatch.group('basename')
-                bfn = os.path.basename(bn)
-                src_file = os.path.join('%s.py' % bn)
-            
-            # filter DagNode types
-            for cname, obj in inspect.getmembers(module, inspect.isclass):
-
-                # plugins need to have two attributes: node_type & node_class
-                node_type = None
-                node_class = None
-                node_category = None
-
-                if not hasattr(obj, 'node_type') or not hasattr(obj, 'node_class'):
-                    # keep moving
-                    continue
-
-                node_type = getattr(obj, 'node_type')
-                node_class = getattr(obj, 'node_class')
-
-                # for now, "node_category" is not required
-                if getattr(obj, 'node_category'):
-                    node_category = obj.node_category
-
-
-                if cname not in globals():
-                    globals()[cname] = obj
-
-                imported.append(node_type)
-                # raw_data = pkgutil.get_data('mod.components', 'data.txt')            
-                self._node_data.update({node_type:{'dagnode':globals()[cname], 'metadata':None, 'source':None, 'enabled':True, 'category':node_category, 'class':node_class}})
+        self._registry.load_plugins(path, plugins=plugins)
 
-                # add source and metadata files
-                if os.path.exists(src_file):
-                    self._node_data.get(node_type).update(source=src_file)
-
-                #if os.path.exists(md_file):
-                md_file = os.path.join(SCENEGRAPH_METADATA_PATH, '%s.mtd' % node_type)
-                if os.path.exists(md_file):
-                    self._node_data.get(node_type).update(metadata=md_file)
-
-        return sorted(list(set(imported)))
-
-    def load_plugins(self, path=None, plugins=[]):
+    def load_widgets(self, path=None, plugins=[]):
         """
-        Load built-in and external asset types
-
-         .. todo::: load the external plugins as well.
+        Load built-in and external node widgets into the shared plugin registry.
 
         :param str path: path to scan.
         :param list plugins: plugin names to filter.
         """
-        log.info('loading plugins...')
-
-        if path is None:
-            path = self.default_plugin_path
+        self._registry.load_widgets(path, plugins=plugins)
 
-        builtins = self._load_builtins(path, plugins=plugins)
-
-    def _load_builtins(self, path, plugins=[]):
+    def refresh(self):
         """
-        Dynamically load all submodules/asset classes
-        in this package.
+        Rescan all plugin paths. Affects all graphs sharing the plugin registry.
+        """
+        self._registry.refresh()
 
-        :param str path: path to scan.
-        :param list plugins: plugin names to filter.
+    def reload(self):
+        """
+        Reload plugins whose source or metadata files have changed. Affects
+        all graphs sharing the plugin registry.
 
-        :returns: list of loaded plugin names.
+        :returns: list of reloaded node types.
         :rtype: list
         """
-        imported = []
-        fexpr = re.compile(r"(?P<basename>.+?)(?P<fext>\.[^.]*$|$)")
-
-        for loader, mod_name, is_pkg in pkgutil.walk_packages([path]):
-            module = loader.find_module(mod_name).load_module(mod_name)
-
-            modfn = module.__file__
-            src_file = None
-            md_file  = None
-            
-            fnmatch = re.search(fexpr, modfn)
-            if fnmatch:
-                src_file = '%s.py' % fnmatch.group('basename')
-                md_file = '%s.mtd' % fnmatch.group('basename')
-
-            # filter DagNode types
-            for cname, obj in inspect.getmembers(module, inspect.isclass):
-                
-                # plugins need to have two attributes: node_type & node_class
-                node_type = None
-                node_class = None
-                node_category = None
+        return self._registry.reload()
 
-                if not hasattr(obj, 'node_type') or not hasattr(obj, 'node_class'):
-                    # keep moving
-                    continue
-
-                node_type = getattr(obj, 'node_type')
-                node_class = getattr(obj, 'node_class')
-
-                if not plugins or node_type in plugins:
-
-                    # for now, "node_category" is not required
-                    if getattr(obj, 'node_category'):
-                        node_category = obj.node_category
-                        
-                    if cname not in globals():
-                        globals()[cname] = obj
-
-                    imported.append(node_type)                
-                    self._node_data.update({node_type:{'dagnode':globals()[cname], 'metadata':None, 'source':None, 'enabled':True, 'category':node_category, 'class':node_class}})
+    def load_external_plugins(self, background=True):
+        """
+        Load plugins from the external plugin paths (SCENEGRAPH_PLUGIN_PATH). 
+        Loaded node types are announced with PluginRegistry.pluginsLoaded.
 
-                    # add source and metadata files
-                    if os.path.exists(src_file):
-                        self._node_data.get(node_type).update(source=src_file)
+        :param bool background: load plugins on a worker thread.
 
-                    if os.path.exists(md_file):
-                        self._node_data.get(node_type).update(metadata=md_file)
+        :returns: worker thread (background) or list of loaded node types.
+        :rtype: threading.Thread
+        """
+        paths = [path for path in self._external_plugin_paths if path]
+        if not paths:
+            return
 
-        return sorted(list(set(imported)))
+        if background:
+            return self._registry.load_external_async(paths)
+        return self._registry.load_external(paths)
 
-    def load_widgets(self, path=None, plugins=[]):
+    @property
+    def registry(self):
         """
-        Load built-in and external node widgets.
+        Returns the shared plugin registry.
 
-        .. todo:: 
-            - load the external plugins as well.
-
-        :param str path: path to scan.
-        :param list plugins: plugin names to filter.
+        :rtype: PluginRegistry
         """
-        log.info('loading plugin widgets...')
+        return self._registry
 
-        if path is None:
-            path = self.default_plugin_path
+    def dagnode_class(self, node_type):
+        """
+        Returns the dag node class for the given node type.
 
-        widgets = self._load_widgets(path, plugins=plugins)
+        :param str node_type: node type to query.
 
-        # update the node data attribute with widget classes
-        for node_type in widgets:
-            
-            if node_type in self._node_data:
-                #print '# DEBUG: updating node "%s" with widget...' % node_type
-                self._node_data.get(node_type).update(widgets.get(node_type))
+        :returns: dag node class.
+        :rtype: DagNode
+        """
+        return self._registry.dagnode_class(node_type)
 
-    def _load_widgets(self, path, plugins=[]):
+    def widget_class(self, node_type):
         """
-        Dynamically load all node widgets.
+        Returns the widget class for the given node type.
 
-        :param str path: path to scan.
-        :param list plugins: plugin names to filter.
+        :param str node_type: node type to query.
 
-        :returns: dictionary of node type, widget.
-        :rtype: dict
+        :returns: node widget class.
+        :rtype: NodeWidget
         """
-        imported = dict()
-        fexpr = re.compile(r"(?P<basename>.+?)(?P<fext>\.[^.]*$|$)")
-
-        for loader, mod_name, is_pkg in pkgutil.walk_packages([path]):
-            module = loader.find_module(mod_name).load_module(mod_name)
+        return self._registry.widget_class(node_type)
 
-            modfn = module.__file__
-            src_file = None
+    def resolve(self, node_type, disabled=False):
+        """
+        Returns the resolved plugin data for the given node type. Resolved
+        types are cached until plugins are loaded, enabled or flushed.
 
-            fnmatch = re.search(fexpr, modfn)
-            if fnmatch:
-                src_file = '%s.py' % fnmatch.group('basename')
+        :param str node_type: node type to query.
+        :param bool disabled: resolve disabled plugins.
 
-            # filter widget types
-            for cname, obj in inspect.getmembers(module, inspect.isclass):
+        :returns: resolved node type.
+        :rtype: NodeType
+        """
+        if self._node_types_revision != self._registry.revision:
+            self._node_types = dict()
+            self._node_types_revision = self._registry.revision
 
-                # we need to match the widget_type attribute to 
-                # the corresponding node_type value.
-                widget_type = None
+        node = self._node_types.get(node_type)
+        if node is None:
+            if node_type not in self._registry and self._registry.is_loading:
+                # the type may be defined in an external plugin
+                log.info('waiting for external plugins to load...')
+                self._registry.wait()
 
-                if not hasattr(obj, 'widget_type'):
-                    # keep moving
-                    continue
+            if node_type not in self._registry:
+                return
 
-                widget_type = getattr(obj, 'widget_type')
+            dag = self._registry.dagnode_class(node_type)
+            if dag is None:
+                return
 
-                if not plugins or widget_type in plugins:
-                    if cname not in globals():
-                        globals()[cname] = obj
+            plugin_attrs = self._registry.get(node_type)
+            default_name = plugin_attrs.get('default_name') or getattr(dag, 'default_name', None)
+            enabled = self._enabled.get(node_type, plugin_attrs.get('enabled', True))
 
-                    imported.update({widget_type:{'widget':globals()[cname]}})
+            node = NodeType(node_type, dag, default_name, self._registry.metadata(node_type), enabled, self._registry)
+            self._node_types[node_type] = node
 
-        return imported
+        if not node.enabled and not disabled:
+            return
+        return node
 
     def _get_external_plugin_paths(self, dirname='scenegraph_plugins'):
         """
@@ -478,8 +400,9 @@ class PluginManager(object):
             if not enabled:
                 continue
 
-            dag = pattrs.get('dagnode', None)
-            widget = pattrs.get('widget', None)
+            # classes are imported lazily, check the manifest entries
+            dag = pattrs.get('dagnode_class', None)
+            widget = pattrs.get('widget_class', None)
 
             if dag is None or widget is None:
                 continue
@@ -516,14 +439,11 @@ class PluginManager(object):
         :returns: dag node subclass.
         :rtype: DagNode
         """
-        if node_type not in self._node_data:
+        node = self.resolve(node_type, disabled=True)
+        if node is None:
             log.error('plugin type "%s" is not loaded.' % node_type)
             return
-
-        dag = self._node_data.get(node_type).get('dagnode')
-        # assign the node metadata file
-        result = dag(_metadata=self._node_data.get(node_type).get('metadata', None), **kwargs)
-        return result
+        return node.create(**kwargs)
 
     def get_widget(self, dagnode, **kwargs):
         """
@@ -535,15 +455,15 @@ class PluginManager(object):
         :returns: node widget subclass.
         :rtype: NodeWidget
         """
-        if dagnode.node_type not in self._node_data:
+        node = self.resolve(dagnode.node_type, disabled=True)
+        if node is None:
             log.error('plugin "%s" is not loaded.' % dagnode.node_type)
             return
 
-        if 'widget' not in self._node_data.get(dagnode.node_type):
+        widget = node.widget
+        if widget is None:
             log.error('plugin "%s" widget not loaded.' % dagnode.node_type)
             return
-
-        widget = self._node_data.get(dagnode.node_type).get('widget')
         return widget(dagnode)
 
     def default_name(self, nodetype):
@@ -555,11 +475,9 @@ class PluginManager(object):
         :returns: node default name.
         :rtype: str 
         """
-        if nodetype in self._node_data:
-            cls = self._node_data.get(nodetype).get('dagnode')
-            if cls:
-                if hasattr(cls, 'default_name'):
-                    return cls.default_name
+        node = self.resolve(nodetype, disabled=True)
+        if node is not None:
+            return node.default_name
         return
 
     def metadata_file(self, filename):
@@ -582,40 +500,1089 @@ class PluginManager(object):
 
     def enable(self, plugin, enabled=True):
         """
-        Enable/disable plugins.
+        Enable/disable plugins. Only affects this manager.
+
+        :param str plugin: plugin node type.
+        :param bool enabled: plugin enabled state.
+
+        :returns: plugin was updated.
+        :rtype: bool
         """
-        if not plugin in self._node_data:
+        if not plugin in self._registry:
             log.error('plugin "%s" not recognized.' % plugin)
             return False
 
-        for plug, plugin_attrs in self._node_data.iteritems():
-            if plug == plugin:
-                log.info('setting plugin "%s" enabled: %s' % (plugin, str(enabled)))
-                self._node_data.get(plugin).update(enabled=enabled)
-                return True
-        return False
+        log.info('setting plugin "%s" enabled: %s' % (plugin, str(enabled)))
+        self._enabled[plugin] = enabled
+        self._node_types = dict()
+        return True
 
     def flush(self):
         """
-        Flush all currently loaded plugins.
+        Flush all currently loaded plugins. Affects all graphs 
+        sharing the plugin registry.
+        """
+        self._enabled = dict()
+        self._node_types = dict()
+        self._registry.flush()
+
+
+class PluginRegistry(object):
+    """
+    Process-wide storage for discovered plugins. All PluginManager instances
+    (and their graphs) share the registry returned by PluginRegistry.instance(), 
+    so plugins are only scanned once per process. Access is thread-safe.
+
+    :param str manifest: plugin manifest cache file.
+    """
+    _instance       = None
+    _instance_lock  = threading.Lock()
+
+    def __init__(self, manifest=SCENEGRAPH_PLUGIN_MANIFEST):
+
+        self._lock                   = threading.RLock()
+
+        # storage for plugin data
+        self._node_data              = dict()
+        self._metadata               = dict()
+        self._manifest               = PluginManifest(manifest)
+
+        # file modification times, for reloading
+        self._imported               = dict()    # {source file: mtime}
+        self._metadata_files         = dict()    # {node_type: {metadata file: mtime}}
+
+        # incremented when plugins are loaded or flushed
+        self.revision                = 0
+
+        # events
+        self.pluginsReloaded         = EventHandler(self)
+        self.pluginsLoaded           = EventHandler(self, batched=False)   # sent from the loader thread
+
+        # plugin paths & module data
+        self._core_plugin_path       = SCENEGRAPH_CORE
+        self._builtin_plugin_path    = SCENEGRAPH_PLUGIN_PATH
+        self._default_plugin_path    = SCENEGRAPH_PLUGIN_PATH
+        self._default_modules        = []
+
+        # external paths & background loader
+        self._external_paths         = []
+        self._loader                 = None
+
+        self.refresh()
+
+    @classmethod
+    def instance(cls):
+        """
+        Returns the shared plugin registry, creating it if needed.
+
+        :returns: shared plugin registry.
+        :rtype: PluginRegistry
         """
-        flush = []
-        for attr in globals():
-            if not attr.startswith('__'):
-                obj = globals()[attr]
-                if hasattr(obj, 'dag_types'):
-                    flush.append(attr)
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    def __contains__(self, node_type):
+        return node_type in self._node_data
 
-        if flush:
-            for f in flush:
-                globals().pop(f)
-                log.info('flushing object: "%s"'% f)
+    def __len__(self):
+        return len(self._node_data)
 
+    def refresh(self):
+        """
+        Rescan the core & default plugin paths. Unchanged plugin files
+        are read from the manifest cache.
+        """
+        with self._lock:
+            self._metadata = dict()
+            self._metadata_files = dict()
+            self._scan()
+
+    def _scan(self):
+        """
+        Rebuild the plugin data from the plugin paths.
+        """
         self._node_data = dict()
-        self._default_modules = []
+        self._default_modules = get_modules(self._default_plugin_path)
 
+        # load core nodes
+        self.load_core()
+
+        # auto-load default plugins
+        self.load_plugins(self._default_plugin_path)
+        self.load_widgets(self._default_plugin_path)
+
+        # external plugins that have already been loaded
+        for path in self._external_paths:
+            self.load_plugins(path)
+            self.load_widgets(path)
+
+        # save any plugin changes
+        self._manifest.write()
+
+    #- External Plugins ----
+    def load_external(self, paths):
+        """
+        Scan the given paths for plugins, and import them. Paths that have
+        already been loaded are skipped. Emits PluginRegistry.pluginsLoaded 
+        with the new node types as each path is loaded.
+
+        :param list paths: plugin paths.
+
+        :returns: list of loaded node types.
+        :rtype: list
+        """
+        result = []
+        for path in paths:
+            start = time.time()
+            with self._lock:
+                if path in self._external_paths:
+                    continue
+
+            # scan & parse the plugin sources without blocking readers
+            node_data, widgets = self._read_plugins(path)
+            self._manifest.write()
+
+            # publish the results
+            with self._lock:
+                if path in self._external_paths:
+                    continue
+
+                self._external_paths.append(path)
+                current = set(self._node_data.keys())
+                self._node_data.update(node_data)
+                for node_type, widget_attrs in widgets.iteritems():
+                    if node_type in self._node_data:
+                        self._node_data.get(node_type).update(widget_attrs)
+                self.revision += 1
+                node_types = sorted(set(self._node_data.keys()) - current)
+
+            # import the plugin classes & parse their metadata. Widget classes
+            # are imported when first requested, from the ui thread.
+            for node_type in node_types:
+                self.metadata(node_type)
+
+            log.info('loaded %d plugins from "%s" (%.3f seconds).' % (len(node_types), path, time.time() - start))
+            if node_types:
+                result.extend(node_types)
+                self.pluginsLoaded(node_types)
+        return result
+
+    def load_external_async(self, paths):
+        """
+        Load plugins from the given paths on a worker thread (see 
+        PluginRegistry.load_external).
+
+        :param list paths: plugin paths.
+
+        :returns: loader thread.
+        :rtype: threading.Thread
+        """
+        with self._lock:
+            loader = threading.Thread(target=self.load_external, args=(list(paths),), name='PluginLoader')
+            loader.daemon = True
+            self._loader = loader
+            loader.start()
+        return loader
+
+    @property
+    def is_loading(self):
+        """
+        Returns true if external plugins are being loaded in the background.
+
+        :rtype: bool
+        """
+        loader = self._loader
+        return loader is not None and loader.is_alive()
+
+    def wait(self, timeout=None):
+        """
+        Wait for the background plugin loader to finish.
+
+        :param float timeout: maximum time to wait (seconds).
+        """
+        loader = self._loader
+        if loader is not None and loader is not threading.current_thread():
+            loader.join(timeout)
+
+    def reload(self):
+        """
+        Reload plugins whose source or metadata files have changed since
+        they were loaded. Only the changed modules are imported again, and
+        only the metadata of affected node types is parsed again. 
+
+        Emits PluginRegistry.pluginsReloaded with the affected node types.
+
+        :returns: list of reloaded node types.
+        :rtype: list
+        """
+        with self._lock:
+            changed = [f for f, mtime in self._imported.items() if file_mtime(f) != mtime]
+
+        # reimport modified modules & rescan the plugin paths outside of 
+        # the lock. Unchanged files are read from the manifest.
+        for filename in changed:
+            log.info('reloading plugin module: "%s".' % filename)
+            reload_source(filename)
+
+        reloaded = None
+        while reloaded is None:
+            with self._lock:
+                default_path = self._default_plugin_path
+                external_paths = list(self._external_paths)
+
+            node_data = self._read_all(default_path, external_paths)
+            default_modules = get_modules(default_path)
+            self._manifest.write()
+
+            # swap in the new data, unless the plugin paths changed while reading
+            with self._lock:
+                if default_path == self._default_plugin_path and external_paths == self._external_paths:
+                    reloaded = self._swap(node_data, changed)
+                    self._default_modules = default_modules
+
+        if not reloaded:
+            return []
+
+        log.info('reloaded plugins: %s' % ', '.join(reloaded))
+        self.pluginsReloaded(sorted(reloaded))
+        return sorted(reloaded)
+
+    def _swap(self, node_data, changed):
+        """
+        Replace the plugin data with reloaded data, keeping the imported
+        classes of unchanged plugins. Requires the registry lock.
+
+        :param dict node_data: reloaded plugin data.
+        :param list changed: reimported source files.
+
+        :returns: sorted list of reloaded node types.
+        :rtype: list
+        """
+        for filename in changed:
+            self._imported.pop(filename, None)
+
+        old_data = self._node_data
+        self._node_data = node_data
+
+        reloaded = []
+        for node_type in set(old_data.keys() + self._node_data.keys()):
+            old_attrs = old_data.get(node_type)
+            plugin_attrs = self._node_data.get(node_type)
+
+            # new or removed plugins
+            if old_attrs is None or plugin_attrs is None:
+                reloaded.append(node_type)
+                self._metadata.pop(node_type, None)
+                continue
+
+            # keep classes that haven't changed
+            source_changed = plugin_attrs.get('source') in changed or old_attrs.get('dagnode_class') != plugin_attrs.get('dagnode_class')
+            widget_changed = plugin_attrs.get('widget_source') in changed or old_attrs.get('widget_class') != plugin_attrs.get('widget_class')
+
+            if not source_changed:
+                plugin_attrs.update(dagnode=old_attrs.get('dagnode'))
+            if not widget_changed:
+                plugin_attrs.update(widget=old_attrs.get('widget'))
+
+            metadata_changed = False
+            for filename, mtime in self._metadata_files.get(node_type, dict()).iteritems():
+                if file_mtime(filename) != mtime:
+                    metadata_changed = True
+                    break
+
+            if source_changed or metadata_changed:
+                self._metadata.pop(node_type, None)
+
+            if source_changed or widget_changed or metadata_changed:
+                reloaded.append(node_type)
+
+        if reloaded:
+            self.revision += 1
+        return sorted(reloaded)
+
+    def node_data(self):
+        """
+        Returns a copy of the current plugin data.
+
+        :returns: dictionary of node type, plugin data.
+        :rtype: dict
+        """
+        with self._lock:
+            return dict(self._node_data)
+
+    def get(self, node_type):
+        """
+        Returns the plugin data for the given node type.
+
+        :param str node_type: node type to query.
+
+        :returns: plugin data.
+        :rtype: dict
+        """
+        return self._node_data.get(node_type, None)
+
+    def metadata(self, node_type):
+        """
+        Returns the parsed metadata for the given node type. Metadata
+        files are only parsed the first time a node type is requested.
+
+        :param str node_type: node type to query.
+
+        :returns: node metadata.
+        :rtype: dict
+        """
+        with self._lock:
+            if node_type in self._metadata:
+                return self._metadata.get(node_type)
+
+        # import & parse outside of the lock
+        dag = self.dagnode_class(node_type)
+        if dag is None:
+            return dict()
+
+        # record the files used, for reloading
+        metadata_files = dict()
+        for cname, filename in dag.metadata_files():
+            metadata_files[filename] = file_mtime(filename)
+        metadata = dag.read_metadata()
+
+        with self._lock:
+            self._metadata.setdefault(node_type, metadata)
+            self._metadata_files.setdefault(node_type, metadata_files)
+            return self._metadata.get(node_type)
+
+    @property
+    def default_plugin_path(self):
+        """
+        Return the default plugin path.
+
+        :returns: current default plugin path.
+        :rtype: str
+        """
+        return self._default_plugin_path
+
+    @default_plugin_path.setter
+    def default_plugin_path(self, path):
+        """
+        Set the default plugin path.
+
+        :param str path: directory path.
+        """
+        with self._lock:
+            if path != self._default_plugin_path:
+                self.flush()
+                self._default_plugin_path = path
+
+    @property
+    def default_modules(self):
+        """
+        Returns the default plugin modules.
+
+        :returns: list of default plugin module names.
+        :rtype: list
+        """
+        return self._default_modules
+
+    #- Loading ----
+
+    def load_core(self, plugins=[]):
+        """
+        Load core node types.
+
+        :param list plugins: plugin names to filter.
+        """
+        log.info('loading plugins...')
+
+        core_path = SCENEGRAPH_CORE
+        widget_path = os.path.join(SCENEGRAPH_PATH, 'ui')
+
+        with self._lock:
+            self.revision += 1
+            builtins = self._load_core(core_path, plugins=plugins)
+            #print '# DEBUG: core nodes loaded: ', builtins
+            self.load_widgets(widget_path, plugins=builtins)
+
+    def _load_core(self, path, plugins=[]):
+        """
+        Register all core node types found in this package. Modules
+        are not imported until a node type is requested.
+
+        :param str path: path to scan.
+        :param list plugins: plugin names to filter.
+
+        :returns: list of registered plugin names.
+        :rtype: list
+        """
+        node_data = self._read_core(path, plugins=plugins)
+        self._node_data.update(node_data)
+        return sorted(node_data.keys())
+
+    def _read_core(self, path, plugins=[]):
+        """
+        Read the core node types found in this package, without 
+        registering them. Doesn't require the registry lock.
+
+        :param str path: path to scan.
+        :param list plugins: plugin names to filter.
+
+        :returns: dictionary of node type, plugin data.
+        :rtype: dict
+        """
+        result = dict()
+        for entry in self._manifest.scan(path):
+            src_file = entry.get('source')
+
+            for node_data in entry.get('nodes'):
+                node_type = node_data.get('node_type')
+                if plugins and node_type not in plugins:
+                    continue
+
+                # core node metadata lives in ../mtd
+                md_file = os.path.join(SCENEGRAPH_METADATA_PATH, '%s.mtd' % node_type)
+                result[node_type] = self._plugin_data(node_data, src_file, md_file)
+        return result
+
+    def _read_all(self, default_path, external_paths):
+        """
+        Read the plugin data of the core, default & external plugin paths
+        without registering it (see PluginRegistry._scan). Doesn't require 
+        the registry lock.
+
+        :param str default_path: default plugin path.
+        :param list external_paths: loaded external plugin paths.
+
+        :returns: dictionary of node type, plugin data.
+        :rtype: dict
+        """
+        node_data = self._read_core(SCENEGRAPH_CORE)
+        widgets = self._load_widgets(os.path.join(SCENEGRAPH_PATH, 'ui'), plugins=node_data.keys())
+        for node_type, widget_attrs in widgets.iteritems():
+            node_data.get(node_type).update(widget_attrs)
+
+        for path in [default_path] + list(external_paths):
+            path_data, widgets = self._read_plugins(path)
+            node_data.update(path_data)
+            for node_type, widget_attrs in widgets.iteritems():
+                if node_type in node_data:
+                    node_data.get(node_type).update(widget_attrs)
+        return node_data
+
+    def load_plugins(self, path=None, plugins=[]):
+        """
+        Load built-in and external asset types
+
+         .. todo::: load the external plugins as well.
+
+        :param str path: path to scan.
+        :param list plugins: plugin names to filter.
+        """
+        log.info('loading plugins...')
+
+        with self._lock:
+            if path is None:
+                path = self.default_plugin_path
+
+            self.revision += 1
+            builtins = self._load_builtins(path, plugins=plugins)
+
+    def _load_builtins(self, path, plugins=[]):
+        """
+        Register all plugin node types found in the given path. Modules
+        are not imported until a node type is requested.
+
+        :param str path: path to scan.
+        :param list plugins: plugin names to filter.
+
+        :returns: list of registered plugin names.
+        :rtype: list
+        """
+        imported = []
+        for entry in self._manifest.scan(path):
+            src_file = entry.get('source')
+            md_file = '%s.mtd' % os.path.splitext(src_file)[0]
+
+            for node_data in entry.get('nodes'):
+                node_type = node_data.get('node_type')
+                if plugins and node_type not in plugins:
+                    continue
+
+                self._register_node(node_data, src_file, md_file)
+                imported.append(node_type)
+
+        return sorted(list(set(imported)))
+
+    def _register_node(self, node_data, src_file, md_file):
+        """
+        Add a node type from the plugin manifest. The dag node
+        class is imported on demand (see PluginRegistry.dagnode_class).
+
+        :param dict node_data: manifest node entry.
+        :param str src_file: plugin source file.
+        :param str md_file: plugin metadata file.
+        """
+        self._node_data.update({node_data.get('node_type'):self._plugin_data(node_data, src_file, md_file)})
+
+    def _plugin_data(self, node_data, src_file, md_file):
+        """
+        Returns the plugin data for a manifest node entry.
+
+        :param dict node_data: manifest node entry.
+        :param str src_file: plugin source file.
+        :param str md_file: plugin metadata file.
+
+        :returns: plugin data.
+        :rtype: dict
+        """
+        plugin_attrs = dict(dagnode=None, metadata=None, source=None, enabled=True, 
+                            category=node_data.get('category'), default_name=node_data.get('default_name'), 
+                            dagnode_class=node_data.get('class_name'))
+        plugin_attrs['class'] = node_data.get('node_class')
+
+        # add source and metadata files
+        if os.path.exists(src_file):
+            plugin_attrs.update(source=src_file)
+
+        if os.path.exists(md_file):
+            plugin_attrs.update(metadata=md_file)
+        return plugin_attrs
+
+    def _read_plugins(self, path):
+        """
+        Read the plugin node types & widgets found in the given path,
+        without registering them. Doesn't require the registry lock.
+
+        :param str path: path to scan.
+
+        :returns: tuple of (node type data, widget data) dictionaries.
+        :rtype: tuple
+        """
+        node_data = dict()
+        for entry in self._manifest.scan(path):
+            src_file = entry.get('source')
+            md_file = '%s.mtd' % os.path.splitext(src_file)[0]
+
+            for data in entry.get('nodes'):
+                node_data[data.get('node_type')] = self._plugin_data(data, src_file, md_file)
+
+        return (node_data, self._load_widgets(path))
+
+    def load_widgets(self, path=None, plugins=[]):
+        """
+        Load built-in and external node widgets.
+
+        .. todo:: 
+            - load the external plugins as well.
+
+        :param str path: path to scan.
+        :param list plugins: plugin names to filter.
+        """
+        log.info('loading plugin widgets...')
+
+        with self._lock:
+            if path is None:
+                path = self.default_plugin_path
+
+            self.revision += 1
+            widgets = self._load_widgets(path, plugins=plugins)
+
+            # update the node data attribute with widget classes
+            for node_type in widgets:
+            
+                if node_type in self._node_data:
+                    #print '# DEBUG: updating node "%s" with widget...' % node_type
+                    self._node_data.get(node_type).update(widgets.get(node_type))
+
+    def _load_widgets(self, path, plugins=[]):
+        """
+        Find all node widgets in the given path. Modules are not
+        imported until a widget is requested.
+
+        :param str path: path to scan.
+        :param list plugins: plugin names to filter.
+
+        :returns: dictionary of node type, widget.
+        :rtype: dict
+        """
+        imported = dict()
+        for entry in self._manifest.scan(path):
+            src_file = entry.get('source')
+
+            # we need to match the widget_type attribute to 
+            # the corresponding node_type value.
+            for widget_data in entry.get('widgets'):
+                widget_type = widget_data.get('widget_type')
+
+                if not plugins or widget_type in plugins:
+                    imported.update({widget_type:{'widget':None, 'widget_source':src_file, 'widget_class':widget_data.get('class_name')}})
+
+        return imported
+
+    def dagnode_class(self, node_type):
+        """
+        Returns the dag node class for the given node type, importing
+        the plugin module the first time it is requested.
+
+        :param str node_type: node type to query.
+
+        :returns: dag node class.
+        :rtype: DagNode
+        """
+        with self._lock:
+            plugin_attrs = self._node_data.get(node_type)
+            if plugin_attrs is None:
+                return
+
+            if plugin_attrs.get('dagnode') is not None:
+                return plugin_attrs.get('dagnode')
+            source = plugin_attrs.get('source')
+
+        # import outside of the lock
+        cls = load_source_class(source, plugin_attrs.get('dagnode_class'))
+        if cls is None:
+            log.error('cannot load plugin "%s" from "%s".' % (node_type, source))
+            return
+        log.debug('loaded plugin "%s".' % node_type)
+
+        with self._lock:
+            if plugin_attrs.get('dagnode') is None:
+                plugin_attrs.update(dagnode=cls)
+                self._imported[source] = file_mtime(source)
+            return plugin_attrs.get('dagnode')
+
+    def widget_class(self, node_type):
+        """
+        Returns the widget class for the given node type, importing
+        the widget module the first time it is requested.
+
+        :param str node_type: node type to query.
+
+        :returns: node widget class.
+        :rtype: NodeWidget
+        """
+        with self._lock:
+            plugin_attrs = self._node_data.get(node_type)
+            if plugin_attrs is None:
+                return
+
+            if plugin_attrs.get('widget') is not None:
+                return plugin_attrs.get('widget')
+
+            source = plugin_attrs.get('widget_source')
+            if source is None:
+                return
+
+        # import outside of the lock
+        cls = load_source_class(source, plugin_attrs.get('widget_class'))
+        if cls is None:
+            log.error('cannot load plugin widget "%s" from "%s".' % (node_type, source))
+            return
+        log.debug('loaded plugin widget "%s".' % node_type)
+
+        with self._lock:
+            if plugin_attrs.get('widget') is None:
+                plugin_attrs.update(widget=cls)
+                self._imported[source] = file_mtime(source)
+            return plugin_attrs.get('widget')
+
+    def flush(self):
+        """
+        Flush all currently loaded plugins.
+        """
+        with self._lock:
+            for node_type in self._node_data:
+                log.info('flushing plugin: "%s"'% node_type)
+
+            self._node_data = dict()
+            self._metadata = dict()
+            self._metadata_files = dict()
+            self._external_paths = []
+            self._default_modules = []
+            self.revision += 1
+
+
+class NodeType(object):
+    """
+    Resolved plugin data for a single node type (see PluginManager.resolve).
+
+    :param str node_type: node type.
+    :param DagNode dagnode: dag node class.
+    :param str default_name: node default name.
+    :param dict metadata: parsed node metadata.
+    :param bool enabled: plugin is enabled.
+    :param PluginRegistry registry: registry to load the widget from.
+    """
+    def __init__(self, node_type, dagnode, default_name, metadata, enabled, registry):
+
+        self.node_type      = node_type
+        self.dagnode        = dagnode
+        self.default_name   = default_name
+        self.metadata       = metadata
+        self.enabled        = enabled
+
+        self._widget        = None
+        self._registry      = registry
+
+    def __repr__(self):
+        return '<NodeType "%s">' % self.node_type
+
+    @property
+    def widget(self):
+        """
+        Returns the node widget class. The widget module is
+        imported on first access.
+
+        :returns: node widget class.
+        :rtype: NodeWidget
+        """
+        if self._widget is None:
+            self._widget = self._registry.widget_class(self.node_type)
+        return self._widget
+
+    def create(self, **kwargs):
+        """
+        Create a dag node of this type. Each node gets 
+        its own copy of the metadata.
+
+        :returns: dag node instance.
+        :rtype: DagNode
+        """
+        if 'metadata' not in kwargs:
+            kwargs['metadata'] = copy.deepcopy(self.metadata)
+        return self.dagnode(**kwargs)
+
+
+class PluginManifest(object):
+    """
+    Records the plugin classes defined in plugin source files, without 
+    importing them. Entries are keyed by source file & modification time, 
+    and are cached on disk so that unchanged files are not parsed again.
+
+    :param str filename: manifest cache file.
+    """
+    version = 1
+
+    def __init__(self, filename=None):
+
+        self.filename   = filename
+        self._files     = dict()
+        self._changed   = False
+        self._lock      = threading.RLock()     # scans may run on the plugin loader thread
+
+        if self.filename is not None:
+            self.read()
+
+    def __len__(self):
+        return len(self._files)
+
+    def __contains__(self, filename):
+        return filename in self._files
+
+    def read(self):
+        """
+        Read the manifest cache from disk.
+
+        :returns: manifest was read.
+        :rtype: bool
+        """
+        if not os.path.exists(self.filename):
+            return False
+
+        try:
+            data = json.load(open(self.filename, 'r'))
+        except Exception as err:
+            log.warning('cannot read plugin manifest "%s": %s' % (self.filename, err))
+            return False
+
+        if data.get('version') != self.version:
+            return False
+
+        self._files = data.get('files', dict())
+        return True
+
+    def write(self):
+        """
+        Write the manifest cache to disk, if it has changed.
+
+        :returns: manifest was written.
+        :rtype: bool
+        """
+        with self._lock:
+            if self.filename is None or not self._changed:
+                return False
+
+            try:
+                dirname = os.path.dirname(self.filename)
+                if not os.path.exists(dirname):
+                    os.makedirs(dirname)
+
+                fn = open(self.filename, 'w')
+                json.dump({'version':self.version, 'files':self._files}, fn, indent=4, sort_keys=True)
+                fn.close()
+            except (IOError, OSError) as err:
+                log.warning('cannot write plugin manifest "%s": %s' % (self.filename, err))
+                return False
+
+            log.debug('writing plugin manifest: "%s".' % self.filename)
+            self._changed = False
+            return True
+
+    def scan(self, path):
+        """
+        Returns manifest entries for all python files in the given path.
+
+        :param str path: path to scan.
+
+        :returns: list of manifest entries.
+        :rtype: list
+        """
+        result = []
+        if not os.path.isdir(path):
+            log.warning('plugin path "%s" does not exist.' % path)
+            return result
+
+        for fname in sorted(os.listdir(path)):
+            if not fname.endswith('.py') or fname.startswith('__'):
+                continue
+
+            entry = self.entry(os.path.join(path, fname))
+            if entry is not None:
+                result.append(entry)
+        return result
+
+    def entry(self, filename):
+        """
+        Returns the manifest entry for the given source file. The 
+        file is parsed again only if it has been modified.
+
+        :param str filename: plugin source file.
+
+        :returns: manifest entry (source, mtime, nodes, widgets).
+        :rtype: dict
+        """
+        filename = os.path.abspath(filename)
+        if not os.path.exists(filename):
+            self.remove(filename)
+            return
+
+        mtime = os.path.getmtime(filename)
+        with self._lock:
+            entry = self._files.get(filename)
+        if entry is not None and entry.get('mtime') == mtime:
+            return entry
+
+        log.debug('reading plugin source: "%s".' % filename)
+        entry = parse_plugin_source(filename)
+        entry.update(source=filename, mtime=mtime)
+        with self._lock:
+            self._files[filename] = entry
+            self._changed = True
+        return entry
+
+    def remove(self, filename):
+        """
+        Remove a source file from the manifest.
+
+        :param str filename: plugin source file.
+
+        :returns: file was removed.
+        :rtype: bool
+        """
+        with self._lock:
+            if self._files.pop(os.path.abspath(filename), None) is not None:
+                self._changed = True
+                return True
+        return False
+
+
+#- Utilities ------
+
+def parse_plugin_source(filename):
+    """
+    Parse a python source file for dag node & widget classes. Class attributes 
+    are read from string assignments in the class body (or from base classes 
+    defined in the same file).
+
+    :param str filename: python source file.
+
+    :returns: dictionary of node & widget class data.
+    :rtype: dict
+    """
+    result = {'nodes':[], 'widgets':[]}
+    try:
+        tree = ast.parse(open(filename, 'r').read(), filename)
+    except (IOError, SyntaxError) as err:
+        log.warning('cannot parse plugin source "%s": %s' % (filename, err))
+        return result
+
+    # {class name: (class attributes, base class names)}
+    classes = dict()
+    for node in tree.body:
+        if not isinstance(node, ast.ClassDef):
+            continue
+
+        attrs = dict()
+        for item in node.body:
+            if isinstance(item, ast.Assign) and isinstance(item.value, ast.Str):
+                for target in item.targets:
+                    if isinstance(target, ast.Name):
+                        attrs[target.id] = item.value.s
+
+        bases = [b.id for b in node.bases if isinstance(b, ast.Name)]
+        classes[node.name] = (attrs, bases)
+
+    def class_attr(cname, attr):
+        if cname not in classes:
+            return
+        attrs, bases = classes.get(cname)
+        if attr in attrs:
+            return attrs.get(attr)
+        for base in bases:
+            value = class_attr(base, attr)
+            if value is not None:
+                return value
+
+    for node in tree.body:
+        if not isinstance(node, ast.ClassDef):
+            continue
+
+        cname = node.name
+        # plugins need to have two attributes: node_type & node_class
+        node_type = class_attr(cname, 'node_type')
+        node_class = class_attr(cname, 'node_class')
+
+        if node_type is not None and node_class is not None:
+            result.get('nodes').append({'node_type':node_type, 'node_class':node_class, 'class_name':cname,
+                                        'category':class_attr(cname, 'node_category'), 
+                                        'default_name':class_attr(cname, 'default_name')})
+
+        widget_type = class_attr(cname, 'widget_type')
+        if widget_type is not None:
+            result.get('widgets').append({'widget_type':widget_type, 'class_name':cname})
+    return result
+
+
+def source_module_name(filename):
+    """
+    Returns the module name for the given source file. Files outside
+    of this package get a unique top-level name built from a hash of 
+    the file path, so they never collide with other modules or with
+    external plugins of the same name.
+
+    :param str filename: python source file.
+
+    :returns: module name.
+    :rtype: str
+    """
+    filename = os.path.splitext(os.path.abspath(filename))[0]
+    pkg_path = os.path.abspath(SCENEGRAPH_PATH)
+    if filename.startswith(pkg_path + os.sep):
+        relpath = os.path.relpath(filename, pkg_path)
+        return '.'.join([PACKAGE] + relpath.split(os.sep))
+
+    # not a package submodule: python 2 would resolve implicit
+    # relative imports in the plugin against this package.
+    digest = hashlib.md5(filename).hexdigest()[:12]
+    basename = re.sub(r'\W', '_', os.path.basename(filename))
+    return '_%s_ext_%s_%s' % (PACKAGE.lower(), digest, basename)
+
+
+def source_module(filename):
+    """
+    Returns the imported module for the given source file. Modules 
+    imported from another file under the same name are ignored.
+
+    :param str filename: python source file.
+
+    :returns: imported module.
+    :rtype: module
+    """
+    module = sys.modules.get(source_module_name(filename))
+    if module is None:
+        return
+
+    module_file = getattr(module, '__file__', None)
+    if module_file is None:
+        return
+
+    # compiled modules report the .pyc file
+    if os.path.splitext(os.path.realpath(module_file))[0] != os.path.splitext(os.path.realpath(filename))[0]:
+        return
+    return module
+
+
+def file_mtime(filename):
+    """
+    Returns the modification time of a file.
+
+    :param str filename: file to query.
+
+    :returns: modification time (None if the file does not exist).
+    :rtype: float
+    """
+    try:
+        return os.path.getmtime(filename)
+    except (OSError, TypeError):
+        return
+
+
+def reload_source(filename):
+    """
+    Reimport the module for the given source file, if it has been imported.
+
+    :param str filename: python source file.
+
+    :returns: reloaded module.
+    :rtype: module
+    """
+    mod_name = source_module_name(filename)
+    module = source_module(filename)
+    if module is None:
+        return
+
+    try:
+        if mod_name.startswith('%s.' % PACKAGE):
+            return reload(module)
+        return imp.load_source(mod_name, filename)
+    except Exception as err:
+        log.error('cannot reload plugin module "%s": %s' % (filename, err))
+
+
+def load_source_class(filename, cname):
+    """
+    Import a class from the given source file.
+
+    :param str filename: python source file.
+    :param str cname: class name.
+
+    :returns: imported class object.
+    :rtype: obj
+    """
+    if filename is None or cname is None:
+        return
+
+    mod_name = source_module_name(filename)
+    module = source_module(filename)
+    if module is None:
+        try:
+            if mod_name.startswith('%s.' % PACKAGE):
+                __import__(mod_name)
+                module = source_module(filename)
+            else:
+                # load_source would execute the file in a stale module
+                sys.modules.pop(mod_name, None)
+                module = imp.load_source(mod_name, filename)
+        except Exception as err:
+            log.error('cannot import plugin module "%s": %s' % (filename, err))
+            return
+
+    if module is None:
+        log.error('cannot import plugin module "%s": module "%s" is another file.' % (filename, mod_name))
+        return
+    return getattr(module, cname, None)
 
-#- Utilities ------
 
 def get_modules(path):
     """
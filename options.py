@@ -50,6 +50,7 @@ SCENEGRAPH_CONFIG_PATH          = os.path.join(SCENEGRAPH_PATH, 'cfg')
 SCENEGRAPH_METADATA_PATH        = os.path.join(SCENEGRAPH_PATH, 'mtd')
 
 SCENEGRAPH_PREFS_PATH           = os.path.join(USER_HOME, '.config', PACKAGE)
+SCENEGRAPH_PLUGIN_MANIFEST      = os.path.join(SCENEGRAPH_PREFS_PATH, 'plugins.json')
 SCENEGRAPH_USER_WORK_PATH       = os.path.join(USER_HOME, 'graphs')
 
 
@@ -122,13 +123,17 @@ SCENEGRAPH_PREFERENCES = {
   "use_gl": {"default": False, "desc": "Render graph with OpenGL.", "label": "Use OpenGL", "class": "scene" },
   "edge_type": { "default": "bezier", "desc": "Draw edges with bezier paths.", "label": "Edge style", "class": "scene" },
   "render_fx": { "default": False, "desc": "Render node drop shadows and effects.", "label": "render FX", "class": "scene" },
+  "batch_edges": { "default": False, "desc": "Draw edges with a single scene item, edges become interactive when hovered.", "label": "Batch edges", "class": "scene" },
+  "lightweight_ports": { "default": False, "desc": "Draw node connections with the node instead of as separate scene items.", "label": "Lightweight ports", "class": "scene" },
   "antialiasing": { "default": 2, "desc": "Antialiasing level.", "label": "Antialiasing", "class": "scene" },
   "logging_level": { "default": 30, "desc": "Verbosity level.", "label": "Logging level", "class": "global" },
   "autosave_inc": { "default": 90000, "desc": "Autosave delay (seconds x 1000).", "label": "Autosave time", "class": "global" },
   "stylesheet_name": { "default": "default", "desc": "Stylesheet to use.", "label": "Stylesheet", "class": "global" },
   "palette_style": { "default": "default", "desc": "Color palette to use.", "label": "Palette", "class": "global" },
   "font_style": { "default": "default", "desc": "font style to use.", "label": "Font style", "class": "global" },
-  "viewport_mode": { "default": "smart", "desc": "viewport update mode.", "label": "Viewport Mode", "class": "global" }
+  "viewport_mode": { "default": "smart", "desc": "viewport update mode.", "label": "Viewport Mode", "class": "global" },
+  "lod_medium": { "default": 0.5, "desc": "Zoom level below which node labels are hidden.", "label": "Hide labels below", "class": "global" },
+  "lod_low": { "default": 0.25, "desc": "Zoom level below which nodes & edges are simplified.", "label": "Simplify nodes below", "class": "global" }
 }
     
 
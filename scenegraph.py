@@ -53,6 +53,10 @@ form_class, base_class = loadUiType(SCENEGRAPH_UI)
 
 
 class SceneGraphUI(form_class, base_class):
+
+    # external plugins loaded (sent from the plugin loader thread)
+    pluginsLoaded = QtCore.Signal(list)
+
     def __init__(self, parent=None, **kwargs):
         super(SceneGraphUI, self).__init__(parent)
         from SceneGraph.icn import icons 
@@ -90,10 +94,15 @@ class SceneGraphUI(form_class, base_class):
 
         self._show_private        = False
         self._valid_plugins       = []  
+        self._external_plugins    = False                                   # external plugin loading has started
 
         self.edge_type            = kwargs.get('edge_type', 'bezier')
         self.viewport_mode        = kwargs.get('viewport_mode', 'smart')
         self.render_fx            = kwargs.get('render_fx', True)
+        self.lod_medium           = kwargs.get('lod_medium', 0.5)          # hide labels below this zoom level
+        self.lod_low              = kwargs.get('lod_low', 0.25)            # simplify nodes below this zoom level
+        self.batch_edges          = kwargs.get('batch_edges', False)      # draw edges with a single scene item
+        self.lightweight_ports    = kwargs.get('lightweight_ports', False) # draw connections with the node widget
         self.antialiasing         = 2
         self.environment          = kwargs.get('env', 'standalone')
 
@@ -102,6 +111,8 @@ class SceneGraphUI(form_class, base_class):
         self.status_timer         = QtCore.QTimer()
         self.autosave_inc         = 30000 
         self.autosave_timer       = QtCore.QTimer()
+        self.plugin_reload_inc    = 2000
+        self.plugin_timer         = QtCore.QTimer()
 
         # stash temp selections here
         self._selected_nodes      = []
@@ -201,6 +212,14 @@ class SceneGraphUI(form_class, base_class):
         self.buildWindowTitle()
         self.resetStatus()
 
+        # status bar progress indicator
+        self.progress_bar = QtGui.QProgressBar(self)
+        self.progress_bar.setMaximumWidth(160)
+        self.progress_bar.setMaximumHeight(14)
+        self.progress_bar.setTextVisible(False)
+        self.progress_bar.setHidden(True)
+        self.statusBar().addPermanentWidget(self.progress_bar)
+
         # Qt application style menu
         self.app_style_label.setHidden(True)
         self.app_style_menu.setHidden(True)
@@ -255,6 +274,7 @@ class SceneGraphUI(form_class, base_class):
         # initialize the Graph
         self.graph = core.Graph()
         self.network = self.graph.network        
+        self.graph.plug_mgr.registry.pluginsLoaded += self.pluginsLoadedEvent
 
         # add our custom GraphicsView object (gview is defined in the ui file)
         self.view = graphics.GraphicsView(self.gview, ui=self, use_gl=self.use_gl, edge_type=self.edge_type)
@@ -269,7 +289,7 @@ class SceneGraphUI(form_class, base_class):
             for plugin in self.graph.plug_mgr.node_types():
                 if plugin not in self._valid_plugins:
                     log.info('disabling plugin "%s"' % plugin)
-                    self.graph.plug_mgr.node_types().get(plugin).update(enabled=False)
+                    self.graph.plug_mgr.enable(plugin, False)
         
     def connectSignals(self):
         """
@@ -278,9 +298,11 @@ class SceneGraphUI(form_class, base_class):
         # timers
         self.status_timer.timeout.connect(self.resetStatus)
         self.autosave_timer.timeout.connect(self.autoSaveAction)
+        self.plugin_timer.timeout.connect(self.reloadPluginsAction)
         
         self.view.tabPressed.connect(partial(self.createTabMenu, self.view))
         self.view.statusEvent.connect(self.updateConsole)
+        self.consoleWidget.visibilityChanged.connect(self.consoleVisibilityChangedAction)
 
         # Scene handler
         self.view.selectionChanged.connect(self.nodesSelectedAction)
@@ -298,12 +320,16 @@ class SceneGraphUI(form_class, base_class):
         self.action_save_graph_as.triggered.connect(self.saveGraphAs)               
         self.action_revert.triggered.connect(self.revertGraph)
         self.action_show_all.triggered.connect(self.togglePrivate)
+        self.action_layout_graph.triggered.connect(self.layoutGraphAction)
         
         self.action_reset_scale.triggered.connect(self.resetScale)
         self.action_restore_default_layout.triggered.connect(self.restoreDefaultSettings)
         self.action_exit.triggered.connect(self.close)
         self.action_save_layout.triggered.connect(self.saveLayoutAction)
         self.action_plugins.triggered.connect(self.pluginManagerAction)
+        self.action_reload_plugins.triggered.connect(self.reloadPluginsAction)
+        self.pluginsLoaded.connect(self.pluginsLoadedAction)
+        self.action_auto_reload_plugins.toggled.connect(self.toggleAutoReloadPlugins)
 
         # debug menu
         self.action_reset_dots.triggered.connect(self.resetDotsAction)
@@ -311,6 +337,8 @@ class SceneGraphUI(form_class, base_class):
         self.action_plugin_output.triggered.connect(self.evaluatePlugins)
         self.action_update_nodes.triggered.connect(self.graphAttributesAction)
         self.action_style_output.triggered.connect(self.stylesheetOutputAction)
+        self.action_profile_events.toggled.connect(self.toggleEventProfiling)
+        self.action_export_event_profile.triggered.connect(self.exportEventProfileAction)
 
         # preferences
         self.ignore_scene_prefs_check.toggled.connect(self.toggleIgnore)
@@ -320,6 +348,10 @@ class SceneGraphUI(form_class, base_class):
         self.check_use_gl.toggled.connect(self.toggleOpenGLMode)
         self.logging_level_menu.currentIndexChanged.connect(self.toggleLoggingLevel)
         self.check_render_fx.toggled.connect(self.toggleEffectsRendering)
+        self.check_batch_edges.toggled.connect(self.toggleEdgeBatching)
+        self.check_lightweight_ports.toggled.connect(self.toggleLightweightPorts)
+        self.lod_medium_spinbox.valueChanged.connect(self.detailThresholdsChangedAction)
+        self.lod_low_spinbox.valueChanged.connect(self.detailThresholdsChangedAction)
         self.autosave_time_edit.editingFinished.connect(self.setAutosaveDelay)
         self.app_style_menu.currentIndexChanged.connect(self.applicationStyleChanged)
 
@@ -404,6 +436,12 @@ class SceneGraphUI(form_class, base_class):
         self.action_debug_mode.setText(db_label)
         self.action_show_all.setText(show_msg)
 
+        layout_msg = 'Layout graph'
+        if len(self.view.scene().selectedDagNodes()) > 1:
+            layout_msg = 'Layout selected nodes'
+        self.action_layout_graph.setText(layout_msg)
+        self.action_layout_graph.setEnabled(bool(self.graph.dagnodes))
+
     def initializeWindowMenu(self):
         """
         Set up the Window menu.
@@ -435,6 +473,11 @@ class SceneGraphUI(form_class, base_class):
 
         self.action_reset_dots.setEnabled(has_dots)
 
+        self.action_profile_events.blockSignals(True)
+        self.action_profile_events.setChecked(core.events.PROFILE)
+        self.action_profile_events.blockSignals(False)
+        self.action_export_event_profile.setEnabled(bool(core.events.PROFILE_DATA))
+
     def initializeNodesMenu(self):
         """
         Set up the nodes menu.
@@ -489,6 +532,10 @@ class SceneGraphUI(form_class, base_class):
         font_family_nodes = kwargs.pop('font_family_nodes', self.font_family_nodes)
         use_gl = kwargs.pop('use_gl', self.use_gl)
         font_family_mono = kwargs.pop('font_family_mono', self.font_family_mono)
+        lod_medium = kwargs.pop('lod_medium', self.lod_medium)
+        lod_low = kwargs.pop('lod_low', self.lod_low)
+        batch_edges = kwargs.pop('batch_edges', self.batch_edges)
+        lightweight_ports = kwargs.pop('lightweight_ports', self.lightweight_ports)
 
         self.ignore_scene_prefs_check.blockSignals(True)
         self.edge_type_menu.blockSignals(True)
@@ -497,6 +544,10 @@ class SceneGraphUI(form_class, base_class):
         self.check_use_gl.blockSignals(True)
         self.logging_level_menu.blockSignals(True)
         self.check_render_fx.blockSignals(True)
+        self.check_batch_edges.blockSignals(True)
+        self.check_lightweight_ports.blockSignals(True)
+        self.lod_medium_spinbox.blockSignals(True)
+        self.lod_low_spinbox.blockSignals(True)
         self.app_style_menu.blockSignals(True)
         self.ui_font_menu.blockSignals(True)
         self.mono_font_menu.blockSignals(True)
@@ -522,6 +573,16 @@ class SceneGraphUI(form_class, base_class):
         # render FX
         self.check_render_fx.setChecked(render_fx)
 
+        # batched edges
+        self.check_batch_edges.setChecked(batch_edges)
+
+        # lightweight ports
+        self.check_lightweight_ports.setChecked(lightweight_ports)
+
+        # level of detail
+        self.lod_medium_spinbox.setValue(float(lod_medium))
+        self.lod_low_spinbox.setValue(float(lod_low))
+
         # build the viewport menu
         for item in options.VIEWPORT_MODES.items():
             label, mode = item[0], item[1]
@@ -602,6 +663,10 @@ class SceneGraphUI(form_class, base_class):
         self.check_use_gl.blockSignals(False)
         self.logging_level_menu.blockSignals(False)
         self.check_render_fx.blockSignals(False)
+        self.check_batch_edges.blockSignals(False)
+        self.check_lightweight_ports.blockSignals(False)
+        self.lod_medium_spinbox.blockSignals(False)
+        self.lod_low_spinbox.blockSignals(False)
         self.app_style_menu.blockSignals(False)
         self.ui_font_menu.blockSignals(False)
         self.mono_font_menu.blockSignals(False)
@@ -651,6 +716,25 @@ class SceneGraphUI(form_class, base_class):
 
         self.status_timer.start(4000)
 
+    def updateProgress(self, msg, value, total):
+        """
+        Update the status bar progress indicator. The indicator
+        is hidden when the value reaches the total.
+
+        :param str msg: status message.
+        :param int value: current progress value.
+        :param int total: total progress value.
+        """
+        if value >= total:
+            self.progress_bar.setHidden(True)
+            self.resetStatus()
+            return
+
+        self.progress_bar.setRange(0, total)
+        self.progress_bar.setValue(value)
+        self.progress_bar.setHidden(False)
+        self.statusBar().showMessage(self._getInfoStatus('%s (%d/%d)' % (msg, value, total)))
+
     def resetStatus(self):
         """
         Reset the status bar message.
@@ -884,11 +968,39 @@ class SceneGraphUI(form_class, base_class):
         self.render_fx = val
         log.info('toggling effects %s' % ('on' if val else 'off'))
         for node in self.view.scene().scenenodes.values():
-            if hasattr(node, '_render_effects'):
+            if hasattr(node, 'setRenderEffects'):
+                node.setRenderEffects(self.render_fx)
+            elif hasattr(node, '_render_effects'):
                 node._render_effects = self.render_fx 
                 node.update()
         self.view.scene().update()
 
+    def toggleEdgeBatching(self, val):
+        """
+        Toggle batched edge rendering.
+        """
+        self.batch_edges = val
+        log.info('toggling edge batching %s' % ('on' if val else 'off'))
+        self.view.scene().setBatchEdges(self.batch_edges)
+        self.view.scene().update()
+
+    def toggleLightweightPorts(self, val):
+        """
+        Toggle lightweight port rendering.
+        """
+        self.lightweight_ports = val
+        log.info('toggling lightweight ports %s' % ('on' if val else 'off'))
+        self.view.scene().setLightweightPorts(self.lightweight_ports)
+        self.view.scene().update()
+
+    def detailThresholdsChangedAction(self):
+        """
+        Runs when the level of detail preferences are changed.
+        """
+        self.lod_medium = self.lod_medium_spinbox.value()
+        self.lod_low = self.lod_low_spinbox.value()
+        self.view.setDetailThresholds(self.lod_medium, self.lod_low)
+
     def toggleLoggingLevel(self):
         """
         Toggle the logging level.
@@ -957,6 +1069,17 @@ class SceneGraphUI(form_class, base_class):
         if ae:
             ae.setNodes(self.view.scene().selectedDagNodes(), clear=True)
 
+    def layoutGraphAction(self):
+        """
+        Arrange the selected nodes (or the whole graph) with a layered layout.
+        """
+        node_ids = [dag.id for dag in self.view.scene().selectedDagNodes()]
+        if len(node_ids) < 2:
+            node_ids = []
+
+        log.info('laying out %d nodes.' % (len(node_ids) or len(self.graph.dagnodes)))
+        self.view.moveNodes(self.graph.layout_nodes, *node_ids)
+
     def setAutosaveDelay(self):
         """
         Update the autosave increment time.
@@ -1248,6 +1371,15 @@ class SceneGraphUI(form_class, base_class):
         #self.outputTextBrowser.clear()   
 
     #- Events ----
+    def showEvent(self, event):
+        """
+        Start loading external plugins once the window is shown.
+        """
+        if not self._external_plugins:
+            QtCore.QTimer.singleShot(0, self.loadExternalPlugins)
+            self._external_plugins = True
+        return super(SceneGraphUI, self).showEvent(event)
+
     def closeEvent(self, event):
         """
         Write window prefs when UI is closed
@@ -1398,6 +1530,27 @@ class SceneGraphUI(form_class, base_class):
             if render_fx is not None:
                 self.render_fx = bool(int(render_fx))
 
+        # batched edges (scene)
+        if not 'batch_edges' in kwargs:
+            batch_edges = self.qsettings.value("batch_edges")
+            self.batch_edges = False
+            if batch_edges is not None:
+                self.batch_edges = bool(int(batch_edges))
+
+        # lightweight ports (scene)
+        if not 'lightweight_ports' in kwargs:
+            lightweight_ports = self.qsettings.value("lightweight_ports")
+            self.lightweight_ports = False
+            if lightweight_ports is not None:
+                self.lightweight_ports = bool(int(lightweight_ports))
+
+        # level of detail thresholds (global)
+        for attr in ['lod_medium', 'lod_low']:
+            if attr not in kwargs:
+                value = self.qsettings.value(attr)
+                if value is not None:
+                    setattr(self, attr, float(value))
+
         # edge type (scene)
         if not 'edge_type' in kwargs:
             edge_type = self.qsettings.value("edge_type")
@@ -1554,6 +1707,61 @@ class SceneGraphUI(form_class, base_class):
             self.pmanager = PluginManager.PluginManager(self)
             self.pmanager.show()
 
+    def loadExternalPlugins(self):
+        """
+        Load plugins from SCENEGRAPH_PLUGIN_PATH in the background.
+        """
+        self._external_plugins = True
+        self.graph.plug_mgr.load_external_plugins(background=True)
+
+    def pluginsLoadedEvent(self, registry, node_types):
+        """
+        Callback method. Runs in the plugin loader thread, so pass the
+        node types to the ui thread with a signal.
+
+        :param PluginRegistry registry: plugin registry.
+        :param list node_types: loaded node types.
+        """
+        self.pluginsLoaded.emit(node_types)
+
+    def pluginsLoadedAction(self, node_types):
+        """
+        Update the ui when external plugins are loaded.
+
+        :param list node_types: loaded node types.
+        """
+        # import the widget classes on the ui thread
+        registry = self.graph.plug_mgr.registry
+        for node_type in node_types:
+            registry.widget_class(node_type)
+
+        self.updateStatus('plugins loaded: %s' % ', '.join(node_types))
+
+        # node menus are built from the current node types when shown,
+        # rebuild the nodes menu if it's open.
+        if self.menu_nodes.isVisible():
+            self.initializeNodesMenu()
+
+    def reloadPluginsAction(self):
+        """
+        Reload plugins whose source or metadata files have changed.
+        """
+        node_types = self.graph.plug_mgr.reload()
+        if node_types:
+            self.updateStatus('reloaded plugins: %s' % ', '.join(node_types))
+
+    def toggleAutoReloadPlugins(self, val):
+        """
+        Toggle polling the plugin files for changes.
+
+        :param bool val: watch plugin files.
+        """
+        if val:
+            self.plugin_timer.start(self.plugin_reload_inc)
+        else:
+            self.plugin_timer.stop()
+        log.info('plugin auto-reload %s' % ('on' if val else 'off'))
+
     def attributeManagerAction(self, action):
         """
         Launches the Attribute Manager.
@@ -1647,27 +1855,26 @@ class SceneGraphUI(form_class, base_class):
                 html_result += fline
         return html_result
 
+    def consoleVisibilityChangedAction(self, visible):
+        """
+        Refresh the console view status when the console is shown.
+        """
+        if visible:
+            self.view.updateStatus()
+
     def updateConsole(self, status):
         """
         Update the console data.
 
         :param dict status: data from GraphicsView mouseMoveEvent
         """        
-        self.sceneRectLineEdit.clear()
-        self.viewRectLineEdit.clear()
-        self.zoomLevelLineEdit.clear()
-
         if status.get('view_cursor'):
             vx, vy = status.get('view_cursor', (0.0,0.0))
-            self.view_posx.clear()
-            self.view_posy.clear()
             self.view_posx.setText('%.2f' % vx)
             self.view_posy.setText('%.2f' % vy)
 
         if status.get('scene_cursor'):
             sx, sy = status.get('scene_cursor', (0.0,0.0))
-            self.scene_posx.clear()
-            self.scene_posy.clear()
             self.scene_posx.setText('%.2f' % sx)
             self.scene_posy.setText('%.2f' % sy)
 
@@ -1711,6 +1918,32 @@ class SceneGraphUI(form_class, base_class):
         """
         pass
 
+    def toggleEventProfiling(self, val):
+        """
+        Toggle global event callback profiling.
+
+        :param bool val: enable profiling.
+        """
+        if val:
+            core.events.reset_profiling()
+        core.events.set_profiling(val)
+        log.info('event profiling %s' % ('on' if val else 'off'))
+
+    def exportEventProfileAction(self):
+        """
+        Write the event callback profiling data to a csv file.
+        """
+        filename, filters = QtGui.QFileDialog.getSaveFileName(self, caption='Export Event Profile', directory=os.getcwd(), filter="csv files (*.csv)")
+        if not filename:
+            return
+
+        bn, fext = os.path.splitext(filename)
+        if not fext:
+            filename = '%s.csv' % bn
+
+        count = core.events.export_profiling(filename)
+        log.info('writing %d event callbacks to: "%s"' % (count, filename))
+
     #- Dialogs -----
     def promptDialog(self, label, msg):
         """
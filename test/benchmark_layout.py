@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+"""
+Time LayeredLayout on a reproducible random DAG.
+
+    python benchmark_layout.py --nodes 10000 --seed 1
+    python benchmark_layout.py --no-numpy
+    python benchmark_layout.py --cycles 50
+
+Each node (except the first) gets one or two inputs from the
+previous `--window` nodes (any previous node with `--window 0`),
+plus `--cycles` random edges.
+"""
+import sys
+import time
+import random
+import argparse
+from SceneGraph.core import layout
+
+
+def random_dag(count, window=50, cycles=0, seed=1):
+    """
+    Returns node ids & edges of a random graph.
+
+    :param int count: number of nodes.
+    :param int window: inputs are picked from this many preceding nodes (0 for any).
+    :param int cycles: number of random edges added (may create cycles).
+    :param int seed: random seed.
+
+    :returns: node ids, edges.
+    :rtype: tuple
+    """
+    rng = random.Random(seed)
+    node_ids = ['node%d' % i for i in range(count)]
+    edges = []
+    for i in range(1, count):
+        for k in range(rng.randint(1, 2)):
+            j = rng.randrange(max(0, i - window) if window else 0, i)
+            edges.append((node_ids[j], node_ids[i]))
+
+    for k in range(cycles):
+        i, j = rng.sample(range(count), 2)
+        edges.append((node_ids[i], node_ids[j]))
+    return node_ids, edges
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Time the layered layout on a random DAG.')
+    parser.add_argument('--nodes', type=int, default=10000, help='number of nodes.')
+    parser.add_argument('--window', type=int, default=50, help='inputs are picked from this many preceding nodes (0 for any).')
+    parser.add_argument('--cycles', type=int, default=0, help='number of random (cycle forming) edges.')
+    parser.add_argument('--seed', type=int, default=1, help='random seed.')
+    parser.add_argument('--repeat', type=int, default=3, help='number of timed runs.')
+    parser.add_argument('--no-numpy', action='store_true', help='use the pure Python fallback.')
+    args = parser.parse_args(argv)
+
+    if args.no_numpy:
+        layout.np = None
+
+    node_ids, edges = random_dag(args.nodes, window=args.window, cycles=args.cycles, seed=args.seed)
+    times = []
+    for i in range(args.repeat):
+        start = time.time()
+        layout.LayeredLayout().run(node_ids, edges)
+        times.append(time.time() - start)
+
+    sys.stdout.write('nodes: %d, edges: %d, numpy: %s\n' % (len(node_ids), len(edges), layout.np is not None))
+    sys.stdout.write('best: %.3fs, mean: %.3fs (%d runs)\n' % (min(times), sum(times) / len(times), len(times)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+#!/usr/bin/env python
+import unittest
+from SceneGraph.core import attributes
+
+
+class VectorAttributeTests(unittest.TestCase):
+    """
+    Headless tests for typed vector attributes.
+    """
+    def test_float3(self):
+        attr = attributes.Attribute('translate', [1, 2, 3], attr_type='float3')
+        self.assertEqual(attr.value, [1.0, 2.0, 3.0])
+        self.assertEqual(attr.array.typecode, 'd')
+
+    def test_long_values(self):
+        attr = attributes.Attribute('size', [long(2), long(3)], attr_type='int2')
+        self.assertEqual(attr.value, [2, 3])
+
+    def test_color_alpha(self):
+        attr = attributes.Attribute('color', [255, 0, 0], attr_type='color')
+        self.assertEqual(attr.value, [255, 0, 0, 255])
+
+    def test_invalid_value_raises(self):
+        attr = attributes.Attribute('translate', [0, 0, 0], attr_type='float3')
+        self.assertRaises(ValueError, setattr, attr, 'value', 'abc')
+        self.assertRaises(ValueError, setattr, attr, 'value', [True, 0, 0])
+        self.assertEqual(attr.value, [0.0, 0.0, 0.0])
+
+    def test_invalid_value_on_read(self):
+        # legacy scene values fall back to the default vector
+        attr = attributes.Attribute('translate', 'abc', attr_type='float3')
+        self.assertEqual(attr.value, [0.0, 0.0, 0.0])
+
+        attr = attributes.Attribute('translate', [1, 2], attr_type='float3', default_value=[1, 1, 1])
+        self.assertEqual(attr.value, [1.0, 1.0, 1.0])
+
+    def test_invalid_value_on_update(self):
+        attr = attributes.Attribute('translate', [1, 2, 3], attr_type='float3')
+        attr.update(value='abc')
+        self.assertEqual(attr.value, [0.0, 0.0, 0.0])
+
+    def test_overflow(self):
+        attr = attributes.Attribute('size', [2 ** 80, 0], attr_type='int2')
+        self.assertEqual(attr.value, [0, 0])
+
+
+if __name__ == '__main__':
+    unittest.main()
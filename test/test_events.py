@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+import threading
+import unittest
+from SceneGraph import core
+from SceneGraph.core import events
+
+
+class Sender(object):
+    pass
+
+
+class EventBatchTests(unittest.TestCase):
+    """
+    Headless tests for EventHandler batching.
+    """
+    def setUp(self):
+        self.calls = []
+        self.handler = events.EventHandler(Sender())
+        self.handler += self.callback
+
+    def callback(self, sender, *args, **kwargs):
+        self.calls.append((args, kwargs))
+
+    def test_unbatched(self):
+        self.handler(['a'])
+        self.handler(['b'])
+        self.assertEqual(len(self.calls), 2)
+
+    def test_list_emissions_merged(self):
+        with events.EventBatch():
+            for nid in ['a', 'b', 'a', 'c']:
+                self.handler([nid])
+            self.assertEqual(self.calls, [])
+        self.assertEqual(self.calls, [((['a', 'b', 'c'],), {})])
+
+    def test_edge_dictionaries_merged(self):
+        edge = dict(src_id='a', dest_id='b', src_attr='output', dest_attr='input')
+        with events.EventBatch():
+            self.handler([edge])
+            self.handler([dict(edge)])
+            self.handler([dict(src_id='b', dest_id='c')])
+        self.assertEqual(len(self.calls), 1)
+        self.assertEqual([(e['src_id'], e['dest_id']) for e in self.calls[0][0][0]], [('a', 'b'), ('b', 'c')])
+
+    def test_keyword_emissions_merged(self):
+        with events.EventBatch():
+            self.handler(pos=(0, 0))
+            self.handler(pos=(10, 10), color='red')
+        self.assertEqual(self.calls, [((), {'pos': (10, 10), 'color': 'red'})])
+
+    def test_nested_batches(self):
+        with events.EventBatch():
+            with events.EventBatch():
+                self.handler(['a'])
+            self.assertEqual(self.calls, [])
+            self.handler(['b'])
+        self.assertEqual(self.calls, [((['a', 'b'],), {})])
+
+    def test_separate_batches(self):
+        for nid in ['a', 'b']:
+            with events.EventBatch():
+                self.handler([nid])
+                self.handler([nid])
+        self.assertEqual(self.calls, [((['a'],), {}), ((['b'],), {})])
+
+    def test_blocked(self):
+        self.handler.blockSignals(True)
+        with events.EventBatch():
+            self.handler(['a'])
+        self.handler.blockSignals(False)
+        self.assertEqual(self.calls, [])
+
+    def test_other_scope_not_batched(self):
+        sender = Sender()
+        sender.event_scope = events.EventScope()
+        handler = events.EventHandler(sender)
+        handler += self.callback
+
+        with events.EventBatch():
+            handler(['a'])
+            self.assertEqual(self.calls, [((['a'],), {})])
+
+        with events.EventBatch(sender.event_scope):
+            handler(['b'])
+            self.handler(['c'])
+            self.assertEqual(self.calls, [((['a'],), {}), ((['c'],), {})])
+        self.assertEqual(self.calls[-1], ((['b'],), {}))
+
+    def test_other_thread_not_batched(self):
+        with events.EventBatch():
+            thread = threading.Thread(target=self.handler, args=(['a'],))
+            thread.start()
+            thread.join()
+            self.assertEqual(self.calls, [((['a'],), {})])
+
+    def test_weak_callback(self):
+        class Observer(object):
+            def callback(self, sender, *args):
+                pass
+
+        observer = Observer()
+        self.handler += observer.callback
+        self.assertEqual(len(self.handler), 2)
+        del observer
+        self.assertEqual(len(self.handler), 1)
+
+
+class GraphBatchTests(unittest.TestCase):
+    """
+    Graph batches only defer the events of their own graph.
+    """
+    def test_other_graph_not_batched(self):
+        graph1 = core.Graph()
+        graph2 = core.Graph()
+        node1 = graph1.add_node('default', name='node1')
+        node2 = graph2.add_node('default', name='node2')
+
+        moved = []
+        node1.nodePositionChanged += lambda node, *args, **kwargs: moved.append(node.name)
+        node2.nodePositionChanged += lambda node, *args, **kwargs: moved.append(node.name)
+        graph2.nodesAdded += lambda graph, ids: moved.append('added')
+
+        with graph1.batch():
+            node1.pos = (10.0, 0.0)
+            node2.pos = (10.0, 0.0)
+            graph2.add_node('default', name='node3')
+            self.assertEqual(moved, ['node2', 'added'])
+        self.assertEqual(moved, ['node2', 'added', 'node1'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,273 @@
+#!/usr/bin/env python
+import random
+import unittest
+from SceneGraph import core
+from SceneGraph.core import graph
+
+
+class GraphEdgeTests(unittest.TestCase):
+    """
+    Headless tests for graph edges & the edge registry.
+    """
+    def setUp(self):
+        self.graph = core.Graph()
+        self.n1 = self.graph.add_node('default', name='node1')
+        self.n2 = self.graph.add_node('default', name='node2')
+        self.n3 = self.graph.add_node('default', name='node3')
+
+    def test_add_edge(self):
+        self.assertTrue(self.graph.add_edge(self.n1, self.n3, src_attr='output', dest_attr='input'))
+        self.assertEqual(self.graph.edge_registry.count(self.n3.id, 'input'), 1)
+        self.assertTrue(self.n3.get_connection('input').is_connected)
+
+    def test_reconnect_occupied_input(self):
+        """
+        Reconnecting an occupied input removes the existing graph edge first
+        (see GraphicsScene.validateConnection).
+        """
+        self.graph.add_edge(self.n1, self.n3, src_attr='output', dest_attr='input')
+
+        # the input only accepts one connection
+        self.assertFalse(self.graph.add_edge(self.n2, self.n3, src_attr='output', dest_attr='input'))
+
+        self.assertTrue(self.graph.remove_edge(self.n1.id, self.n3.id))
+        self.assertTrue(self.graph.add_edge(self.n2, self.n3, src_attr='output', dest_attr='input'))
+
+        self.assertEqual(self.graph.edge_registry.count(self.n3.id, 'input'), 1)
+        self.assertEqual(self.graph.edge_registry.node_edges(self.n3.id), [(self.n2.id, self.n3.id)])
+        self.assertEqual(self.graph.upstream(self.n3), set([self.n2.id]))
+        self.assertEqual(self.graph.downstream(self.n1), set())
+
+
+class GraphPositionTests(unittest.TestCase):
+    """
+    Headless tests for node positions.
+    """
+    def setUp(self):
+        self.graph = core.Graph()
+        self.n1 = self.graph.add_node('default', name='node1', pos=(0.0, 0.0))
+        self.n2 = self.graph.add_node('default', name='node2', pos=(100.0, 50.0))
+
+    def assertPosition(self, node, pos):
+        self.assertEqual(tuple(node.pos), pos)
+        self.assertEqual(self.graph.positions.get(node.id), pos)
+        self.assertEqual(tuple(self.graph.network.node[node.id]['pos']), pos)
+
+    def test_set_position(self):
+        self.n1.pos = (10.0, 20.0)
+        self.assertPosition(self.n1, (10.0, 20.0))
+
+    def test_set_position_batched(self):
+        moved = []
+        self.graph.nodesMoved += lambda graph, ids: moved.extend(ids)
+        with self.graph.batch():
+            self.n1.pos = (10.0, 20.0)
+            # read back before the position events are sent
+            self.assertPosition(self.n1, (10.0, 20.0))
+            self.graph.offset_nodes((5.0, 5.0), self.n1)
+        self.assertPosition(self.n1, (15.0, 25.0))
+        self.assertEqual(moved, [self.n1.id])
+
+    def test_offset_nodes(self):
+        self.assertEqual(self.graph.offset_nodes((5.0, -5.0)), [self.n1.id, self.n2.id])
+        self.assertPosition(self.n1, (5.0, -5.0))
+        self.assertPosition(self.n2, (105.0, 45.0))
+
+    def test_snap_nodes(self):
+        self.n1.pos = (14.0, 16.0)
+        self.graph.snap_nodes(self.n1, size=(10.0, 10.0))
+        self.assertPosition(self.n1, (10.0, 20.0))
+
+    def test_bounds(self):
+        self.assertEqual(self.graph.bounds(), (0.0, 0.0, 100.0, 50.0))
+        self.assertEqual(self.graph.bounds(self.n2), (100.0, 50.0, 100.0, 50.0))
+
+
+class EdgeRegistryTests(unittest.TestCase):
+    """
+    Tests for the edge & port index.
+    """
+    def setUp(self):
+        self.registry = graph.EdgeRegistry()
+        self.registry.add('a', 'output', 'b', 'input')
+        self.registry.add('a', 'output', 'c', 'input')
+        self.registry.add('b', 'output', 'c', 'extra')
+
+    def test_add(self):
+        self.assertEqual(len(self.registry), 3)
+        self.assertIn(('a', 'b'), self.registry)
+        self.assertEqual(self.registry.ports('a', 'b'), (('a', 'output'), ('b', 'input')))
+        self.assertEqual(self.registry.port_edges('a', 'output'), [('a', 'b'), ('a', 'c')])
+        self.assertEqual(self.registry.node_edges('c'), [('a', 'c'), ('b', 'c')])
+        self.assertEqual(self.registry.count('a', 'output'), 2)
+
+    def test_add_replaces_edge(self):
+        self.registry.add('a', 'other', 'b', 'input')
+        self.assertEqual(len(self.registry), 3)
+        self.assertEqual(self.registry.port_edges('a', 'output'), [('a', 'c')])
+        self.assertEqual(self.registry.port_edges('a', 'other'), [('a', 'b')])
+        self.assertEqual(self.registry.count('b', 'input'), 1)
+
+    def test_remove(self):
+        self.assertEqual(self.registry.remove('a', 'b'), (('a', 'output'), ('b', 'input')))
+        self.assertEqual(self.registry.remove('a', 'b'), ())
+        self.assertFalse(self.registry.is_connected('b', 'input'))
+        self.assertEqual(self.registry.node_edges('b'), [('b', 'c')])
+
+    def test_remove_node(self):
+        self.assertEqual(self.registry.remove_node('c'), [('a', 'c'), ('b', 'c')])
+        self.assertEqual(len(self.registry), 1)
+        self.assertEqual(self.registry.node_edges('c'), [])
+        self.assertEqual(self.registry.port_edges('a', 'output'), [('a', 'b')])
+        self.assertFalse(self.registry.is_connected('b', 'output'))
+
+    def test_rename_port(self):
+        self.registry.rename_port('c', 'input', 'source')
+        self.assertFalse(self.registry.is_connected('c', 'input'))
+        self.assertEqual(self.registry.port_edges('c', 'source'), [('a', 'c')])
+        self.assertEqual(self.registry.ports('a', 'c'), (('a', 'output'), ('c', 'source')))
+
+
+class ReachabilityIndexTests(unittest.TestCase):
+    """
+    Tests for the transitive closure index. Random graphs are 
+    checked against a plain graph walk.
+    """
+    def walk(self, succ, node_id):
+        result = set()
+        stack = list(succ.get(node_id, ()))
+        while stack:
+            nid = stack.pop()
+            if nid not in result:
+                result.add(nid)
+                stack.extend(succ.get(nid, ()))
+        result.discard(node_id)
+        return result
+
+    def assertClosure(self, index, edges):
+        succ = dict()
+        pred = dict()
+        for src, dest in edges:
+            succ.setdefault(src, set()).add(dest)
+            pred.setdefault(dest, set()).add(src)
+
+        for node_id in range(20):
+            if node_id not in index:
+                continue
+            self.assertEqual(index.descendants(node_id), self.walk(succ, node_id))
+            self.assertEqual(index.ancestors(node_id), self.walk(pred, node_id))
+
+    def test_chain(self):
+        index = graph.ReachabilityIndex()
+        index.add_edge('a', 'b')
+        index.add_edge('b', 'c')
+        self.assertTrue(index.has_path('a', 'c'))
+        self.assertFalse(index.has_path('c', 'a'))
+        self.assertTrue(index.is_adjacent('b', 'a'))
+        self.assertFalse(index.is_adjacent('a', 'c'))
+
+        index.remove_edge('a', 'b')
+        self.assertFalse(index.has_path('a', 'c'))
+        self.assertEqual(index.ancestors('c'), set(['b']))
+
+    def test_cycle(self):
+        index = graph.ReachabilityIndex()
+        index.add_edge('a', 'b')
+        index.add_edge('b', 'a')
+        self.assertEqual(index.descendants('a'), set(['b']))
+        self.assertTrue(index.has_path('a', 'a'))
+
+    def test_remove_node_reuses_slot(self):
+        index = graph.ReachabilityIndex()
+        index.add_edge('a', 'b')
+        index.add_edge('b', 'c')
+        index.remove_node('b')
+        self.assertNotIn('b', index)
+        self.assertEqual(index.descendants('a'), set())
+
+        index.add_edge('c', 'd')
+        self.assertEqual(len(index), 3)
+        self.assertEqual(index.ancestors('d'), set(['c']))
+
+    def test_random_graphs(self):
+        rng = random.Random(7)
+        for trial in range(20):
+            index = graph.ReachabilityIndex()
+            edges = set()
+            for step in range(60):
+                src, dest = rng.randrange(20), rng.randrange(20)
+                if rng.random() < 0.7 or not edges:
+                    index.add_edge(src, dest)
+                    edges.add((src, dest))
+                elif rng.random() < 0.8:
+                    src, dest = rng.choice(sorted(edges))
+                    index.remove_edge(src, dest)
+                    edges.discard((src, dest))
+                else:
+                    index.remove_node(src)
+                    edges = set(e for e in edges if src not in e)
+            self.assertClosure(index, edges)
+
+
+class PositionStoreTests(unittest.TestCase):
+    """
+    Tests for the position store, with & without NumPy.
+    """
+    def setUp(self):
+        self.numpy = graph.np
+
+    def tearDown(self):
+        graph.np = self.numpy
+
+    def positions(self, use_numpy):
+        graph.np = self.numpy if use_numpy else None
+
+        store = graph.PositionStore(capacity=2)
+        for i, pos in enumerate([(-15.0, 5.0), (25.0, -25.0), (14.9, 35.0), (-5.0, 0.0)]):
+            store.add('node%d' % i, pos)
+        return store
+
+    def check_snap(self, use_numpy):
+        store = self.positions(use_numpy)
+        store.snap(size=(10.0, 10.0))
+        expected = [(-10.0, 10.0), (30.0, -20.0), (10.0, 40.0), (0.0, 0.0)]
+        self.assertEqual([store.get('node%d' % i) for i in range(4)], expected)
+
+    def check_remove_reuses_slot(self, use_numpy):
+        store = self.positions(use_numpy)
+        slot = store.slot('node1')
+        store.remove('node1')
+        self.assertEqual(store.add('node4', (1.0, 2.0)), slot)
+        self.assertEqual(store.get('node4'), (1.0, 2.0))
+        self.assertEqual(len(store), 4)
+
+    def check_set_many(self, use_numpy):
+        store = self.positions(use_numpy)
+        store.set_many(['node3', 'missing', 'node0'], [(1.0, 1.0), (2.0, 2.0), (3.0, 3.0)])
+        self.assertEqual(store.get('node3'), (1.0, 1.0))
+        self.assertEqual(store.get('node0'), (3.0, 3.0))
+        self.assertEqual(store.bounds(), (1.0, -25.0, 25.0, 35.0))
+
+    def test_snap(self):
+        self.check_snap(False)
+
+    @unittest.skipIf(graph.np is None, 'NumPy is not installed.')
+    def test_snap_numpy(self):
+        self.check_snap(True)
+
+    def test_remove_reuses_slot(self):
+        self.check_remove_reuses_slot(False)
+
+    @unittest.skipIf(graph.np is None, 'NumPy is not installed.')
+    def test_remove_reuses_slot_numpy(self):
+        self.check_remove_reuses_slot(True)
+
+    def test_set_many(self):
+        self.check_set_many(False)
+
+    @unittest.skipIf(graph.np is None, 'NumPy is not installed.')
+    def test_set_many_numpy(self):
+        self.check_set_many(True)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+import random
+import unittest
+from SceneGraph import core
+from SceneGraph.core import layout
+
+
+def random_graph(seed, count, acyclic=True):
+    """
+    Returns node ids, edges & node sizes of a random graph.
+    """
+    rng = random.Random(seed)
+    node_ids = ['node%d' % i for i in range(count)]
+    edges = []
+    for i in range(1, count):
+        for k in range(rng.randint(0, 2)):
+            j = rng.randrange(max(0, i - 8), i)
+            edges.append((node_ids[j], node_ids[i]))
+
+    if not acyclic:
+        for k in range(count // 4 + 1):
+            i, j = rng.randrange(count), rng.randrange(count)
+            edges.append((node_ids[max(i, j)], node_ids[min(i, j)]))
+
+    sizes = dict((nid, (rng.randint(50, 200), rng.randint(30, 150))) for nid in node_ids)
+    return node_ids, edges, sizes
+
+
+class LayeredLayoutTests(unittest.TestCase):
+    """
+    Headless tests for the layered layout, with & without NumPy.
+    """
+    def setUp(self):
+        self.numpy = layout.np
+
+    def tearDown(self):
+        layout.np = self.numpy
+
+    def run_layout(self, node_ids, edges, sizes, use_numpy=False, **kwargs):
+        if use_numpy and self.numpy is None:
+            self.skipTest('NumPy is not installed.')
+        layout.np = self.numpy if use_numpy else None
+
+        result_ids, pos = layout.LayeredLayout(**kwargs).run(node_ids, edges, sizes)
+        self.assertEqual(list(result_ids), list(node_ids))
+        return dict((nid, (float(p[0]), float(p[1]))) for nid, p in zip(result_ids, pos))
+
+    def assertNoOverlaps(self, positions, sizes):
+        boxes = []
+        for nid, (x, y) in positions.items():
+            w, h = sizes[nid]
+            boxes.append((nid, x - w / 2.0, y - h / 2.0, x + w / 2.0, y + h / 2.0))
+
+        for i, (n1, l1, t1, r1, b1) in enumerate(boxes):
+            for n2, l2, t2, r2, b2 in boxes[i + 1:]:
+                overlap = min(r1, r2) - max(l1, l2) > 1e-6 and min(b1, b2) - max(t1, t2) > 1e-6
+                self.assertFalse(overlap, 'nodes overlap: "%s", "%s"' % (n1, n2))
+
+    def test_empty(self):
+        self.assertEqual(layout.LayeredLayout().run([], []), ([], []))
+
+    def test_no_overlaps(self):
+        for seed in range(5):
+            node_ids, edges, sizes = random_graph(seed, 40)
+            for orientation in ['horizontal', 'vertical']:
+                positions = self.run_layout(node_ids, edges, sizes, orientation=orientation)
+                self.assertNoOverlaps(positions, sizes)
+
+    def test_layers_follow_edges(self):
+        for seed in range(5):
+            node_ids, edges, sizes = random_graph(seed, 40)
+            horizontal = self.run_layout(node_ids, edges, sizes)
+            vertical = self.run_layout(node_ids, edges, sizes, orientation='vertical')
+            for src, dest in edges:
+                self.assertLess(horizontal[src][0], horizontal[dest][0])
+                self.assertLess(vertical[src][1], vertical[dest][1])
+
+    def test_cycles(self):
+        node_ids = ['a', 'b', 'c', 'd']
+        edges = [('a', 'b'), ('b', 'c'), ('c', 'a'), ('c', 'd'), ('d', 'd')]
+        sizes = dict((nid, (100, 50)) for nid in node_ids)
+        positions = self.run_layout(node_ids, edges, sizes)
+        self.assertNoOverlaps(positions, sizes)
+
+        for seed in range(5):
+            node_ids, edges, sizes = random_graph(seed, 40, acyclic=False)
+            positions = self.run_layout(node_ids, edges, sizes)
+            self.assertEqual(len(positions), 40)
+            self.assertNoOverlaps(positions, sizes)
+
+    def test_origin(self):
+        node_ids, edges, sizes = random_graph(0, 10)
+        positions = self.run_layout(node_ids, edges, sizes)
+        self.assertEqual(min(p[0] for p in positions.values()), 0.0)
+        self.assertEqual(min(p[1] for p in positions.values()), 0.0)
+
+    def test_numpy_matches_fallback(self):
+        for seed in range(10):
+            node_ids, edges, sizes = random_graph(seed, 60, acyclic=bool(seed % 2))
+            for orientation in ['horizontal', 'vertical']:
+                expected = self.run_layout(node_ids, edges, sizes, orientation=orientation)
+                result = self.run_layout(node_ids, edges, sizes, use_numpy=True, orientation=orientation)
+                for nid in node_ids:
+                    self.assertAlmostEqual(result[nid][0], expected[nid][0], places=6)
+                    self.assertAlmostEqual(result[nid][1], expected[nid][1], places=6)
+
+
+class GraphLayoutTests(unittest.TestCase):
+    """
+    Tests for laying out graph nodes.
+    """
+    def test_layout_nodes(self):
+        g = core.Graph()
+        n1 = g.add_node('default', name='node1')
+        n2 = g.add_node('default', name='node2')
+        n3 = g.add_node('default', name='node3')
+        g.add_edge(n1, n2, src_attr='output', dest_attr='input')
+        g.add_edge(n2, n3, src_attr='output', dest_attr='input')
+
+        g.layout_nodes()
+        self.assertLess(n1.pos[0], n2.pos[0])
+        self.assertLess(n2.pos[0], n3.pos[0])
+        for node in [n1, n2, n3]:
+            self.assertEqual(g.positions.get(node.id), tuple(node.pos))
+
+
+if __name__ == '__main__':
+    unittest.main()
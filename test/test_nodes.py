@@ -0,0 +1,46 @@
+#!/usr/bin/env python
+import unittest
+from SceneGraph import core
+
+
+class NodeConnectionTests(unittest.TestCase):
+    """
+    Headless tests for dag node connection caches.
+    """
+    def setUp(self):
+        self.graph = core.Graph()
+        self.node = self.graph.add_node('default', name='node1')
+
+    def test_connection_lists(self):
+        self.assertEqual(self.node.inputs, ['input'])
+        self.assertEqual(self.node.outputs, ['output'])
+        self.assertEqual(sorted(self.node.connections), ['input', 'output'])
+
+    def test_results_are_copies(self):
+        self.node.inputs.append('bogus')
+        self.node.connections.remove('input')
+        self.assertEqual(self.node.inputs, ['input'])
+        self.assertIn('input', self.node.connections)
+
+    def test_connection_type_changed(self):
+        self.node.get_connection('input').connection_type = 'output'
+        self.assertEqual(self.node.inputs, [])
+        self.assertEqual(sorted(self.node.outputs), ['input', 'output'])
+
+    def test_connectable_changed(self):
+        attr = self.node.add_attr('extra', 1.0)
+        self.assertNotIn('extra', self.node.connections)
+
+        attr.update(connectable=True, connection_type='input')
+        self.assertIn('extra', self.node.inputs)
+
+        attr.connectable = False
+        self.assertNotIn('extra', self.node.connections)
+
+    def test_rename_connection(self):
+        self.node.rename_attr('input', 'source')
+        self.assertEqual(self.node.inputs, ['source'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+import unittest
+from SceneGraph import core
+from SceneGraph.core import plugins
+from SceneGraph.options import SCENEGRAPH_PLUGIN_PATH
+
+
+class PluginManagerTests(unittest.TestCase):
+    """
+    Headless tests for the plugin manager.
+    """
+    def test_plugin_paths(self):
+        manager = core.PluginManager(paths=['/tmp/external_plugins'])
+        self.assertEqual(manager.plugin_paths(), (manager.default_plugin_path, '/tmp/external_plugins'))
+        self.assertEqual(manager.default_plugin_path, SCENEGRAPH_PLUGIN_PATH)
+
+
+
+class PluginSourceTests(unittest.TestCase):
+    """
+    Tests for importing plugin classes from source files.
+    """
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.files = []
+        for i in range(2):
+            path = os.path.join(self.root, 'path%d' % i)
+            os.makedirs(path)
+            filename = os.path.join(path, 'json.py')
+            with open(filename, 'w') as fn:
+                fn.write('class ExtNode(object):\n    value = %d\n' % i)
+            self.files.append(filename)
+
+    def tearDown(self):
+        for filename in self.files:
+            sys.modules.pop(plugins.source_module_name(filename), None)
+        shutil.rmtree(self.root)
+
+    def test_module_names(self):
+        names = [plugins.source_module_name(f) for f in self.files]
+        self.assertNotEqual(names[0], names[1])
+        self.assertNotIn('json', names)
+        self.assertEqual(plugins.source_module_name(plugins.__file__), 'SceneGraph.core.plugins')
+
+    def test_load_source_class(self):
+        classes = [plugins.load_source_class(f, 'ExtNode') for f in self.files]
+        self.assertEqual([c.value for c in classes], [0, 1])
+
+        # the standard module is untouched
+        self.assertIs(sys.modules.get('json'), json)
+        self.assertIs(plugins.load_source_class(self.files[0], 'ExtNode'), classes[0])
+
+    def test_ignore_other_module(self):
+        mod_name = plugins.source_module_name(self.files[0])
+        sys.modules[mod_name] = json
+        self.assertIsNone(plugins.source_module(self.files[0]))
+        self.assertEqual(plugins.load_source_class(self.files[0], 'ExtNode').value, 0)
+        self.assertFalse(hasattr(json, 'ExtNode'))
+
+
+
+class PluginReloadTests(unittest.TestCase):
+    """
+    Tests for reloading changed plugin sources.
+    """
+    source = '''from SceneGraph.core.nodes import DagNode
+
+
+class ReloadNode(DagNode):
+    node_type     = "reloadtest"
+    node_class    = "container"
+    default_name  = "reload"
+    version       = %d
+
+    def __init__(self, name=None, **kwargs):
+        DagNode.__init__(self, name, **kwargs)
+'''
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.filename = os.path.join(self.root, 'reloadnode.py')
+        self.write(1)
+        self.registry = plugins.PluginRegistry(manifest=os.path.join(self.root, 'manifest.json'))
+
+    def tearDown(self):
+        sys.modules.pop(plugins.source_module_name(self.filename), None)
+        shutil.rmtree(self.root)
+
+    def write(self, version):
+        with open(self.filename, 'w') as fn:
+            fn.write(self.source % version)
+
+        # make sure the modification time changes
+        mtime = time.time() + version
+        os.utime(self.filename, (mtime, mtime))
+
+    def test_reload(self):
+        self.assertEqual(self.registry.load_external([self.root]), ['reloadtest'])
+        self.assertEqual(self.registry.dagnode_class('reloadtest').version, 1)
+        self.assertEqual(self.registry.reload(), [])
+
+        reloaded = []
+        self.registry.pluginsReloaded += lambda registry, node_types: reloaded.extend(node_types)
+        self.write(2)
+        self.assertEqual(self.registry.reload(), ['reloadtest'])
+        self.assertEqual(reloaded, ['reloadtest'])
+        self.assertEqual(self.registry.dagnode_class('reloadtest').version, 2)
+        self.assertIn('default', self.registry)
+
+
+if __name__ == '__main__':
+    unittest.main()
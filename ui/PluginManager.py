@@ -122,7 +122,7 @@ class PluginManager(QtGui.QDialog):
 
     def connectSignals(self):
         self.button_disable.clicked.connect(self.disabledAction)
-        self.button_reload.clicked.connect(self.checkPlugins)
+        self.button_reload.clicked.connect(self.reloadAction)
         self.buttonBox.accepted.connect(self.acceptedAction)
         self.buttonBox.rejected.connect(self.close)
 
@@ -150,16 +150,28 @@ class PluginManager(QtGui.QDialog):
             enabled =pattrs.get('enabled')
             if dagnode is not None:
                 dagnode=dagnode.__name__
+            else:
+                # plugin module hasn't been imported yet
+                dagnode = pattrs.get('dagnode_class', None)
             
             widget = pattrs.get('widget', None)
             if widget is not None:
                 widget=widget.__name__
+            else:
+                widget = pattrs.get('widget_class', None)
 
             metadata = pattrs.get('metadata', None)
             data.append([pname, dagnode, src, enabled])
 
         self.tableModel.addPlugins(data)
 
+    def reloadAction(self):
+        """
+        Reload modified plugins & rebuild the table.
+        """
+        self.plugin_manager.reload()
+        self.checkPlugins()
+
     def selectedPlugins(self):
         """
         returns:
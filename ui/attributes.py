@@ -112,7 +112,7 @@ class AttributeEditor(QtGui.QWidget):
                 private = attr_attrs.get('private', False)
                 attr_label = attr_attrs.get('label', None)
                 desc = attr_attrs.get('desc', None)
-                edges = attr_attrs.get('_edges', [])
+                edges = attr_attrs.get('edges', [])
 
                 # use label from metadata, if available
                 if not attr_label:
@@ -156,11 +156,13 @@ class AttributeEditor(QtGui.QWidget):
                                 # connected edges
                                 if edges:
                                     for edge in edges:
-                                        src_id, dest_id = edge.strip('()').split(',')
-                                        if self._graph.get_edge(src_id, dest_id):
-                                            src_id, dest_id, edge_attrs = self._graph.get_edge(src_id, dest_id)[0]
-                                            dagnode = self._graph.get_node(src_id)[0]
-                                            conn_str = '%s.%s' % (dagnode.name, edge_attrs.get('src_attr'))
+                                        ports = self._graph.edge_registry.ports(*edge)
+                                        if ports:
+                                            src_id, src_attr = ports[0]
+                                            dagnode = self._graph.dagnodes.get(src_id)
+                                            if dagnode is None:
+                                                continue
+                                            conn_str = '%s.%s' % (dagnode.name, src_attr)
                                             #print 'connection: ', conn_str
                                             editor.setConnected(conn_str)
 
@@ -379,14 +381,14 @@ class AttributeEditor(QtGui.QWidget):
                         if attribute in node._attributes.keys():
                             # get the attribute object
                             attr_node = node.get_attr(attribute)
-                            edges = attr_node._edges
+                            edges = attr_node.edges
 
                         attr_dict['private'] = properties.get('private', False)
                         attr_dict['label'] = properties.get('label', {}).get('value', None)
                         attr_dict['desc'] = properties.get('desc', {}).get('value', None)
-                        attr_dict['_edges'] = edges
+                        attr_dict['edges'] = edges
                         
-                        # need: private, label, desc, _edges
+                        # need: private, label, desc, edges
                         result[attribute] = attr_dict
         return result
 
@@ -1,5 +1,6 @@
 #!/usr/bin/env python
 import re
+import time
 from PySide import QtGui
 
 
@@ -32,6 +33,42 @@ class SceneNodesCommand(QtGui.QUndoCommand):
         self.restored = False
 
 
+class NodesMovedCommand(SceneNodesCommand):
+    """
+    Command to track node moves. Consecutive moves of the same 
+    nodes are merged into a single undo entry.
+    """
+    merge_interval = 1.0                                # maximum time between merged moves (seconds)
+
+    def __init__(self, old, new, scene, node_ids, msg='nodes moved', parent=None):
+        SceneNodesCommand.__init__(self, old, new, scene, msg=msg, parent=parent)
+
+        self.node_ids        = set(node_ids)
+        self.timestamp       = time.time()
+
+    def id(self):
+        return (0xAC00 + 0x0004)
+
+    def mergeWith(self, other):
+        """
+        Merge a following move of the same nodes.
+
+        :param NodesMovedCommand other: next command.
+
+        :returns: command was merged.
+        :rtype: bool
+        """
+        if other.id() != self.id() or other.node_ids != self.node_ids:
+            return False
+
+        if other.timestamp - self.timestamp > self.merge_interval:
+            return False
+
+        self.data_new        = other.data_new
+        self.timestamp       = other.timestamp
+        return True
+
+
 class SceneChangedCommand(QtGui.QUndoCommand):
     """
     Command to track scene changes.
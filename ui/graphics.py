@@ -1,5 +1,7 @@
 #!/usr/bin/env python
 import os
+import time
+from collections import deque
 from PySide import QtCore, QtGui
 from functools import partial
 from SceneGraph import core
@@ -28,6 +30,9 @@ class GraphicsView(QtGui.QGraphicsView):
     selectionChanged  = QtCore.Signal()
     nodesChanged      = QtCore.Signal(list)
 
+    # maximum number of status updates per second (see updateStatus)
+    status_rate       = 10
+
     def __init__(self, parent=None, ui=None, use_gl=False, debug=False, **kwargs):
         QtGui.QGraphicsView.__init__(self, parent)
 
@@ -37,9 +42,19 @@ class GraphicsView(QtGui.QGraphicsView):
         self._scale              = 1
         self.current_cursor_pos  = QtCore.QPointF(0, 0)
         self._nodes_to_copy      = []   
+        self.snap_size           = (25.0, 25.0)
+        self.nudge_size          = 10.0
+
+        # throttled status updates
+        self._status_pos         = None                     # last cursor position (view coordinates)
+        self._status_time        = 0.0                      # time of the last status update
+        self._status_timer       = QtCore.QTimer(self)
+        self._status_timer.setSingleShot(True)
+        self._status_timer.timeout.connect(self.emitStatus)
 
         self.initializeSceneGraph(ui.graph, ui, use_gl=use_gl, debug=debug)
         self.viewport_mode       = self._parent.viewport_mode
+        self.setDetailThresholds(getattr(ui, 'lod_medium', None), getattr(ui, 'lod_low', None))
         
         # Mouse Interaction
         self.setCacheMode(QtGui.QGraphicsView.CacheBackground)
@@ -121,6 +136,52 @@ class GraphicsView(QtGui.QGraphicsView):
 
         self.setViewportUpdateMode(mode)
 
+    def setDetailThresholds(self, medium=None, low=None):
+        """
+        Set the zoom levels at which nodes & edges are drawn with less detail.
+
+        :param float medium: zoom level below which labels are hidden.
+        :param float low: zoom level below which nodes & edges are simplified.
+        """
+        node_widgets.set_lod_thresholds(medium=medium, low=low)
+        self.updateDetailLevel()
+        self.scene().update()
+
+    def updateDetailLevel(self):
+        """
+        Update the scene level of detail from the current view transform.
+        Called whenever the view transform changes, never while painting.
+        """
+        if self.scene() is None:
+            return
+        lod = QtGui.QStyleOptionGraphicsItem.levelOfDetailFromTransform(self.transform())
+        self.scene().setDetailLevel(node_widgets.lod_tier(lod))
+
+    #- Transforms ----
+    def scale(self, sx, sy):
+        QtGui.QGraphicsView.scale(self, sx, sy)
+        self.updateDetailLevel()
+
+    def fitInView(self, *args):
+        QtGui.QGraphicsView.fitInView(self, *args)
+        self.updateDetailLevel()
+
+    def resetMatrix(self):
+        QtGui.QGraphicsView.resetMatrix(self)
+        self.updateDetailLevel()
+
+    def resetTransform(self):
+        QtGui.QGraphicsView.resetTransform(self)
+        self.updateDetailLevel()
+
+    def setTransform(self, *args):
+        QtGui.QGraphicsView.setTransform(self, *args)
+        self.updateDetailLevel()
+
+    def rotate(self, angle):
+        QtGui.QGraphicsView.rotate(self, angle)
+        self.updateDetailLevel()
+
     def connectSignals(self):
         """
         Connect widget signals.
@@ -208,13 +269,44 @@ class GraphicsView(QtGui.QGraphicsView):
         scene_attributes = self.getSceneAttributes()
         self.scene().network.graph.update(**scene_attributes)
 
-    def updateStatus(self, event):
+    def updateStatus(self, event=None):
         """
-        Update the parent console widget with the view status.
+        Request a status update for the parent console widget. Updates 
+        are skipped while the console is hidden, and are sent at most 
+        `status_rate` times per second.
 
         :param QtCore.QEvent event: event object.
         """
-        #action.setData((action.data()[0], self.mapToScene(menuLocation)))
+        if hasattr(event, 'pos'):
+            self._status_pos = event.pos()
+
+        if not self.statusVisible():
+            return
+
+        wait = (1.0 / self.status_rate) - (time.time() - self._status_time)
+        if wait <= 0:
+            self.emitStatus()
+        elif not self._status_timer.isActive():
+            # send the trailing update, so the console ends up current
+            self._status_timer.start(int(wait * 1000))
+
+    def statusVisible(self):
+        """
+        Returns true if the parent console widget is visible.
+
+        :rtype: bool
+        """
+        console = getattr(self._parent, 'consoleWidget', None)
+        if console is None:
+            return True
+        return console.isVisible()
+
+    def emitStatus(self):
+        """
+        Compute the view status and send it to the parent console widget.
+        """
+        self._status_time = time.time()
+
         # provide debug feedback
         status = dict(
             view_size = self.getContentsSize(),
@@ -222,9 +314,9 @@ class GraphicsView(QtGui.QGraphicsView):
             zoom_level = self.getScaleFactor(),
             )
  
-        if hasattr(event, 'pos'):
-            epos = event.pos()
-            spos = self.mapToScene(event.pos())
+        if self._status_pos is not None:
+            epos = self._status_pos
+            spos = self.mapToScene(epos)
             status['view_cursor'] = (epos.x(), epos.y())            
             status['scene_cursor'] = (spos.x(), spos.y())
             status['scene_pos'] = self.getCenterPoint()
@@ -245,11 +337,10 @@ class GraphicsView(QtGui.QGraphicsView):
 
         :param QtCore.QEvent event: mouse event
         """     
-        selected_nodes = self.scene().selectedNodes()
-        event_item = self.itemAt(event.pos())
         nodes_to_move = []
         if event.buttons() & QtCore.Qt.LeftButton:            
             if event.modifiers() & QtCore.Qt.AltModifier:
+                selected_nodes = self.scene().selectedNodes()
                 if selected_nodes:                    
                     for sel_node in selected_nodes:
                         if hasattr(sel_node, 'dagnode'):
@@ -320,13 +411,41 @@ class GraphicsView(QtGui.QGraphicsView):
         hover_nodes = self.scene()._hover_nodes
 
         if event.key() == QtCore.Qt.Key_A:
-            # get the bounding rect of the graphics scene
-            boundsRect = self.scene().itemsBoundingRect()            
+            # get the bounding rect of the node positions
+            bounds = self.scene().graph.bounds()
+            if bounds is not None:
+                xmin, ymin, xmax, ymax = bounds
+                boundsRect = QtCore.QRectF(QtCore.QPointF(xmin, ymin), QtCore.QPointF(xmax, ymax))
+                boundsRect.adjust(-150, -100, 150, 100)
+            else:
+                boundsRect = self.scene().itemsBoundingRect()            
             
             # resize
             self.fitInView(boundsRect, QtCore.Qt.KeepAspectRatio)
             #self.setSceneRect(boundsRect) # this resizes the scene rect to the bounds rect, not desirable
 
+        # snap selected nodes (or all nodes) to the grid
+        elif event.key() == QtCore.Qt.Key_G:
+            dagnodes = self.scene().selectedDagNodes()
+            self.moveNodes(self.scene().graph.snap_nodes, *dagnodes, size=self.snap_size)
+
+        # nudge selected nodes
+        elif event.key() in [QtCore.Qt.Key_Left, QtCore.Qt.Key_Right, QtCore.Qt.Key_Up, QtCore.Qt.Key_Down] and selected_nodes:
+            dagnodes = self.scene().selectedDagNodes()
+            if dagnodes:
+                step = self.nudge_size
+                if event.modifiers() & QtCore.Qt.ShiftModifier:
+                    step *= 5
+                offsets = {
+                    QtCore.Qt.Key_Left:  (-step, 0),
+                    QtCore.Qt.Key_Right: (step, 0),
+                    QtCore.Qt.Key_Up:    (0, -step),
+                    QtCore.Qt.Key_Down:  (0, step)
+                    }
+                self.moveNodes(self.scene().graph.offset_nodes, offsets.get(event.key()), *dagnodes)
+                # don't scroll the view
+                return
+
         # disable selected nodes
         elif event.key() == QtCore.Qt.Key_X:
             self._parent.toggleDebug()
@@ -377,6 +496,22 @@ class GraphicsView(QtGui.QGraphicsView):
         self.scene().update()
         return QtGui.QGraphicsView.keyPressEvent(self, event)
 
+    def moveNodes(self, func, *args, **kwargs):
+        """
+        Run a bulk Graph position operation and push the result to the undo stack.
+
+        :param func: Graph method (ie offset_nodes, snap_nodes).
+        """
+        scene = self.scene()
+        graph = scene.graph
+        scene.syncNodePositions()
+        old_snapshot = graph.snapshot()
+        node_ids = func(*args, **kwargs)
+        if node_ids:
+            new_snapshot = graph.snapshot()
+            scene.undo_stack.push(commands.NodesMovedCommand(old_snapshot, new_snapshot, scene, node_ids))
+        self.scene().update()
+
     def keyReleaseEvent(self, event):
         """
         Update edges to remove the 'alt_modifier' flag.
@@ -445,6 +580,17 @@ class GraphicsScene(QtGui.QGraphicsScene):
         - GraphicsScene.itemsBoundingRect(): returns the maximum boundingbox for all nodes
 
     """
+    # scheduled repaints are coalesced to this rate (see scheduleUpdate)
+    frame_rate          = 60
+
+    # widget positions are pushed to the graph at this rate while dragging (see syncNodePositions)
+    position_sync_rate  = 10
+
+    # progressive population (see populate)
+    progressive         = True
+    populate_threshold  = 200                           # minimum number of widgets to populate progressively
+    populate_slice      = 0.02                          # time budget per chunk (seconds)
+
     def __init__(self, parent=None, graph=None, ui=None, **kwargs):
         QtGui.QGraphicsScene.__init__(self, parent)
         
@@ -459,7 +605,41 @@ class GraphicsScene(QtGui.QGraphicsScene):
         # temp line for drawing edges
         self.line           = None
         self.handler        = handlers.SceneEventHandler(self)
-        self.scenenodes     = dict()
+        self.scenenodes     = dict()                    # {node id: widget, edge ids: widget}
+
+        # typed widget indexes (see registerWidget)
+        self._nodes         = dict()                    # {node id: node widget}
+        self._node_names    = dict()                    # {node name: node widget}
+        self._widget_names  = dict()                    # {node id: indexed node name}
+        self._edges         = dict()                    # {(src id, dest id): edge widget}
+        self.detail_level   = node_widgets.LOD_FULL     # level of detail tier of the view
+
+        # batched edge rendering (see setBatchEdges)
+        self.edge_batch     = None                      # EdgeBatch item
+        self._promoted      = []                        # batched edges promoted to scene items
+
+        # scheduled repaints
+        self._dirty_rect    = QtCore.QRectF()
+        self._frame_timer   = QtCore.QTimer(self)
+        self._frame_timer.setSingleShot(True)
+        self._frame_timer.timeout.connect(self.flushUpdates)
+
+        # widget -> graph position sync
+        self._moved_nodes   = dict()                    # {node id: widget} positions not yet pushed to the graph
+        self._drag_nodes    = []                        # ids of nodes moved during the current drag
+        self._drag_snapshot = None                      # graph snapshot taken when the drag started
+        self._sync_timer    = QtCore.QTimer(self)
+        self._sync_timer.setSingleShot(True)
+        self._sync_timer.timeout.connect(self.syncNodePositions)
+
+        # progressive population
+        self._populate_nodes = deque()                  # queued node ids
+        self._populate_edges = deque()                  # queued nx edge dictionaries (created after the nodes)
+        self._populate_total = 0
+        self._populate_index = None                     # item index method restored when population ends
+        self._populate_timer = QtCore.QTimer(self)
+        self._populate_timer.setInterval(0)
+        self._populate_timer.timeout.connect(self.populateChunk)
 
         # temp attributes
         self._hover_nodes   = []
@@ -470,8 +650,21 @@ class GraphicsScene(QtGui.QGraphicsScene):
         clear the current scene.
         """
         self.scenenodes=dict()
+        self._nodes = dict()
+        self._node_names = dict()
+        self._widget_names = dict()
+        self._edges = dict()
+        self.cancelPopulate()
+        self._sync_timer.stop()
+        self._moved_nodes = dict()
+        self._drag_nodes = []
+        self._drag_snapshot = None
         self.clear()
 
+        # the batch item is deleted with the scene items
+        self.edge_batch = None
+        self._promoted = []
+
     @property
     def debug(self):
         return self.ui.debug
@@ -510,8 +703,10 @@ class GraphicsScene(QtGui.QGraphicsScene):
         :param edge_type: edge type (polygon or bezier).
         :param font_family_nodes: font family for node labels.
         :param use_gl: use OpenGL mode.
+        :param batch_edges: draw edges with a single scene item.
+        :param lightweight_ports: draw connections with the node widget.
         """
-        scene_attrs = ['render_fx', 'antialiasing', 'edge_type', 'font_family_nodes','use_gl']
+        scene_attrs = ['render_fx', 'antialiasing', 'edge_type', 'font_family_nodes','use_gl', 'batch_edges', 'lightweight_ports']
         nodes = self.get_nodes()
         edges = self.get_edges()
 
@@ -528,10 +723,32 @@ class GraphicsScene(QtGui.QGraphicsScene):
                     for edge in edges:
                         edge.edge_type = v
 
+                if k == 'batch_edges':
+                    self.setBatchEdges(v)
+
+                if k == 'lightweight_ports':
+                    self.setLightweightPorts(v)
+
                 if k == 'font_family_nodes':
                     for node in nodes:
                         node._font = v
+                        if hasattr(node, 'updateLayout'):
+                            node.updateLayout()
         
+    def setDetailLevel(self, level):
+        """
+        Set the level of detail tier of the scene widgets.
+
+        :param int level: level of detail tier.
+        """
+        if level == self.detail_level:
+            return
+
+        self.detail_level = level
+        for widget in self.scenenodes.values():
+            if hasattr(widget, 'setDetailLevel'):
+                widget.setDetailLevel(level)
+
     #- Nodes ----
     
     def updateNodes(self, nodes=[], **kwargs):
@@ -589,12 +806,22 @@ class GraphicsScene(QtGui.QGraphicsScene):
                             log.warning('invalid widget: "%s"' % dag.name)
                             continue
                             
-                        widget._render_effects = self.ui.render_fx
-                        widget._font = self.ui.font_family_nodes
+                        if hasattr(widget, 'setRenderEffects'):
+                            widget.setRenderEffects(self.ui.render_fx)
+                        else:
+                            widget._render_effects = self.ui.render_fx
+                        if hasattr(widget, 'setLightweightPorts'):
+                            widget.setLightweightPorts(self.ui.lightweight_ports)
+                        if widget._font != self.ui.font_family_nodes:
+                            widget._font = self.ui.font_family_nodes
+                            if hasattr(widget, 'updateLayout'):
+                                widget.updateLayout()
                         
                         # set the debug mode
                         widget.setDebug(self.debug)
-                        self.scenenodes[dag.id]=widget
+                        if hasattr(widget, 'setDetailLevel'):
+                            widget.setDetailLevel(self.detail_level)
+                        self.registerWidget(widget)
                         self.addItem(widget)
                         widgets.append(widget)
 
@@ -608,11 +835,12 @@ class GraphicsScene(QtGui.QGraphicsScene):
                 raise GraphException('invalid graph id: "%s"' % dag_id )
         return widgets
 
-    def addEdges(self, edges):
+    def addEdges(self, edges, undo=True):
         """
         Add edges to the current scene.
 
         :param list edges: list of nx edge dictionaries.
+        :param bool undo: push an undo command for each edge.
         """
         if type(edges) not in [list, tuple]:
             edges = [edges,]
@@ -661,15 +889,298 @@ class GraphicsScene(QtGui.QGraphicsScene):
             if edge_widget.connect_terminal(src_conn_widget) and edge_widget.connect_terminal(dest_conn_widget):
                 # set the debug mode
                 edge_widget.setDebug(self.debug)
-                self.scenenodes[edge_widget.ids]=edge_widget
-                self.addItem(edge_widget)
+                self.registerWidget(edge_widget)
+                if self.ui.batch_edges:
+                    self.getEdgeBatch().addEdge(edge_widget)
+                else:
+                    self.addItem(edge_widget)
                 widgets.append(edge_widget)
 
-                new_snapshot = self.graph.snapshot()
-                self.undo_stack.push(commands.SceneNodesCommand(old_snapshot, new_snapshot, self, msg='edge added'))
+                if undo:
+                    new_snapshot = self.graph.snapshot()
+                    self.undo_stack.push(commands.SceneNodesCommand(old_snapshot, new_snapshot, self, msg='edge added'))
 
         return widgets
         
+    #- Repaints ----
+
+    def scheduleUpdate(self, rect=None):
+        """
+        Mark a scene rect as needing a repaint. Dirty rects are 
+        merged and repainted together, at most once per frame.
+
+        :param QtCore.QRectF rect: scene rect (None for the whole scene).
+        """
+        if rect is None:
+            rect = self.sceneRect()
+        self._dirty_rect = self._dirty_rect.united(rect)
+        if not self._frame_timer.isActive():
+            self._frame_timer.start(int(1000.0 / self.frame_rate))
+
+    def flushUpdates(self):
+        """
+        Repaint the dirty scene rect.
+        """
+        rect = self._dirty_rect
+        self._dirty_rect = QtCore.QRectF()
+        if not rect.isEmpty():
+            self.update(rect)
+
+    #- Batched Edges ----
+
+    def getEdgeBatch(self):
+        """
+        Returns the batched edge renderer, creating it if needed.
+
+        :rtype: EdgeBatch
+        """
+        if self.edge_batch is None:
+            self.edge_batch = node_widgets.EdgeBatch()
+            self.addItem(self.edge_batch)
+        return self.edge_batch
+
+    def setBatchEdges(self, enabled):
+        """
+        Toggle batched edge rendering. When enabled, non-selected edges
+        are drawn by a single scene item.
+
+        :param bool enabled: batch edges.
+        """
+        if enabled:
+            batch = self.getEdgeBatch()
+            for edge in self._edges.values():
+                if edge.batch is None and not edge.isSelected():
+                    if edge.scene() is self:
+                        self.removeItem(edge)
+                    batch.addEdge(edge)
+            return
+
+        if self.edge_batch is None:
+            return
+
+        for edge in self.edge_batch.edges:
+            self.edge_batch.removeEdge(edge)
+            self.addItem(edge)
+
+        self.removeItem(self.edge_batch)
+        self.edge_batch = None
+        self._promoted = []
+
+    def setLightweightPorts(self, enabled):
+        """
+        Toggle lightweight port rendering. The connection widgets of 
+        every node are rebuilt, connected edges are kept.
+
+        :param bool enabled: draw connections with the node widget.
+        """
+        for widget in self._nodes.values():
+            if hasattr(widget, 'setLightweightPorts'):
+                widget.setLightweightPorts(enabled)
+
+    def promoteEdge(self, edge):
+        """
+        Move a batched edge into the scene as an interactive item.
+
+        :param EdgeWidget edge: edge widget.
+        """
+        if edge.batch is None:
+            return
+        edge.batch.removeEdge(edge)
+        self.addItem(edge)
+        self._promoted.append(edge)
+
+    def requestDemoteEdges(self):
+        """
+        Return promoted edges to the batch once the current event 
+        has been processed.
+        """
+        QtCore.QTimer.singleShot(0, self.demoteEdges)
+
+    def demoteEdges(self):
+        """
+        Return promoted edges that are no longer hovered or selected 
+        to the batch.
+        """
+        if self.edge_batch is None:
+            return
+
+        for edge in list(self._promoted):
+            if edge.scene() is not self:
+                self._promoted.remove(edge)
+                continue
+
+            if edge.isSelected() or edge.isUnderMouse():
+                continue
+
+            self._promoted.remove(edge)
+            self.removeItem(edge)
+            self.edge_batch.addEdge(edge)
+
+    #- Progressive Population ----
+
+    def populate(self, dagids=[], edges=[]):
+        """
+        Queue node & edge widgets to be created in time-sliced chunks
+        across event loop iterations. Nodes inside the visible viewport
+        are created first, edges are created once all queued nodes exist.
+
+        :param list dagids: list of dag node ids.
+        :param list edges: list of nx edge dictionaries.
+        """
+        queued = set(self._populate_nodes)
+        dagids = [nid for nid in dagids if nid not in self.scenenodes and nid not in queued]
+
+        # sort nodes inside the viewport to the front of the queue
+        visible = self.visibleRect()
+        if visible is not None:
+            def is_visible(nid):
+                pos = self.graph.positions.get(nid)
+                if pos is None:
+                    return False
+                return visible.contains(QtCore.QPointF(pos[0], pos[1]))
+            dagids = sorted(dagids, key=lambda nid: not is_visible(nid))
+
+        # queued nodes always precede queued edges
+        self._populate_nodes.extend(dagids)
+        self._populate_edges.extend(edges)
+        self._populate_total += len(dagids) + len(edges)
+
+        if not self._populate_timer.isActive():
+            # suspend scene indexing until the queue drains (see cancelPopulate)
+            if self._populate_index is None:
+                self._populate_index = self.itemIndexMethod()
+                self.setItemIndexMethod(QtGui.QGraphicsScene.NoIndex)
+            self._populate_timer.start()
+
+    def populateChunk(self):
+        """
+        Create queued widgets until the time budget is spent. View 
+        updates are suspended while the chunk is built.
+        """
+        if not self.is_populating:
+            self.cancelPopulate()
+            return
+
+        start = time.time()
+        views = self.views()
+        for view in views:
+            view.setUpdatesEnabled(False)
+
+        try:
+            while self.is_populating and (time.time() - start) < self.populate_slice:
+                # take a run of nodes or edges
+                queue = self._populate_nodes or self._populate_edges
+                chunk = [queue.popleft() for i in range(min(32, len(queue)))]
+
+                if queue is self._populate_nodes:
+                    # nodes may have been removed since they were queued
+                    self.addNodes([nid for nid in chunk if nid in self.graph.dagnodes])
+                else:
+                    valid = []
+                    for edge in chunk:
+                        src_id = edge.get('src_id')
+                        dest_id = edge.get('dest_id')
+                        if (src_id, dest_id) in self._edges:
+                            continue
+                        if self.get_node(src_id) is None or self.get_node(dest_id) is None:
+                            continue
+                        valid.append(edge)
+                    self.addEdges(valid, undo=False)
+        finally:
+            for view in views:
+                view.setUpdatesEnabled(True)
+
+        done = self._populate_total - len(self._populate_nodes) - len(self._populate_edges)
+        self.ui.updateProgress('building scene', done, self._populate_total)
+        if not self.is_populating:
+            self.cancelPopulate()
+            self.update()
+
+    def cancelPopulate(self):
+        """
+        Stop progressive population, clear the queue and restore
+        scene indexing.
+        """
+        if self._populate_timer.isActive():
+            self._populate_timer.stop()
+        if self._populate_total:
+            self.ui.updateProgress('building scene', self._populate_total, self._populate_total)
+        self._populate_nodes.clear()
+        self._populate_edges.clear()
+        self._populate_total = 0
+
+        if self._populate_index is not None:
+            self.setItemIndexMethod(self._populate_index)
+            self._populate_index = None
+
+    @property
+    def is_populating(self):
+        """
+        :returns: widgets are queued for progressive population.
+        :rtype: bool
+        """
+        return bool(self._populate_nodes or self._populate_edges)
+
+    def visibleRect(self):
+        """
+        Returns the scene rect visible in the view.
+
+        :rtype: QtCore.QRectF
+        """
+        if not self.views():
+            return
+        view = self.views()[0]
+        return view.mapToScene(view.viewport().rect()).boundingRect()
+
+    def registerWidget(self, widget):
+        """
+        Add a node or edge widget to the scene indexes.
+
+        :param QGraphicsObject widget: node or edge widget.
+        """
+        if self.is_edge(widget):
+            self._edges[widget.ids] = widget
+            self.scenenodes[widget.ids] = widget
+            return
+
+        self._nodes[widget.dagnode.id] = widget
+        self._node_names[widget.dagnode.name] = widget
+        self._widget_names[widget.dagnode.id] = widget.dagnode.name
+        self.scenenodes[widget.dagnode.id] = widget
+
+        # keep the name index current when the node is renamed
+        widget.dagnode.nodeAttributeUpdated += self.nodeRenamedEvent
+
+    def unregisterWidget(self, widget):
+        """
+        Remove a node or edge widget from the scene indexes. Called 
+        when the widget is closed.
+
+        :param QGraphicsObject widget: node or edge widget.
+        """
+        if self.is_edge(widget):
+            key = widget.ids
+            if self._edges.get(key) is widget:
+                self._edges.pop(key)
+            if widget.batch is not None:
+                widget.batch.removeEdge(widget)
+            if widget in self._promoted:
+                self._promoted.remove(widget)
+        else:
+            key = widget.dagnode.id
+            if self._nodes.get(key) is widget:
+                self._nodes.pop(key)
+            name = self._widget_names.pop(key, widget.dagnode.name)
+            if self._node_names.get(name) is widget:
+                self._node_names.pop(name)
+
+            handler = widget.dagnode.nodeAttributeUpdated
+            if self.nodeRenamedEvent in handler.callbacks:
+                handler.remove(self.nodeRenamedEvent)
+
+        if self.scenenodes.get(key) is widget:
+            self.scenenodes.pop(key)
+
     def removeNodes(self, nodes):
         """
         Remove node widgets from the scene.
@@ -817,11 +1328,7 @@ class GraphicsScene(QtGui.QGraphicsScene):
         :returns: list of DagNode widgets.
         :rtype: list
         """
-        widgets = []
-        for item in self.items():
-            if self.is_node(item):            
-                widgets.append(item)
-        return widgets
+        return self._nodes.values()
 
     def get_node(self, name):
         """
@@ -832,13 +1339,35 @@ class GraphicsScene(QtGui.QGraphicsScene):
         :returns: node widget.
         :rtype: NodeWidget
         """
-        if name in self.scenenodes:
-            return self.scenenodes.get(name)
+        if name in self._nodes:
+            return self._nodes.get(name)
+
+        # renames are indexed when the node events are sent (see nodeRenamedEvent)
+        widget = self._node_names.get(name)
+        if widget is None or widget.dagnode.name != name:
+            return
+        return widget
+
+    def nodeRenamedEvent(self, dagnode, **kwargs):
+        """
+        Callback when a registered dag node changes. Updates the node
+        name index when the node is renamed.
+
+        :param DagNode dagnode: dag node.
+        """
+        if 'name' not in kwargs:
+            return
 
-        for node in self.get_nodes():
-            node_name = node.dagnode.name
-            if node_name == name:
-                return node
+        widget = self._nodes.get(dagnode.id)
+        if widget is None:
+            return
+
+        old_name = self._widget_names.get(dagnode.id)
+        if self._node_names.get(old_name) is widget:
+            self._node_names.pop(old_name)
+
+        self._node_names[dagnode.name] = widget
+        self._widget_names[dagnode.id] = dagnode.name
 
     def selectedNodes(self, nodes_only=False):
         """
@@ -894,11 +1423,7 @@ class GraphicsScene(QtGui.QGraphicsScene):
         :returns: list of Edge widgets.
         :rtype: list
         """
-        edges = []
-        for item in self.items():
-            if self.is_edge(item):
-                edges.append(item)
-        return edges
+        return self._edges.values()
 
     def get_edge(self, *args):
         """
@@ -908,15 +1433,15 @@ class GraphicsScene(QtGui.QGraphicsScene):
         :rtype: list
         """
         edges = []
-        for edge in self.get_edges():
+        for edge in self._edges.values():
             if edge.name in args:
                 edges.append(edge)
             if edge.source_connection in args:
                 if edge.dest_connection in args:
                     edges.append(edge)
         for arg in args:
-            if arg in self.scenenodes:
-                edges.append(self.scenenodes.get(arg))
+            if arg in self._edges:
+                edges.append(self._edges.get(arg))
         return edges
 
 
@@ -961,6 +1486,31 @@ class GraphicsScene(QtGui.QGraphicsScene):
                 item = item.node
         return item
 
+    def connectionAt(self, pos):
+        """
+        Returns the connection at the given scene position. Resolves 
+        lightweight ports drawn by node widgets.
+
+        :param QtCore.QPointF pos: scene position.
+
+        :returns: connection widget or port.
+        :rtype: Connection
+        """
+        for item in self.items(pos):
+            if item is self.line:
+                continue
+
+            if self.is_connection(item):
+                return item
+
+            if hasattr(item, 'node') and hasattr(item.node, 'node_class'):
+                item = item.node
+
+            if hasattr(item, 'portAt'):
+                return item.portAt(pos)
+            return
+        return
+
     #- Events ----
 
     def mousePressEvent(self, event):
@@ -990,6 +1540,7 @@ class GraphicsScene(QtGui.QGraphicsScene):
                         else:
                             log.warning('cannot pop node "%s"' % node.dagnode.name)
             else:
+                item = self.connectionAt(event.scenePos())
                 if item:
                     if self.is_connection(item):
                         if item.isOutputConnection():
@@ -998,7 +1549,7 @@ class GraphicsScene(QtGui.QGraphicsScene):
                             self.line = QtGui.QGraphicsLineItem(QtCore.QLineF(event.scenePos(), event.scenePos()))
                             self.line.setPen(lpen)
                             self.addItem(self.line)
-                            self.update(self.itemsBoundingRect())
+                            self.scheduleUpdate(self.line.sceneBoundingRect())
 
                         # disconnect the edge if this is an input
                         if item.isInputConnection():
@@ -1019,13 +1570,18 @@ class GraphicsScene(QtGui.QGraphicsScene):
 
                                         self.line = QtGui.QGraphicsLineItem(QtCore.QLineF(p1, event.scenePos()))
                                         self.addItem(self.line)
-                                        self.update(self.itemsBoundingRect())
+                                        self.scheduleUpdate(self.line.sceneBoundingRect())
+
+                    # lightweight ports are drawn by the node, don't let
+                    # the node take the press & start a move.
+                    if self.is_connection(item) and not isinstance(item, QtGui.QGraphicsItem):
+                        event.accept()
+                        return
 
         if event.button() == QtCore.Qt.RightButton:
             pass
 
         QtGui.QGraphicsScene.mousePressEvent(self, event)
-        self.update()
 
     def mouseMoveEvent(self, event):
         """
@@ -1033,19 +1589,34 @@ class GraphicsScene(QtGui.QGraphicsScene):
         """
         modifiers = QtGui.QApplication.keyboardModifiers()
         item = self.nodeAt(event.scenePos())
+        hover_nodes = self._hover_nodes
         self._hover_nodes = []
 
+        # promote batched edges under the cursor
+        if item is None and self.edge_batch is not None and not self.line:
+            edge = self.edge_batch.edgeAt(event.scenePos())
+            if edge is not None:
+                self.promoteEdge(edge)
+                item = edge
+
         if item:
             if self.is_node(item) or self.is_edge(item):
                 self._hover_nodes.append(item)
 
+        # repaint items the cursor entered or left
+        if hover_nodes != self._hover_nodes:
+            for widget in hover_nodes + self._hover_nodes:
+                if widget.scene() is self:
+                    self.scheduleUpdate(widget.sceneBoundingRect())
+
         # if we're drawing a line...
         if self.line:
+            old_rect = self.line.sceneBoundingRect()
             newLine = QtCore.QLineF(self.line.line().p1(), event.scenePos())
             self.line.setLine(newLine)
+            self.scheduleUpdate(old_rect.united(self.line.sceneBoundingRect()))
 
         QtGui.QGraphicsScene.mouseMoveEvent(self, event)
-        self.update()
 
     def mouseReleaseEvent(self, event):
         """
@@ -1054,23 +1625,14 @@ class GraphicsScene(QtGui.QGraphicsScene):
         :param QtCore.QEvent event: mouse event.
         """
         if self.line:
-            source_items = self.items(self.line.line().p1())
-            if len(source_items) and source_items[0] == self.line:
-                source_items.pop(0)
-
-            dest_items = self.items(self.line.line().p2())
-
-            if len(dest_items) and dest_items[0] == self.line:
-                dest_items.pop(0)
+            # these are connection widgets (or lightweight ports)
+            source_conn = self.connectionAt(self.line.line().p1())
+            dest_conn = self.connectionAt(self.line.line().p2())
 
             #self.line.scene().removeItem(self.line)
             #self.line = None
 
-            if len(source_items) and len(dest_items):
-                # these are connection widgets
-                source_conn = source_items[0]
-                dest_conn = dest_items[0]
-
+            if source_conn is not None and dest_conn is not None:
                 #print '# DEBUG: source connection:       ', source_conn
                 #print '# DEBUG: destination connection:  ', dest_conn
 
@@ -1089,10 +1651,10 @@ class GraphicsScene(QtGui.QGraphicsScene):
                     edge = self.graph.add_edge(src_dag, dest_dag, src_attr=source_conn.name, dest_attr=dest_conn.name)
 
         if self.line:
+            self.scheduleUpdate(self.line.sceneBoundingRect())
             self.line.scene().removeItem(self.line)
             self.line = None
         QtGui.QGraphicsScene.mouseReleaseEvent(self, event)
-        self.update()
 
     def nodeChangedEvent(self, node):
         """
@@ -1103,14 +1665,65 @@ class GraphicsScene(QtGui.QGraphicsScene):
         :param QGraphicsObjectnode: node widget.
         """
         if hasattr(node, 'dagnode'):
-            # update the position
-            pos = (node.pos().x(), node.pos().y())
-            node.setToolTip('(%d, %d)' % (pos[0], pos[1]))
-            node.dagnode.pos = pos
+            # the widget owns its position while it moves, the 
+            # graph is updated at a throttled rate (see syncNodePositions)
+            nid = node.dagnode.id
+            self._moved_nodes[nid] = node
+            if self._drag_snapshot is not None and nid not in self._drag_nodes:
+                self._drag_nodes.append(nid)
+
+            if not self._sync_timer.isActive():
+                self._sync_timer.start(int(1000.0 / self.position_sync_rate))
 
             # SIGNAL MANAGER (Scene -> Graph)
             #self.handler.sceneNodesUpdatedAction([node,])           
 
+    def syncNodePositions(self):
+        """
+        Push the positions of moved node widgets to their dag nodes.
+        Position events are batched, so the graph is updated once per node.
+        """
+        self._sync_timer.stop()
+        moved = self._moved_nodes
+        self._moved_nodes = dict()
+
+        with self.graph.batch():
+            for nid, node in moved.iteritems():
+                if node.scene() is not self or nid not in self.graph.dagnodes:
+                    continue
+                pos = (node.pos().x(), node.pos().y())
+                node.setToolTip('(%d, %d)' % (pos[0], pos[1]))
+                node.dagnode.pos = pos
+
+    def beginNodeDrag(self):
+        """
+        Snapshot the graph before the selected nodes are dragged.
+        """
+        self.syncNodePositions()
+        self.handler.evaluate()
+        self._drag_nodes = []
+        self._drag_snapshot = self.graph.snapshot()
+
+    def endNodeDrag(self, moved=True):
+        """
+        Sync the dragged node positions and push a single undo 
+        command for the drag.
+
+        :param bool moved: nodes were moved during the drag.
+        """
+        self.syncNodePositions()
+        old_snapshot = self._drag_snapshot
+        node_ids = self._drag_nodes
+        self._drag_snapshot = None
+        self._drag_nodes = []
+
+        # don't register undos for selections without moves
+        if old_snapshot is None or not moved or not node_ids:
+            return
+
+        new_snapshot = self.graph.snapshot()
+        self.undo_stack.push(commands.NodesMovedCommand(old_snapshot, new_snapshot, self, node_ids))
+
     def nodeDeletedEvent(self, node):
         """
         Called when a node is deleted. Event is added when node is added via the `addNodes`
@@ -1172,6 +1785,8 @@ class GraphicsScene(QtGui.QGraphicsScene):
 
                 for edge in dest.connections.values():
                     log.warning('forcing edge removal: "%s"' % edge.name)
+                    # remove the graph edge, so the destination can accept the new one
+                    self.graph.remove_edge(*edge.ids)
                     edge.close()
                 return True
 
@@ -76,6 +76,8 @@ class SceneEventHandler(QtCore.QObject):
                 self.graph.graphRefreshed += self.graphAboutToBeSaved
 
                 self.graph.graphRead += self.graphReadEvent
+                self.graph.nodesMoved += self.nodesMovedEvent
+                self.graph.nodesReloaded += self.nodesReloadedEvent
 
                 self.graph.mode = 'ui'
                 log.info('SceneHandler: connecting Graph...')
@@ -134,17 +136,97 @@ class SceneEventHandler(QtCore.QObject):
         :param list ids: DagNode ids.
         """
         old_snapshot = self.graph.snapshot() 
-        self.scene.addNodes(ids)
+        if self.scene.progressive and (len(ids) >= self.scene.populate_threshold or self.scene.is_populating):
+            self.scene.populate(dagids=ids)
+        else:
+            self.scene.addNodes(ids)
         # push a snapshot to the undo stack
         new_snapshot = self.graph.snapshot()
         self.undo_stack.push(commands.SceneNodesCommand(old_snapshot, new_snapshot, self.scene, msg='nodes added'))
 
+    def nodesMovedEvent(self, graph, ids):
+        """
+        Callback method. Move node widgets to their position in 
+        the graph position store.
+
+        :param list ids: DagNode ids.
+        """
+        for nid in ids:
+            widget = self.scene.scenenodes.get(nid, None)
+            pos = self.graph.positions.get(nid)
+            if widget is not None and pos is not None:
+                widget.setPos(pos[0], pos[1])
+
+    def nodesReloadedEvent(self, graph, ids):
+        """
+        Callback method. Update node widgets of reloaded plugins. Widgets
+        whose plugin widget class changed are rebuilt, with their edges.
+
+        :param list ids: DagNode ids.
+        """
+        rebuild = []
+        for nid in ids:
+            widget = self.scene.scenenodes.get(nid, None)
+            dag = self.graph.dagnodes.get(nid, None)
+            if widget is None or dag is None:
+                continue
+
+            node = self.graph.plug_mgr.resolve(dag.node_type, disabled=True)
+            if node is None or node.widget is None:
+                continue
+
+            if widget.__class__ is not node.widget:
+                rebuild.append(widget)
+                continue
+
+            widget.prepareGeometryChange()
+            if hasattr(widget, 'updateLayout'):
+                widget.updateLayout()
+            elif hasattr(widget, 'drawConnections'):
+                widget.drawConnections()
+            widget.update()
+
+        if rebuild:
+            self.rebuildNodeWidgets(rebuild)
+
+    def rebuildNodeWidgets(self, widgets):
+        """
+        Replace node widgets with new widgets of their current plugin 
+        widget class. Connected edges are rebuilt.
+
+        :param list widgets: node widgets.
+        """
+        edges = dict()                                # {edge ids: nx edge dictionary}
+        for widget in widgets:
+            for conn_widget in widget.connections.values():
+                for edge in conn_widget.connected_edges():
+                    if edge.ids in edges:
+                        continue
+                    edges[edge.ids] = dict(src_id=edge.src_id, dest_id=edge.dest_id, 
+                                           src_attr=edge.source_item().name, dest_attr=edge.dest_item().name,
+                                           weight=edge.weight, edge_type=edge.edge_type)
+                    edge.close()
+
+        selected = []
+        for widget in widgets:
+            log.info('rebuilding widget "%s".' % widget.dagnode.name)
+            if widget.isSelected():
+                selected.append(widget.dagnode.id)
+            widget.close()
+
+        for widget in self.scene.addNodes([w.dagnode.id for w in widgets]):
+            widget.setSelected(widget.dagnode.id in selected)
+        self.scene.addEdges(edges.values(), undo=False)
+
     def edgesAddedEvent(self, graph, edges):
         """
         Callback method.
         """
         old_snapshot = self.graph.snapshot() 
-        self.scene.addEdges(edges)
+        if self.scene.progressive and (len(edges) >= self.scene.populate_threshold or self.scene.is_populating):
+            self.scene.populate(edges=edges)
+        else:
+            self.scene.addEdges(edges)
 
         # push a snapshot to the undo stack
         new_snapshot = self.graph.snapshot()
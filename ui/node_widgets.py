@@ -1,6 +1,7 @@
 #!/usr/bin/env python
 import sys
 import math
+import array
 import weakref
 from PySide import QtCore, QtGui
 from SceneGraph.core import log
@@ -8,6 +9,22 @@ from SceneGraph import options
 from SceneGraph.ui.commands import SceneNodesCommand, SceneChangedCommand
 
 
+# pre-rendered node shadows {(width, height, rgba, blur radius): QPixmap}
+SHADOW_PIXMAPS      = dict()
+SHADOW_CACHE_SIZE   = 256
+
+# level of detail tiers (see lod_tier)
+LOD_LOW             = 0                                 # flat nodes, straight edges
+LOD_MEDIUM          = 1                                 # no labels or effects
+LOD_FULL            = 2
+
+# zoom levels below which each tier is drawn
+LOD_THRESHOLDS      = dict(medium=0.5, low=0.25)
+
+# batched edge hit-testing grid cell size (see EdgeBatch)
+EDGE_GRID_SIZE      = 256.0
+
+
 class NodeWidget(QtGui.QGraphicsObject):
 
     Type           = QtGui.QGraphicsObject.UserType + 1
@@ -15,6 +32,17 @@ class NodeWidget(QtGui.QGraphicsObject):
     nodeChanged    = QtCore.Signal(object) 
     nodeDeleted    = QtCore.Signal(object) 
     node_class     = 'dagnode'
+
+    # draw the background shadow from a cached pixmap
+    # instead of an offscreen graphics effect.
+    cache_shadows  = False
+
+    # draw connections as lightweight ports (see Port) instead
+    # of Connection child items.
+    lightweight_ports = False
+
+    # dagnode attributes that change the node layout
+    layout_attrs   = ['name', 'width', 'base_height', 'force_expand', 'orientation', 'docstring', 'enabled']
       
     def __init__(self, dagnode, parent=None):
         super(NodeWidget, self).__init__(parent)
@@ -51,11 +79,20 @@ class NodeWidget(QtGui.QGraphicsObject):
         self._render_effects = True                   # enable fx
         self._label_coord    = [0,0]                  # default coordiates of label
 
+        # drop shadow effects (see updateEffects)
+        self.bgshd           = None
+        self.lblshd          = None
+        self._fx_state       = None
+
+        # level of detail
+        self.detail_level    = LOD_FULL               # detail level of the current view
+
         # tags
         self._evaluate_tag   = False                  # indicates the node is set to "evaluate" (a la Houdini)
         
         # connections widget
         self.connections     = dict()
+        self._hover_port     = None                   # port under the cursor (lightweight ports)
 
         # undo/redo snapshots
         self._current_pos    = QtCore.QPointF(0,0)
@@ -78,14 +115,23 @@ class NodeWidget(QtGui.QGraphicsObject):
         # signals/slots
         self.label.doubleClicked.connect(self.labelDoubleClickedEvent)
 
+        # layout is only updated when the dag node changes
+        self.dagnode.nodeAttributeUpdated += self.nodeAttributeUpdatedEvent
+        self.dagnode.nodeConnectionsChanged += self.nodeConnectionsChangedEvent
+
         # set node position
         self.setPos(QtCore.QPointF(self.dagnode.pos[0], self.dagnode.pos[1]))
-        self.drawConnections()
+        self.updateLayout()
 
     def close(self):
         """
         Cleanup and delete the node and children.
         """
+        for handler, callback in [(self.dagnode.nodeAttributeUpdated, self.nodeAttributeUpdatedEvent),
+                                  (self.dagnode.nodeConnectionsChanged, self.nodeConnectionsChangedEvent)]:
+            if callback in handler.callbacks:
+                handler.remove(callback)
+
         for item in [self.background, self.label]:
             if item is not None:
                 if item.scene() is not None:
@@ -93,12 +139,11 @@ class NodeWidget(QtGui.QGraphicsObject):
 
         # clean up terminals
         for conn in self.connections.values():
-            if conn is not None:
-                if conn.scene() is not None:
-                    conn.scene().removeItem(conn)
+            self.removeConnectionWidget(conn)
 
         if self is not None:
             if self.scene() is not None:
+                self.scene().unregisterWidget(self)
                 self.scene().removeItem(self)
 
     def __str__(self):
@@ -194,6 +239,25 @@ class NodeWidget(QtGui.QGraphicsObject):
         if event.type == 'positionChanged':
             self.setPos(obs.pos[0], obs.pos[1])
 
+    def nodeAttributeUpdatedEvent(self, dagnode, **kwargs):
+        """
+        Callback when the dag node attributes change.
+
+        :param DagNode dagnode: dag node.
+        """
+        for attr in kwargs:
+            if attr in self.layout_attrs:
+                self.updateLayout()
+                return
+
+    def nodeConnectionsChangedEvent(self, dagnode):
+        """
+        Callback when the dag node connections are added or removed.
+
+        :param DagNode dagnode: dag node.
+        """
+        self.updateLayout()
+
     def itemChange(self, change, value):
         """
         Default node 'changed' signal.
@@ -203,9 +267,38 @@ class NodeWidget(QtGui.QGraphicsObject):
         change == "GraphicsItemChange"
         """
         if change == self.ItemPositionHasChanged:
+            self.updateEdges()
             self.nodeChanged.emit(self)
+
+        # the shadow color follows the selection
+        if change == self.ItemSelectedHasChanged:
+            self.is_selected = bool(value)
+            self.updateEffects()
         return super(NodeWidget, self).itemChange(change, value)
 
+    def hoverMoveEvent(self, event):
+        """
+        Track the lightweight port under the cursor.
+        """
+        if self.lightweight_ports:
+            port = self.portAt(event.scenePos())
+            if port is not self._hover_port:
+                for p in [self._hover_port, port]:
+                    if p is not None:
+                        p.is_hover = p is port
+                        p.update()
+                self._hover_port = port
+                self.setToolTip(port.toolTip() if port is not None else self.dagnode.docstring)
+        QtGui.QGraphicsObject.hoverMoveEvent(self, event)
+
+    def hoverLeaveEvent(self, event):
+        if self._hover_port is not None:
+            self._hover_port.is_hover = False
+            self._hover_port.update()
+            self._hover_port = None
+            self.setToolTip(self.dagnode.docstring)
+        QtGui.QGraphicsObject.hoverLeaveEvent(self, event)
+
     def mouseDoubleClickEvent(self, event):
         """
         translate Y: height_expanded - base_height/2
@@ -221,27 +314,38 @@ class NodeWidget(QtGui.QGraphicsObject):
         QtGui.QGraphicsItem.mousePressEvent(self, event)
         # store the node's current position
         self._current_pos  = self.pos()
-        # store the node's current data
-        self.scene().handler.evaluate()
-        self._data_snapshot = self.scene().graph.snapshot()        
+        # store the graph's current data
+        self.scene().beginNodeDrag()
 
     def mouseReleaseEvent(self, event):
         """
         Help manage mouse movement undo/redos.
         """
-        # Don't register undos for selections without moves
-        if self.pos() != self._current_pos:
-            snapshot = self.scene().graph.snapshot()
-            self.scene().undo_stack.push(SceneNodesCommand(self._data_snapshot, snapshot, self.scene()))
         QtGui.QGraphicsItem.mouseReleaseEvent(self, event)
+        # sync the dragged positions & register a single undo
+        self.scene().endNodeDrag(self.pos() != self._current_pos)
 
     def boundingRect(self):
         """
-        Returns a bounding rectangle for the node.
+        Returns a bounding rectangle for the node. Includes the
+        port area when drawing lightweight ports.
 
         :returns: node bounding rect.
         :rtype: QtCore.QRectF
         """
+        rect = self.nodeRect()
+        if self.lightweight_ports:
+            m = Port.radius/2 + Port.buffer
+            return rect.adjusted(-m, 0, m, 0)
+        return rect
+
+    def nodeRect(self):
+        """
+        Returns the node body rectangle.
+
+        :returns: node rect.
+        :rtype: QtCore.QRectF
+        """
         w = self.width
         h = self.height
         bx = self.bufferX
@@ -271,6 +375,13 @@ class NodeWidget(QtGui.QGraphicsObject):
         by = self.bufferY
         path = QtGui.QPainterPath()
         path.addRoundedRect(QtCore.QRectF(-w/2, -h/2, w, h), 7, 7)
+
+        # lightweight ports extend past the node body
+        if self.lightweight_ports:
+            for port in self.connections.values():
+                if port.isVisible():
+                    path.addRect(port.boundingRect().translated(port.pos()))
+            path.setFillRule(QtCore.Qt.WindingFill)
         return path
 
     #- Global Properties ----
@@ -286,7 +397,7 @@ class NodeWidget(QtGui.QGraphicsObject):
         returns:
             (QPointF) - input connection position.
         """
-        rect = self.boundingRect()
+        rect = self.nodeRect()
         width = rect.width()
         height = rect.height()
         ypos = -rect.center().y()
@@ -302,7 +413,7 @@ class NodeWidget(QtGui.QGraphicsObject):
         returns:
             (QPointF) - output connection position.
         """
-        rect = self.boundingRect()
+        rect = self.nodeRect()
         width = rect.width()
         height = rect.height()
         ypos = -rect.center().y()
@@ -456,7 +567,93 @@ class NodeWidget(QtGui.QGraphicsObject):
         for conn_name in self.connections:            
             conn_widget = self.connections.get(conn_name)
             if conn_widget:
-                self.scene().removeItem(conn_widget)
+                self.removeConnectionWidget(conn_widget)
+
+    def setLightweightPorts(self, enabled):
+        """
+        Toggle lightweight ports. The connection widgets are rebuilt 
+        and connected edges are moved to the new widgets.
+
+        :param bool enabled: draw connections as lightweight ports.
+        """
+        enabled = bool(enabled)
+        if enabled == self.lightweight_ports:
+            return
+
+        # keep the old widgets alive until their edges are moved
+        old_widgets = self.connections.values()
+        terminals = []                                # [(connection name, edge, edge source)]
+        for conn_widget in old_widgets:
+            for edge in conn_widget.connected_edges():
+                terminals.append((conn_widget.name, edge, edge.source_item() is conn_widget))
+
+        self.prepareGeometryChange()
+        self._hover_port = None
+        self.lightweight_ports = enabled
+        self.drawConnections(remove=True)
+
+        for conn_name, edge, is_source in terminals:
+            conn_widget = self.connections.get(conn_name)
+            if conn_widget is None:
+                continue
+            if is_source:
+                edge.source_item = weakref.ref(conn_widget, edge.callback_source_deleted)
+            else:
+                edge.dest_item = weakref.ref(conn_widget, edge.callback_dest_deleted)
+            conn_widget.connections[edge.ids] = edge
+        self.updateEdges()
+        self.update()
+
+    def removeConnectionWidget(self, conn_widget):
+        """
+        Remove a connection widget from the scene. Lightweight
+        ports are not scene items.
+
+        :param Connection conn_widget: connection widget.
+        """
+        if isinstance(conn_widget, QtGui.QGraphicsItem):
+            if conn_widget.scene() is not None:
+                conn_widget.scene().removeItem(conn_widget)
+
+    def portAt(self, pos):
+        """
+        Returns the lightweight port at the given scene position.
+
+        :param QtCore.QPointF pos: scene position.
+
+        :returns: port.
+        :rtype: Port
+        """
+        if not self.lightweight_ports:
+            return
+        local = self.mapFromScene(pos)
+        for port in self.connections.values():
+            if port.isVisible() and port.boundingRect().translated(port.pos()).contains(local):
+                return port
+        return
+
+    def updateLayout(self):
+        """
+        Update the label, size, tooltip and connection widgets. Runs 
+        when the dag node name, size, orientation or connections change, 
+        so that paint only has to draw.
+        """
+        self.prepareGeometryChange()
+        self.label.updateLayout()
+
+        # adjust size, if necessary
+        if self.label.width > self.width:
+            # re-runs the layout via nodeAttributeUpdatedEvent
+            self.width = self.label.width + 14
+
+        # translate the label
+        self.label.setPos(self.label_pos)
+
+        # set the tooltip to the current node's documentation string.
+        self.setToolTip(self.dagnode.docstring)
+        self.drawConnections()
+        self.updateEffects()
+        self.update()
 
     def drawConnections(self, remove=False):
         """
@@ -483,25 +680,37 @@ class NodeWidget(QtGui.QGraphicsObject):
                 if remove:
                     # pop the current widget
                     self.connections.pop(conn_name)
-                    self.scene().removeItem(conn_widget)
-
+                    self.removeConnectionWidget(conn_widget)
+                    conn_widget = None
 
             if conn_widget is None:
-                conn_widget = Connection(self, conn_dag, conn_name)
+                if self.lightweight_ports:
+                    conn_widget = Port(self, conn_dag, conn_name)
+                else:
+                    conn_widget = Connection(self, conn_dag, conn_name)
                 self.connections[conn_name] = conn_widget
 
             if conn_widget.is_input:
                 inp_y_offset = self.dagnode.base_height * inp_count
-                conn_widget.setY(inp_start.y() + inp_y_offset)
-                conn_widget.setX(inp_start.x())
+                conn_widget.setPos(inp_start.x(), inp_start.y() + inp_y_offset)
                 inp_count += 1
 
             if conn_widget.is_output:
                 out_y_offset = self.dagnode.base_height * out_count
-                conn_widget.setY(out_start.y() + out_y_offset)
-                conn_widget.setX(out_start.x())
+                conn_widget.setPos(out_start.x(), out_start.y() + out_y_offset)
                 out_count += 1
 
+            conn_widget.updateLayout()
+        self.updateEdges()
+
+    def updateEdges(self):
+        """
+        Invalidate the cached geometry of all connected edges.
+        """
+        for conn_widget in self.connections.values():
+            for edge in conn_widget.connected_edges():
+                edge.updateGeometry()
+
     def paint(self, painter, option, widget):
         """
         Paint the widget container and all of the child widgets.
@@ -518,47 +727,6 @@ class NodeWidget(QtGui.QGraphicsObject):
         if option.state & QtGui.QStyle.State_MouseOver:
             self.is_hover = True
 
-        # translate the label
-        self.label.setPos(self.label_pos)        
-        self.drawConnections()
-
-        # adjust size, if necessary
-        if self.label.width > self.width:
-            self.width = self.label.width + 14
-
-        """
-        if self.label.height > (self.dagnode.base_height * 2):
-            self.dagnode.base_height = self.label.height
-        """
-
-        # set the tooltip to the current node's documentation string.
-        self.setToolTip(self.dagnode.docstring)
-
-        # render fx
-        if self._render_effects:
-            # background
-            self.bgshd = QtGui.QGraphicsDropShadowEffect()
-            self.bgshd.setBlurRadius(16)
-            self.bgshd.setColor(self.shadow_color)
-            self.bgshd.setOffset(8,8)
-            self.background.setGraphicsEffect(self.bgshd)
-
-            # label
-            self.lblshd = QtGui.QGraphicsDropShadowEffect()
-            self.lblshd.setBlurRadius(8)
-            self.lblshd.setColor(self.shadow_color)
-            self.lblshd.setOffset(4,4)
-            self.label.setGraphicsEffect(self.lblshd)
-
-        else:
-            if self.background.graphicsEffect():
-                self.background.graphicsEffect().deleteLater()
-                self.bgshd = QtGui.QGraphicsDropShadowEffect()
-
-            if self.label.graphicsEffect():
-                self.label.graphicsEffect().deleteLater()
-                self.lblshd = QtGui.QGraphicsDropShadowEffect()
-
         if self._debug:
             debug_color = QtGui.QColor(*[0, 0, 0])
             painter.setBrush(QtCore.Qt.NoBrush)
@@ -589,6 +757,94 @@ class NodeWidget(QtGui.QGraphicsObject):
             painter.drawLine(vline)
 
 
+    def setRenderEffects(self, value):
+        """
+        Toggle the node effects (render_fx). The background bounds
+        include the cached shadow, so its geometry is updated.
+
+        :param bool value: render effects.
+        """
+        value = bool(value)
+        if value == self._render_effects:
+            return
+
+        self.background.updateGeometry()
+        self._render_effects = value
+        self.updateEffects()
+        self.update()
+
+    def setCacheShadows(self, value):
+        """
+        Toggle drawing the drop shadow from a cached pixmap instead 
+        of a graphics effect.
+
+        :param bool value: cache shadows.
+        """
+        value = bool(value)
+        if value == self.cache_shadows:
+            return
+
+        self.background.updateGeometry()
+        self.cache_shadows = value
+        self.updateEffects()
+        self.update()
+
+    def updateEffects(self):
+        """
+        Update the node drop shadows. Effects are created once, and 
+        only updated when the shadow color, render_fx, cache_shadows
+        or detail level change; paint never touches them.
+        """
+        color = self.shadow_color
+        render_effects = self._render_effects and self.detail_level == LOD_FULL
+        state = (render_effects, self.cache_shadows, color.rgba())
+        if state == self._fx_state:
+            return
+
+        self._fx_state = state
+        if not render_effects:
+            for effect in [self.bgshd, self.lblshd]:
+                if effect is not None:
+                    effect.setEnabled(False)
+            return
+
+        if self.bgshd is None:
+            self.bgshd = QtGui.QGraphicsDropShadowEffect()
+            self.bgshd.setBlurRadius(16)
+            self.bgshd.setOffset(8,8)
+            self.background.setGraphicsEffect(self.bgshd)
+
+        if self.lblshd is None:
+            self.lblshd = QtGui.QGraphicsDropShadowEffect()
+            self.lblshd.setBlurRadius(8)
+            self.lblshd.setOffset(4,4)
+            self.label.setGraphicsEffect(self.lblshd)
+
+        self.bgshd.setColor(color)
+        self.bgshd.setEnabled(not self.cache_shadows)
+        self.lblshd.setColor(color)
+        self.lblshd.setEnabled(True)
+
+        if self.cache_shadows:
+            self.background.update(self.background.shadowRect())
+
+    def setDetailLevel(self, level):
+        """
+        Show or hide the label & connection widgets for the view 
+        level of detail. Called by the scene when the zoom tier changes.
+
+        :param int level: level of detail tier.
+        """
+        if level == self.detail_level:
+            return
+
+        self.detail_level = level
+        self.label.setVisible(level == LOD_FULL)
+        for conn_widget in self.connections.values():
+            conn_widget.setVisible(level > LOD_LOW)
+            conn_widget.updateLayout()
+        self.updateEffects()
+
     def setDebug(self, value):
         """
         Set the debug value of all child nodes.
@@ -658,8 +914,17 @@ class EdgeWidget(QtGui.QGraphicsObject):
         self.cp_size         = 3.0                    # debug: control point size
         self.show_conn       = False                  # show connection string
         self.multi_conn      = False                  # multiple connections (future)
-        self.edge_type       = edge.get('edge_type', 'bezier')
-        self.style           = edge.get('style', 'solid')  
+        self.batch           = None                   # EdgeBatch drawing the edge (if not promoted)
+
+        # cached geometry (see updateGeometry)
+        self._line           = None
+        self._path           = None
+        self._arrowhead      = None
+        self._shape          = None
+        self._rect           = None
+
+        self._edge_type      = edge.get('edge_type', 'bezier')
+        self._style          = edge.get('style', 'solid')  
 
         # Connection widgets
         self.source_item     = weakref.ref(source_item, self.callback_source_deleted)
@@ -703,8 +968,15 @@ class EdgeWidget(QtGui.QGraphicsObject):
             if item.scene() is not None:
                 item.scene().removeItem(item)
 
-        if self.scene() is not None:
-            self.scene().removeItem(self)
+        # batched edges are not in the scene
+        scene = self.scene()
+        if scene is None and self.batch is not None:
+            scene = self.batch.scene()
+
+        if scene is not None:
+            scene.unregisterWidget(self)
+            if self.scene() is not None:
+                scene.removeItem(self)
 
     @property 
     def ids(self):
@@ -838,6 +1110,34 @@ class EdgeWidget(QtGui.QGraphicsObject):
         """
         return "%s,%s" % (self.source_connection, self.dest_connection)
 
+    @property
+    def edge_type(self):
+        """
+        :returns: edge type (bezier or polygon).
+        :rtype: str
+        """
+        return self._edge_type
+
+    @edge_type.setter
+    def edge_type(self, val):
+        if val != self._edge_type:
+            self._edge_type = val
+            self.updateGeometry()
+
+    @property
+    def style(self):
+        """
+        :returns: edge line style (solid, dashed or dotted).
+        :rtype: str
+        """
+        return self._style
+
+    @style.setter
+    def style(self, val):
+        if val != self._style:
+            self._style = val
+            self.update()
+
     @property
     def line_color(self):
         """
@@ -865,11 +1165,14 @@ class EdgeWidget(QtGui.QGraphicsObject):
 
     #- Events -----
     def hoverEnterEvent(self, event):
+        self.setToolTip(self.name)
         QtGui.QGraphicsObject.hoverEnterEvent(self, event)
 
     def hoverLeaveEvent(self, event):
         self.alt_modifier = False
         QtGui.QGraphicsObject.hoverLeaveEvent(self, event)
+        if self.scene() is not None and self.scene().edge_batch is not None:
+            self.scene().requestDemoteEdges()
 
     def hoverMoveEvent(self, event):
         QtGui.QGraphicsObject.hoverMoveEvent(self, event)
@@ -877,6 +1180,29 @@ class EdgeWidget(QtGui.QGraphicsObject):
     def mouseMoveEvent(self, event):
         QtGui.QGraphicsObject.mouseMoveEvent(self, event)
 
+    def itemChange(self, change, value):
+        if change == QtGui.QGraphicsItem.ItemSelectedHasChanged:
+            if not value and self.scene() is not None and self.scene().edge_batch is not None:
+                self.scene().requestDemoteEdges()
+        return QtGui.QGraphicsObject.itemChange(self, change, value)
+
+    def updateGeometry(self):
+        """
+        Clear the cached line, path, arrowhead & shape. Called when 
+        either endpoint node moves or the edge type changes.
+        """
+        # tell the scene index the geometry is about to change,
+        # while boundingRect still returns the old value.
+        self.prepareGeometryChange()
+        self._line      = None
+        self._path      = None
+        self._arrowhead = None
+        self._shape     = None
+        self._rect      = None
+
+        if self.batch is not None:
+            self.batch.updateEdge(self)
+
     def boundingRect(self):
         """
         Create a bounding rect for the line.
@@ -884,28 +1210,35 @@ class EdgeWidget(QtGui.QGraphicsObject):
         :returns: line bounding rect.
         :rtype: QtCore.QRectF
         """
-        extra = (self.gline.pen().width() + 100)  / 2.0
-        line = self.getLine()
-        p1 = line.p1()
-        p2 = line.p2()
-        return QtCore.QRectF(p1, QtCore.QSizeF(p2.x() - p1.x(), p2.y() - p1.y())).normalized().adjusted(-extra, -extra, extra, extra)
+        if self._rect is None:
+            extra = (self.gline.pen().width() + 100)  / 2.0
+            line = self.getLine()
+            p1 = line.p1()
+            p2 = line.p2()
+            self._rect = QtCore.QRectF(p1, QtCore.QSizeF(p2.x() - p1.x(), p2.y() - p1.y())).normalized().adjusted(-extra, -extra, extra, extra)
+        return self._rect
 
     def getLine(self):
         """
         Return the line between two points.
         """
-        p1 = self.source_item().sceneBoundingRect().center()
-        p2 = self.dest_item().sceneBoundingRect().center()
+        if self._line is None:
+            p1 = self.source_item().sceneBoundingRect().center()
+            p2 = self.dest_item().sceneBoundingRect().center()
 
-        # offset the end point a few pixels
-        p2 = QtCore.QPointF(p2.x(), p2.y())
-        return QtCore.QLineF(self.mapFromScene(p1), self.mapFromScene(p2))
+            # offset the end point a few pixels
+            p2 = QtCore.QPointF(p2.x(), p2.y())
+            self._line = QtCore.QLineF(self.mapFromScene(p1), self.mapFromScene(p2))
+        return self._line
 
     def getBezierPath(self, poly=False):
         """
         Returns a bezier path based on the current line.
         Crude, but works.
         """
+        if self._path is not None:
+            return self._path
+
         line = self.getLine()
         path = QtGui.QPainterPath()
         path.moveTo(line.p1().x(), line.p1().y())
@@ -941,8 +1274,51 @@ class EdgeWidget(QtGui.QGraphicsObject):
         self.poly_line = QtGui.QPolygonF([line.p1(), self.source_point, self.dest_point, line.p2()])
         path.cubicTo(self.source_point, self.dest_point, line.p2())
         #path.quadTo(line.p1(), line.p2())
+        self._path = path
+        self.bezier_path = path
         return path
 
+    def getArrowhead(self):
+        """
+        Returns the arrowhead polygon, drawn at the center of the edge.
+
+        :returns: arrowhead polygon (None if the edge has no length).
+        :rtype: QtGui.QPolygonF
+        """
+        if self._arrowhead is not None:
+            return self._arrowhead
+
+        line = self.getLine()
+        if not line.length() > 0.0:
+            return
+
+        angle = math.acos(line.dx() / line.length())
+        if self.edge_type == 'bezier':
+            bezier_path = self.getBezierPath()
+            bline = QtCore.QLineF(bezier_path.pointAtPercent(0.47), bezier_path.pointAtPercent(0.53))  
+            angle = math.acos(bline.dx() / bline.length())
+
+        if line.dy() >= 0:
+            angle = (math.pi * 2.0) - angle
+
+        revArrow = -1
+        center_point = self.getCenterPoint()
+
+        arrow_p1 = center_point + QtCore.QPointF(math.sin(angle + math.pi / 3.0) * self.arrow_size * revArrow,
+                                    math.cos(angle + math.pi / 3.0) * self.arrow_size * revArrow)
+        arrow_p2 = center_point + QtCore.QPointF(math.sin(angle + math.pi - math.pi / 3.0) * self.arrow_size * revArrow,
+                                    math.cos(angle + math.pi - math.pi / 3.0) * self.arrow_size * revArrow)
+
+        # build the arrowhead
+        arrowhead = QtGui.QPolygonF()
+
+        # set the polygon points
+        for point in [center_point, arrow_p1, arrow_p2]:
+            arrowhead.append(point)
+
+        self._arrowhead = arrowhead
+        return arrowhead
+
     def getCenterPoint(self):
         """
         Returns the node center point.
@@ -980,13 +1356,15 @@ class EdgeWidget(QtGui.QGraphicsObject):
          .. todo::
             - add some adjustments to the line to make it more selectable.
         """
-        path = QtGui.QPainterPath()
-        stroker = QtGui.QPainterPathStroker()
-        stroker.setWidth(30)
-        line = self.getLine()
-        path.moveTo(line.p1())
-        path.lineTo(line.p2())
-        return stroker.createStroke(path)
+        if self._shape is None:
+            path = QtGui.QPainterPath()
+            stroker = QtGui.QPainterPathStroker()
+            stroker.setWidth(30)
+            line = self.getLine()
+            path.moveTo(line.p1())
+            path.lineTo(line.p2())
+            self._shape = stroker.createStroke(path)
+        return self._shape
 
     def paint(self, painter, option, widget=None):
         """
@@ -1001,12 +1379,18 @@ class EdgeWidget(QtGui.QGraphicsObject):
         if option.state & QtGui.QStyle.State_MouseOver:                 
             self.is_hover = True
 
-        self.setToolTip(self.name)
         self.show_conn = False
+        line = self.getLine()
+
+        # zoomed out edges draw as straight, aliased lines
+        if paint_lod(option, painter) == LOD_LOW and not self._debug:
+            painter.setRenderHint(QtGui.QPainter.Antialiasing, False)
+            painter.setPen(QtGui.QPen(self.line_color, 0))
+            painter.drawLine(line)
+            return
 
         painter.setRenderHints(QtGui.QPainter.Antialiasing | QtGui.QPainter.TextAntialiasing | QtGui.QPainter.HighQualityAntialiasing)
 
-        line = self.getLine()
         painter.setBrush(self.line_color)
 
         epen = self.gline.pen()
@@ -1017,35 +1401,11 @@ class EdgeWidget(QtGui.QGraphicsObject):
         #self.cp.visible = False
         draw_arrowhead = True
 
-        # get the bezier line center        
-        self.bezier_path = self.getBezierPath()
-
-        # calculate the arrowhead geometry
-        if line.length() > 0.0:
-            angle = math.acos(line.dx() / line.length())
-            if self.edge_type == 'bezier':
-                bline = QtCore.QLineF(self.bezier_path.pointAtPercent(0.47), self.bezier_path.pointAtPercent(0.53))  
-                angle = math.acos(bline.dx() / bline.length())
-
-            if line.dy() >= 0:
-                angle = (math.pi * 2.0) - angle
-
-            revArrow = -1
-            center_point = self.getCenterPoint()
-            end_point = self.getEndPoint()
-
-            arrow_p1 = center_point + QtCore.QPointF(math.sin(angle + math.pi / 3.0) * self.arrow_size * revArrow,
-                                        math.cos(angle + math.pi / 3.0) * self.arrow_size * revArrow)
-            arrow_p2 = center_point + QtCore.QPointF(math.sin(angle + math.pi - math.pi / 3.0) * self.arrow_size * revArrow,
-                                        math.cos(angle + math.pi - math.pi / 3.0) * self.arrow_size * revArrow)
-
-            # build the arrowhead
-            arrowhead = QtGui.QPolygonF()
-
-            # set the polygon points
-            for point in [center_point, arrow_p1, arrow_p2]:
-                arrowhead.append(point)
+        # cached bezier path & arrowhead geometry
+        bezier_path = self.getBezierPath()
+        arrowhead = self.getArrowhead()
 
+        if arrowhead is not None:
             if line:
                 if not self.alt_modifier:
                     if draw_arrowhead:
@@ -1066,7 +1426,7 @@ class EdgeWidget(QtGui.QGraphicsObject):
                     painter.pen().setStyle(QtCore.Qt.DotLine)
 
                 if self.edge_type == 'bezier':
-                    painter.drawPath(self.bezier_path)
+                    painter.drawPath(bezier_path)
 
                 if self.edge_type == 'polygon':
                     painter.drawLine(line)
@@ -1085,6 +1445,332 @@ class EdgeWidget(QtGui.QGraphicsObject):
                 painter.drawEllipse(self.dest_point, self.cp_size, self.cp_size)
 
 
+class EdgeBatch(QtGui.QGraphicsItem):
+    """
+    Single scene item that draws many edges. Edge endpoints are 
+    packed into a flat buffer, and each edge is registered in the 
+    cells of a coarse grid that is kept up to date as edges move. 
+    The grid selects candidate edges for painting & hit-testing. 
+    Each edge is drawn by the cell its bounds start in; that cell 
+    caches the edge paths grouped by pen until one of its edges changes.
+    Batched edge widgets are not added to the scene; they are promoted 
+    to interactive items by the scene when hovered or selected.
+    """
+    node_class    = 'edge_batch'
+
+    def __init__(self):
+        QtGui.QGraphicsItem.__init__(self)
+
+        self._edges          = []                     # [EdgeWidget]
+        self._slots          = dict()                 # {edge ids: buffer slot}
+        self._buffer         = array.array('d')       # x1, y1, x2, y2 per slot
+        self._grid           = dict()                 # {(col, row): set(edge ids)}
+        self._cells          = dict()                 # {edge ids: (col1, row1, col2, row2)}
+        self._paths          = dict()                 # {(col, row): {low LOD: pen groups}}
+        self._rect           = None
+
+        self.setZValue(-1.0)
+        self.setAcceptedMouseButtons(QtCore.Qt.NoButton)
+        self.setFlag(QtGui.QGraphicsItem.ItemUsesExtendedStyleOption, True)
+
+    def __len__(self):
+        return len(self._edges)
+
+    def __contains__(self, edge):
+        return edge.ids in self._slots
+
+    @property
+    def edges(self):
+        """
+        :returns: batched edge widgets.
+        :rtype: list
+        """
+        return list(self._edges)
+
+    def addEdge(self, edge):
+        """
+        Add an edge widget to the batch.
+
+        :param EdgeWidget edge: edge widget.
+        """
+        if edge.ids in self._slots:
+            return
+
+        slot = len(self._edges)
+        self._edges.append(edge)
+        self._slots[edge.ids] = slot
+        self._buffer.extend([0.0, 0.0, 0.0, 0.0])
+        edge.batch = self
+        self.updateEdge(edge)
+
+    def removeEdge(self, edge):
+        """
+        Remove an edge widget from the batch. The last slot
+        is moved into the removed slot.
+
+        :param EdgeWidget edge: edge widget.
+        """
+        slot = self._slots.get(edge.ids)
+        if slot is None:
+            return
+
+        # the bounding rect is left as is, only the edge is repainted
+        self.update(self.slotRect(slot))
+        self._slots.pop(edge.ids)
+
+        last = len(self._edges) - 1
+        if slot != last:
+            moved = self._edges[last]
+            self._edges[slot] = moved
+            self._slots[moved.ids] = slot
+            self._buffer[slot * 4:slot * 4 + 4] = self._buffer[last * 4:last * 4 + 4]
+
+        self._edges.pop()
+        del self._buffer[last * 4:]
+        self.invalidateCell(edge.ids)
+        self.updateCells(edge.ids, None)
+        edge.batch = None
+
+    def updateEdge(self, edge):
+        """
+        Update the buffer for an edge. Called when the edge widget
+        geometry is invalidated. Only the old & new edge areas are 
+        repainted; the bounding rect is only recomputed if it grows.
+
+        :param EdgeWidget edge: edge widget.
+        """
+        slot = self._slots.get(edge.ids)
+        if slot is None:
+            return
+
+        old_rect = self.slotRect(slot)
+        line = edge.getLine()
+        self._buffer[slot * 4:slot * 4 + 4] = array.array('d', [line.x1(), line.y1(), line.x2(), line.y2()])
+        new_rect = self.slotRect(slot)
+
+        if self._rect is None or not self._rect.contains(new_rect):
+            self.prepareGeometryChange()
+            self._rect = None
+
+        self.invalidateCell(edge.ids)
+        self.updateCells(edge.ids, self.cellRange(*self.edgeRect(slot)))
+        self.invalidateCell(edge.ids)
+        self.update(old_rect.united(new_rect))
+
+    def cellRange(self, x1, y1, x2, y2):
+        """
+        Returns the range of grid cells covering the given bounds.
+
+        :returns: col1, row1, col2, row2 (inclusive).
+        :rtype: tuple
+        """
+        return (int(math.floor(x1 / EDGE_GRID_SIZE)), int(math.floor(y1 / EDGE_GRID_SIZE)),
+                int(math.floor(x2 / EDGE_GRID_SIZE)), int(math.floor(y2 / EDGE_GRID_SIZE)))
+
+    def updateCells(self, ids, cells):
+        """
+        Move an edge between grid cells. Only cells that are no longer
+        (or newly) covered by the edge are touched.
+
+        :param tuple ids: edge ids.
+        :param tuple cells: new cell range, or None to remove the edge.
+        """
+        old = self._cells.pop(ids, None)
+        if old == cells:
+            if cells is not None:
+                self._cells[ids] = cells
+            return
+
+        if old is not None:
+            for col in range(old[0], old[2] + 1):
+                for row in range(old[1], old[3] + 1):
+                    if cells is not None and cells[0] <= col <= cells[2] and cells[1] <= row <= cells[3]:
+                        continue
+                    cell = self._grid.get((col, row))
+                    if cell is not None:
+                        cell.discard(ids)
+                        if not cell:
+                            self._grid.pop((col, row))
+
+        if cells is not None:
+            self._cells[ids] = cells
+            for col in range(cells[0], cells[2] + 1):
+                for row in range(cells[1], cells[3] + 1):
+                    self._grid.setdefault((col, row), set()).add(ids)
+
+    def invalidateCell(self, ids):
+        """
+        Drop the cached paths of the grid cell that draws the given edge.
+
+        :param tuple ids: edge ids.
+        """
+        cells = self._cells.get(ids)
+        if cells is not None:
+            self._paths.pop(cells[:2], None)
+
+    def cellPaths(self, cell, low=False):
+        """
+        Returns the paths of the edges drawn by a grid cell (edges whose
+        bounds start in the cell), grouped by pen. Paths are cached until
+        one of the cell edges changes.
+
+        :param tuple cell: grid cell (col, row).
+        :param bool low: low level of detail (straight lines, no arrowheads).
+
+        :returns: {(color, weight, edge type): [lines (low) or line path, arrowhead path]}
+        :rtype: dict
+        """
+        cached = self._paths.setdefault(cell, dict())
+        groups = cached.get(low)
+        if groups is not None:
+            return groups
+
+        groups = cached[low] = dict()
+        ids = [i for i in self._grid.get(cell, ()) if self._cells[i][:2] == cell]
+        for slot in sorted(self._slots[i] for i in ids):
+            edge = self._edges[slot]
+            edge_type = 'polygon' if low else edge.edge_type
+            key = (tuple(edge._l_color), float(edge.weight), edge_type)
+            paths = groups.get(key)
+            if paths is None:
+                paths = groups[key] = [[] if low else QtGui.QPainterPath(), QtGui.QPainterPath()]
+
+            x1, y1, x2, y2 = self._buffer[slot * 4:slot * 4 + 4]
+            if low:
+                paths[0].append(QtCore.QLineF(x1, y1, x2, y2))
+                continue
+
+            if edge_type == 'bezier':
+                paths[0].addPath(edge.getBezierPath())
+            else:
+                paths[0].moveTo(x1, y1)
+                paths[0].lineTo(x2, y2)
+
+            arrowhead = edge.getArrowhead()
+            if arrowhead is not None:
+                paths[1].addPolygon(arrowhead)
+                paths[1].closeSubpath()
+        return groups
+
+    def slotsInRect(self, left, top, right, bottom):
+        """
+        Returns the buffer slots of edges registered in the grid cells
+        covering the given bounds, in draw order. If the bounds cover more
+        cells than there are edges, every slot is returned.
+
+        :returns: buffer slots.
+        :rtype: list
+        """
+        col1, row1, col2, row2 = self.cellRange(left, top, right, bottom)
+        if (col2 - col1 + 1) * (row2 - row1 + 1) > len(self._edges):
+            return range(len(self._edges))
+
+        ids = set()
+        for col in range(col1, col2 + 1):
+            for row in range(row1, row2 + 1):
+                cell = self._grid.get((col, row))
+                if cell:
+                    ids.update(cell)
+        return sorted(self._slots[i] for i in ids)
+
+    def slotRect(self, slot):
+        """
+        Returns the bounds of the edge in the given slot.
+
+        :param int slot: buffer slot.
+
+        :rtype: QtCore.QRectF
+        """
+        x1, y1, x2, y2 = self.edgeRect(slot)
+        return QtCore.QRectF(x1, y1, x2 - x1, y2 - y1)
+
+    def edgeRect(self, slot):
+        """
+        Returns the bounds of the edge in the given slot, including
+        the bezier control points & arrowhead.
+
+        :param int slot: buffer slot.
+
+        :returns: x1, y1, x2, y2.
+        :rtype: tuple
+        """
+        x1, y1, x2, y2 = self._buffer[slot * 4:slot * 4 + 4]
+        pad = abs(y2 - y1) / 16.0 + self._edges[slot].arrow_size + self._edges[slot].weight
+        return (min(x1, x2) - pad, min(y1, y2) - pad, max(x1, x2) + pad, max(y1, y2) + pad)
+
+    def boundingRect(self):
+        if self._rect is None:
+            if not self._edges:
+                self._rect = QtCore.QRectF()
+            else:
+                rects = [self.edgeRect(slot) for slot in range(len(self._edges))]
+                left = min(r[0] for r in rects)
+                top = min(r[1] for r in rects)
+                right = max(r[2] for r in rects)
+                bottom = max(r[3] for r in rects)
+                self._rect = QtCore.QRectF(left, top, right - left, bottom - top)
+        return self._rect
+
+    def shape(self):
+        """
+        The batch is never hit by the scene, see edgeAt.
+        """
+        return QtGui.QPainterPath()
+
+    def edgeAt(self, pos):
+        """
+        Returns the batched edge at the given scene position.
+
+        :param QtCore.QPointF pos: scene position.
+
+        :returns: edge widget.
+        :rtype: EdgeWidget
+        """
+        x, y = pos.x(), pos.y()
+        for slot in self.slotsInRect(x, y, x, y):
+            edge = self._edges[slot]
+            if edge.shape().contains(pos):
+                return edge
+        return
+
+    def paint(self, painter, option, widget=None):
+        """
+        Draw all batched edges intersecting the exposed rect, from the
+        cached paths of the cells drawing them. Each pen group is drawn
+        with a single drawLines call when zoomed out.
+        """
+        exposed = option.exposedRect
+        slots = self.slotsInRect(exposed.left(), exposed.top(), exposed.right(), exposed.bottom())
+        low = paint_lod(option, painter) == LOD_LOW
+
+        groups = dict()                               # {(color, weight, edge type): [cell paths]}
+        for cell in sorted(set(self._cells[self._edges[slot].ids][:2] for slot in slots)):
+            for key, paths in self.cellPaths(cell, low=low).iteritems():
+                groups.setdefault(key, []).append(paths)
+
+        # zoomed out edges draw as straight, aliased lines
+        if low:
+            painter.setRenderHint(QtGui.QPainter.Antialiasing, False)
+        else:
+            painter.setRenderHints(QtGui.QPainter.Antialiasing | QtGui.QPainter.HighQualityAntialiasing)
+
+        for (color, weight, edge_type), cell_paths in groups.iteritems():
+            qcolor = QtGui.QColor(*color)
+            painter.setPen(QtGui.QPen(qcolor, 0 if low else weight))
+            painter.setBrush(QtCore.Qt.NoBrush)
+            if low:
+                painter.drawLines([line for lines, arrow_path in cell_paths for line in lines])
+                continue
+
+            for line_path, arrow_path in cell_paths:
+                painter.drawPath(line_path)
+
+            painter.setBrush(qcolor)
+            for line_path, arrow_path in cell_paths:
+                if not arrow_path.isEmpty():
+                    painter.drawPath(arrow_path)
+
+
 class Connection(QtGui.QGraphicsObject):
     
     Type                = QtGui.QGraphicsObject.UserType + 4
@@ -1216,9 +1902,7 @@ class Connection(QtGui.QGraphicsObject):
         :returns: connection can accept a connection.
         :rtype: bool
         """
-        if self.max_connections == 0:
-            return True
-        return len(self.connections) < self.max_connections
+        return self.dagconn.is_connectable
 
     def type(self):
         """
@@ -1364,6 +2048,10 @@ class Connection(QtGui.QGraphicsObject):
         """
         Draw the connection widget.
         """
+        # ports aren't drawn when zoomed out
+        if paint_lod(option, painter) == LOD_LOW:
+            return
+
         self.is_selected = False
         self.is_hover = False
 
@@ -1376,8 +2064,6 @@ class Connection(QtGui.QGraphicsObject):
         if option.state & QtGui.QStyle.State_MouseOver:
             self.is_hover = True
 
-        self.setToolTip('%s.%s (%s)' % (self.dagnode.name, self.name, self.dagconn.attr_type))
-
         # background
         gradient = QtGui.QLinearGradient(0, - self.draw_radius, 0, self.draw_radius)
         gradient.setColorAt(0, self.bg_color)
@@ -1401,27 +2087,9 @@ class Connection(QtGui.QGraphicsObject):
         label_color = self.label_color
         if self._debug:
             label_color = QtGui.QColor(*[170, 170, 170])
-        
-        # user attributes display in italics
-        italic = False
-        if self.dagnode.get_attr(self.name).user:
-            italic = True
 
-        label_font = QtGui.QFont(self.node._cfont, self.node._cfont_size, italic=italic)
-        self.label.hide()
-        if self.is_expanded:
+        if self.label.isVisible() and self.label.brush().color() != label_color:
             self.label.setBrush(label_color)
-            self.label.setFont(label_font)
-            self.label.show()
-            self.label.setText(self.name)
-            # set the positions
-            if self.isInputConnection():
-                self.label.setPos(self.input_label_pos)
-
-            if self.isOutputConnection():
-                self.label.setPos(self.output_label_pos)
-
-            self.label.setToolTip(self.dagconn.desc)
 
         # visualize the bounding rect if _debug attribute is true
         if self._debug:
@@ -1436,6 +2104,34 @@ class Connection(QtGui.QGraphicsObject):
                 rect.moveTo(self.label.pos().x(), self.label.pos().y())
                 painter.drawRect(rect)
 
+    def updateLayout(self):
+        """
+        Update the connection tooltip and label. Called by the parent
+        node when its layout changes.
+        """
+        self.setToolTip('%s.%s (%s)' % (self.dagnode.name, self.name, self.dagconn.attr_type))
+
+        show_label = self.is_expanded and self.node.detail_level == LOD_FULL
+        self.label.setVisible(show_label)
+        if not show_label:
+            return
+
+        # user attributes display in italics
+        italic = bool(self.dagconn.user)
+
+        label_font = QtGui.QFont(self.node._cfont, self.node._cfont_size, italic=italic)
+        self.label.setFont(label_font)
+        self.label.setText(self.name)
+
+        # set the positions
+        if self.isInputConnection():
+            self.label.setPos(self.input_label_pos)
+
+        if self.isOutputConnection():
+            self.label.setPos(self.output_label_pos)
+
+        self.label.setToolTip(self.dagconn.desc)
+
     def setDebug(self, value):
         """
         Set the widget debug mode.
@@ -1444,6 +2140,240 @@ class Connection(QtGui.QGraphicsObject):
             self._debug = value
 
 
+class Port(object):
+    """
+    Lightweight node connection. Ports are not scene items: they are
+    drawn by the node background and hit-tested by the node (see 
+    NodeWidget.portAt), but otherwise behave like Connection widgets 
+    for edges & the scene.
+    """
+    node_class          = 'connection'
+
+    # geometry (matches Connection)
+    draw_radius         = 4.0
+    pen_width           = 1.5
+    radius              = draw_radius*4
+    buffer              = 2.0
+
+    def __init__(self, parent, conn_node, name, **kwargs):
+
+        self._node          = weakref.ref(parent)
+        self.dagnode        = parent.dagnode
+        self.dagconn        = conn_node
+
+        self.node_shape     = 'circle'
+        self._pos           = QtCore.QPointF(0, 0)
+        self._visible       = True
+
+        # widget colors
+        self._i_color       = [255, 255, 41, 255]    # input color
+        self._o_color       = [0, 204, 0, 255]       # output color   
+        self._l_color       = [5, 5, 5, 200]         # label color
+
+        # connection state
+        self._debug         = False
+        self.is_hover       = False
+
+        # label
+        self.label_text     = None
+        self.label_font     = None
+        self.label_rect     = QtCore.QRectF()
+
+        # dict: {(id, id) : edge widget} 
+        self.connections    = dict()
+
+    def __repr__(self):
+        return 'Port("%s")' % self.connection_name
+
+    @property 
+    def connection_name(self):
+        return "%s.%s" % (self.dagnode.name, self.name)
+
+    @property
+    def name(self):
+        return self.dagconn.name
+
+    @property
+    def node(self):
+        return self._node()
+
+    def parentItem(self):
+        return self.node
+
+    @property
+    def is_input(self):
+        return self.dagconn.is_input
+
+    @property
+    def is_output(self):
+        return self.dagconn.is_output
+
+    @property
+    def is_connected(self):
+        """
+        :returns: connection has connected edges.
+        :rtype: bool
+        """
+        return bool(len(self.connections))
+
+    @property
+    def is_enabled(self):
+        """
+        :returns: node is enabled.
+        :rtype: bool
+        """
+        return self.dagnode.enabled
+
+    @property
+    def is_connectable(self):
+        """
+        :returns: connection can accept a connection.
+        :rtype: bool
+        """
+        return self.dagconn.is_connectable
+
+    @property
+    def max_connections(self):
+        """
+        :returns: max number of connections that this connection can accept.
+        :rtype: int
+        """
+        return self.dagconn.max_connections
+
+    def connected_edges(self):
+        """
+        Returns a list of connected edges.
+
+        :returns: list of connected edge widgets.
+        :rtype: list
+        """
+        return self.connections.values()
+
+    def isInputConnection(self):
+        return self.dagconn.is_input
+
+    def isOutputConnection(self):
+        return not self.dagconn.is_input
+
+    #- Geometry ----
+    def pos(self):
+        return QtCore.QPointF(self._pos)
+
+    def setPos(self, x, y):
+        """
+        Set the port position in node coordinates.
+        """
+        self._pos = QtCore.QPointF(x, y)
+
+    def isVisible(self):
+        return self._visible
+
+    def setVisible(self, visible):
+        self._visible = visible
+
+    def boundingRect(self):
+        """
+        Return the port hit area (plus selection buffer), relative
+        to the port position.
+
+        :rtype: QtCore.QRectF
+        """
+        r = self.radius
+        b = self.buffer
+        return QtCore.QRectF(-r/2 - b, -r/2 - b, r + b*2, r + b*2)
+
+    def sceneBoundingRect(self):
+        return self.node.mapRectToScene(self.boundingRect().translated(self._pos))
+
+    def scenePos(self):
+        return self.node.mapToScene(self._pos)
+
+    def update(self):
+        """
+        Repaint the port area of the node.
+        """
+        self.node.background.update(self.boundingRect().translated(self._pos))
+
+    def toolTip(self):
+        return '%s.%s (%s)' % (self.dagnode.name, self.name, self.dagconn.attr_type)
+
+    #- Colors ----
+    @property
+    def bg_color(self):
+        """
+        :returns: port background color.
+        :rtype: QtGui.QColor
+        """
+        color = self._i_color
+        if self.is_output:
+            color = self._o_color
+        if not self.is_enabled:
+            return QtGui.QColor(*[125, 125, 125])
+
+        if self.is_hover:
+            if self.is_connectable:
+                return QtGui.QColor(*[137, 204, 226])
+            else:
+                return QtGui.QColor(*[238, 46, 36])
+        return QtGui.QColor(*color)
+
+    @property
+    def label_color(self):
+        """
+        :returns: port label color.
+        :rtype: QtGui.QColor
+        """
+        if not self.is_enabled:
+            return QtGui.QColor(*[50, 50, 50, 128])
+        if self._debug:
+            return QtGui.QColor(*[170, 170, 170])
+        return QtGui.QColor(*self._l_color)
+
+    def updateLayout(self):
+        """
+        Update the port label. Called by the parent node when its 
+        layout changes.
+        """
+        self._debug = self.node._debug
+        show_label = self.node.is_expanded and self.node.detail_level == LOD_FULL
+        if not show_label:
+            self.label_text = None
+            return
+
+        # user attributes display in italics
+        self.label_font = QtGui.QFont(self.node._cfont, self.node._cfont_size, italic=bool(self.dagconn.user))
+        self.label_text = self.name
+
+        metrics = QtGui.QFontMetricsF(self.label_font)
+        w = metrics.width(self.label_text)
+        h = metrics.height()
+        cw = self.draw_radius + (self.pen_width*2)
+        x = cw if self.isInputConnection() else -(cw + w)
+        self.label_rect = QtCore.QRectF(self._pos.x() + x, self._pos.y() - h/2, w, h)
+
+    def setDebug(self, value):
+        self._debug = value
+
+    def paint(self, painter):
+        """
+        Draw the port with the node background's painter.
+        """
+        bg_color = self.bg_color
+        gradient = QtGui.QLinearGradient(0, self._pos.y() - self.draw_radius, 0, self._pos.y() + self.draw_radius)
+        gradient.setColorAt(0, bg_color)
+        gradient.setColorAt(1, bg_color.darker(125))
+
+        painter.setRenderHints(QtGui.QPainter.Antialiasing)
+        painter.setPen(QtGui.QPen(QtGui.QBrush(bg_color.darker(250)), self.pen_width, QtCore.Qt.SolidLine))
+        painter.setBrush(QtGui.QBrush(gradient))
+        painter.drawEllipse(self._pos, self.draw_radius, self.draw_radius)
+
+        if self.label_text:
+            painter.setFont(self.label_font)
+            painter.setPen(self.label_color)
+            painter.drawText(self.label_rect, QtCore.Qt.AlignLeft | QtCore.Qt.AlignVCenter, self.label_text)
+
+
 #- Builtins ----
 
 
@@ -1522,6 +2452,7 @@ class DotWidget(QtGui.QGraphicsObject):
 
         if self is not None:
             if self.scene() is not None:
+                self.scene().unregisterWidget(self)
                 self.scene().removeItem(self)
 
     def drawConnections(self, remove=False):
@@ -1564,6 +2495,7 @@ class DotWidget(QtGui.QGraphicsObject):
         for conn_name in self.connections:
             conn_dag = self.dagnode.get_connection(conn_name)
             conn_widget = self.connections.get(conn_name)
+            conn_state = (conn_widget.pos(), conn_widget.rotation())
 
             
             ### RECENTER AND TRANSLATE BASED ON RADIUS ###
@@ -1634,6 +2566,11 @@ class DotWidget(QtGui.QGraphicsObject):
                 # rotate the connector
                 conn_widget.setRotation(90+(float(angle)*-1) )
 
+            # connected edges follow the connector
+            if (conn_widget.pos(), conn_widget.rotation()) != conn_state:
+                for edge in conn_widget.connected_edges():
+                    edge.updateGeometry()
+
     #- Attributes ----
     @property
     def id(self):
@@ -1707,6 +2644,7 @@ class DotWidget(QtGui.QGraphicsObject):
         change == "GraphicsItemChange"
         """
         if change == self.ItemPositionHasChanged:
+            self.updateEdges()
             self.nodeChanged.emit(self)
             #self.updateConnections()
         return super(DotWidget, self).itemChange(change, value)
@@ -1726,19 +2664,16 @@ class DotWidget(QtGui.QGraphicsObject):
         QtGui.QGraphicsItem.mousePressEvent(self, event)
         # store the node's current position
         self._current_pos  = self.pos()
-        # store the node's current data
-        self.scene().handler.evaluate()
-        self._data_snapshot = self.scene().graph.snapshot()        
+        # store the graph's current data
+        self.scene().beginNodeDrag()
 
     def mouseReleaseEvent(self, event):
         """
         Help manage mouse movement undo/redos.
         """
-        # Don't register undos for selections without moves
-        if self.pos() != self._current_pos:
-            snapshot = self.scene().graph.snapshot()
-            self.scene().undo_stack.push(SceneNodesCommand(self._data_snapshot, snapshot, self.scene()))
         QtGui.QGraphicsItem.mouseReleaseEvent(self, event)
+        # sync the dragged positions & register a single undo
+        self.scene().endNodeDrag(self.pos() != self._current_pos)
 
     def boundingRect(self):
         """
@@ -1913,6 +2848,14 @@ class DotWidget(QtGui.QGraphicsObject):
         if name in self.outputs:
             return self.connections.get(name)
 
+    def updateEdges(self):
+        """
+        Invalidate the cached geometry of all connected edges.
+        """
+        for conn_widget in self.connections.values():
+            for edge in conn_widget.connected_edges():
+                edge.updateGeometry()
+
     def removeConnectionWidgets(self):
         """
         Remove all of the connection widgets.
@@ -2066,6 +3009,7 @@ class NoteWidget(QtGui.QGraphicsObject):
         """
         if self is not None:
             if self.scene() is not None:
+                self.scene().unregisterWidget(self)
                 self.scene().removeItem(self)
    
     #- Attributes ----
@@ -2176,6 +3120,7 @@ class NoteWidget(QtGui.QGraphicsObject):
             self.handle_selected = False
             #self.setPos(cpos.x(), cpos.y())            
         QtGui.QGraphicsItem.mouseReleaseEvent(self, event)
+        self.scene().syncNodePositions()
 
         # tidy up
         if self.dagnode.width < self.min_width:
@@ -2622,31 +3567,43 @@ class NodeLabel(QtGui.QGraphicsObject):
         """
         Draw the label.
         """
+        if paint_lod(option, painter) < LOD_FULL:
+            return
+
         label_color = self.node.label_color
+
+        # debug
+        if self._debug:
+            label_color = QtGui.QColor(*[200, 200, 200])
+            qpen = QtGui.QPen(QtGui.QColor(125,125,125))
+            qpen.setWidthF(0.5)
+            qpen.setStyle(QtCore.Qt.DashLine)
+            painter.setPen(qpen)
+            painter.drawPolygon(self.boundingRect())
+
+        if self.label.defaultTextColor() != label_color:
+            self.label.setDefaultTextColor(label_color)
+
+    def updateLayout(self):
+        """
+        Update the label font and text. Called by the parent 
+        node when its layout changes.
+        """
         label_italic = self.node._font_italic
 
         # diabled fonts always render italicized
         if not self.node.is_enabled:
             label_italic = True
 
-        #painter.setRenderHints(QtGui.QPainter.Antialiasing | QtGui.QPainter.TextAntialiasing)
         qfont = QtGui.QFont(self.node._font)
         qfont.setPointSize(self.node._font_size)
         qfont.setBold(self.node._font_bold)
         qfont.setItalic(label_italic)
-        self.label.setFont(qfont)
-
-        # debug
-        if self._debug:
-            label_color = QtGui.QColor(*[200, 200, 200])
-            qpen = QtGui.QPen(QtGui.QColor(125,125,125))
-            qpen.setWidthF(0.5)
-            qpen.setStyle(QtCore.Qt.DashLine)
-            painter.setPen(qpen)
-            painter.drawPolygon(self.boundingRect())
+        if self.label.font() != qfont:
+            self.label.setFont(qfont)
 
-        self.label.setDefaultTextColor(label_color)
-        self.text = self.node.dagnode.name
+        if self.text != self.node.dagnode.name:
+            self.text = self.node.dagnode.name
 
 
 class NodeBackground(QtGui.QGraphicsItem):
@@ -2667,20 +3624,47 @@ class NodeBackground(QtGui.QGraphicsItem):
     def pen_width(self):
         return self.node.pen_width
 
+    @property
+    def draw_shadow(self):
+        """
+        Returns true if the background draws a cached shadow pixmap.
+
+        :rtype: bool
+        """
+        return self.node._render_effects and self.node.cache_shadows and not self._debug
+
     def boundingRect(self):
         if self.node:
+            # the node bounding rect includes lightweight ports
+            if self.node._render_effects and self.node.cache_shadows:
+                return self.shadowRect().united(self.node.boundingRect())
             return self.node.boundingRect()
         return QtCore.QRectF(0,0,0,0)
 
+    def updateGeometry(self):
+        """
+        Prepare for a bounding rect change. Called by the node
+        before render_fx or cache_shadows change.
+        """
+        self.prepareGeometryChange()
+
+    def shadowRect(self):
+        """
+        Returns the area painted by the cached shadow (8px offset, 16px blur).
+
+        :rtype: QtCore.QRectF
+        """
+        return self.node.nodeRect().adjusted(-8, -8, 24, 24)
+
     def labelLine(self, offset=0):
         """
         Draw a line for the node label area
         """
-        p1 = self.boundingRect().topLeft()
+        p1 = self.node.nodeRect().topLeft()
         p1.setX(p1.x() + self.node.bufferX)
         p1.setY(p1.y() + self.node.bufferY*7)
 
-        p2 = self.boundingRect().topRight()
+        p2 = self.node.nodeRect().topRight()
         p2.setX(p2.x() - self.node.bufferX)
         p2.setY(p2.y() + self.node.bufferY*7)
 
@@ -2698,6 +3682,11 @@ class NodeBackground(QtGui.QGraphicsItem):
         bg_clr1 = self.node.bg_color
         bg_clr2 = bg_clr1.darker(150)
 
+        # zoomed out nodes draw as flat rectangles
+        if paint_lod(option, painter) == LOD_LOW and not self._debug:
+            painter.fillRect(self.node.nodeRect(), bg_clr1)
+            return
+
         # background gradient
         gradient = QtGui.QLinearGradient(0, -self.node.height/2, 0, self.node.height/2)
         gradient.setColorAt(0, bg_clr1)
@@ -2716,9 +3705,15 @@ class NodeBackground(QtGui.QGraphicsItem):
             qpen = QtGui.QPen(pcolor)
             qbrush = QtGui.QBrush(QtCore.Qt.NoBrush)
 
+        # cached drop shadow
+        if self.draw_shadow:
+            rect = self.node.nodeRect()
+            shadow = shadow_pixmap(rect.width(), rect.height(), self.node.shadow_color)
+            painter.drawPixmap(self.shadowRect().topLeft(), shadow)
+
         painter.setPen(qpen)
         painter.setBrush(qbrush)
-        painter.drawRoundedRect(self.boundingRect(), 7, 7)
+        painter.drawRoundedRect(self.node.nodeRect(), 7, 7)
 
         # line pen #1
         lcolor = self.node.pen_color
@@ -2736,6 +3731,12 @@ class NodeBackground(QtGui.QGraphicsItem):
             label_line = self.labelLine()
             painter.drawLine(label_line)
 
+        # lightweight ports are drawn over the background
+        if self.node.lightweight_ports and paint_lod(option, painter) > LOD_LOW:
+            for port in self.node.connections.values():
+                if port.isVisible():
+                    port.paint(painter)
+
 
 class NodeText(QtGui.QGraphicsObject):
     
@@ -2963,9 +3964,7 @@ class DotConnection(QtGui.QGraphicsObject):
         Returns true if the connection can take a connection.
          0 - unlimited connections
         """
-        if self.max_connections == 0:
-            return True
-        return len(self.connections) < self.max_connections
+        return self.dagconn.is_connectable
 
     def type(self):
         """
@@ -3410,4 +4409,98 @@ class ResizeHandle(QtGui.QGraphicsObject):
 
         shape = self.getShape()
         shape.translate(-2, -2)
-        painter.drawPolygon(shape)
\ No newline at end of file
+        painter.drawPolygon(shape)
+
+
+def shadow_pixmap(width, height, color, radius=16):
+    """
+    Returns a pre-rendered drop shadow for a node background. Pixmaps 
+    are cached by size & color, and padded by the blur radius.
+
+    :param float width: node width.
+    :param float height: node height.
+    :param QtGui.QColor color: shadow color.
+    :param int radius: blur radius.
+
+    :returns: shadow pixmap.
+    :rtype: QtGui.QPixmap
+    """
+    width = int(math.ceil(width))
+    height = int(math.ceil(height))
+    key = (width, height, color.rgba(), radius)
+    if key in SHADOW_PIXMAPS:
+        return SHADOW_PIXMAPS.get(key)
+
+    size = QtCore.QSize(width + radius * 2, height + radius * 2)
+    image = QtGui.QImage(size, QtGui.QImage.Format_ARGB32_Premultiplied)
+    image.fill(0)
+
+    painter = QtGui.QPainter(image)
+    painter.setRenderHint(QtGui.QPainter.Antialiasing)
+    painter.setPen(QtCore.Qt.NoPen)
+    painter.setBrush(QtGui.QBrush(color))
+    painter.drawRoundedRect(QtCore.QRectF(radius, radius, width, height), 7, 7)
+    painter.end()
+
+    # blur the shape through a temporary scene
+    scene = QtGui.QGraphicsScene()
+    item = QtGui.QGraphicsPixmapItem(QtGui.QPixmap.fromImage(image))
+    blur = QtGui.QGraphicsBlurEffect()
+    blur.setBlurRadius(radius)
+    item.setGraphicsEffect(blur)
+    scene.addItem(item)
+
+    result = QtGui.QImage(size, QtGui.QImage.Format_ARGB32_Premultiplied)
+    result.fill(0)
+    painter = QtGui.QPainter(result)
+    scene.render(painter, QtCore.QRectF(), QtCore.QRectF(0, 0, size.width(), size.height()))
+    painter.end()
+
+    if len(SHADOW_PIXMAPS) >= SHADOW_CACHE_SIZE:
+        SHADOW_PIXMAPS.clear()
+
+    pixmap = QtGui.QPixmap.fromImage(result)
+    SHADOW_PIXMAPS[key] = pixmap
+    return pixmap
+
+
+def lod_tier(lod):
+    """
+    Returns the level of detail tier for a zoom level.
+
+    :param float lod: level of detail (1.0 = unscaled).
+
+    :returns: level of detail tier (LOD_LOW, LOD_MEDIUM or LOD_FULL).
+    :rtype: int
+    """
+    if lod < LOD_THRESHOLDS.get('low'):
+        return LOD_LOW
+    if lod < LOD_THRESHOLDS.get('medium'):
+        return LOD_MEDIUM
+    return LOD_FULL
+
+
+def paint_lod(option, painter):
+    """
+    Returns the level of detail tier of the current paint.
+
+    :param QtGui.QStyleOptionGraphicsItem option: paint options.
+    :param QtGui.QPainter painter: painter.
+
+    :returns: level of detail tier.
+    :rtype: int
+    """
+    return lod_tier(option.levelOfDetailFromTransform(painter.worldTransform()))
+
+
+def set_lod_thresholds(medium=None, low=None):
+    """
+    Set the zoom levels used by the level of detail tiers.
+
+    :param float medium: zoom level below which labels are hidden.
+    :param float low: zoom level below which nodes & edges are simplified.
+    """
+    if medium is not None:
+        LOD_THRESHOLDS.update(medium=float(medium))
+    if low is not None:
+        LOD_THRESHOLDS.update(low=float(low))